@@ -26,10 +26,11 @@ class RadioBot(commands.Bot):
     async def on_ready(self):
         print(f"Discord Bot起動: {self.user}", flush=True)
 
-        # 前回配信中だった場合は自動再開
-        from core.stream_manager import stream_manager
-        await stream_manager.auto_start_if_needed()
-
+        # 局ごとに楽曲ディレクトリの監視を開始し、変更のあった楽曲のみメタデータを再取得
+        # 前回配信中だった局は自動再開
+        from core.station import stations
+        for station in stations.all():
+            await station.start()
 
 bot = RadioBot()
 
@@ -37,12 +38,130 @@ bot = RadioBot()
 def is_allowed_channel():
     """許可されたチャンネルかチェック"""
     async def predicate(interaction: discord.Interaction) -> bool:
+        from core.station import stations
+
         if config.DISCORD_CHANNEL_ID == 0:
             return True
-        return interaction.channel_id == config.DISCORD_CHANNEL_ID
+        return stations.is_station_channel(interaction.channel_id)
     return app_commands.check(predicate)
 
 
+def _get_station(interaction: discord.Interaction):
+    """操作対象の局（チャンネルに割り当てた局、なければメイン局）"""
+    from core.station import stations
+    return stations.for_channel(interaction.channel_id)
+
+
+def _format_track_line(entry: dict) -> str:
+    """プレイリスト表示用の1行（長さが分かれば併記）"""
+    from core.track_index import format_duration
+
+    if entry['probe_error']:
+        return f"{entry['name']} ⚠️ 再生不可"
+    if entry['duration']:
+        return f"{entry['name']} ({format_duration(entry['duration'])})"
+    return entry['name']
+
+
+def _format_outputs(outputs: list) -> str:
+    """配信先ごとの状態表示"""
+    emoji = {'live': '🟢', 'connecting': '🟡', 'failed': '🔴', 'stalled': '🟠', 'stopped': '⚫'}
+    lines = []
+    for output in outputs:
+        line = f"{emoji.get(output['state'], '⚪')} {output['name']} (`{output['target']}`)"
+        if output['state'] in ('failed', 'stalled') and output['error']:
+            line += f" - {output['error']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _format_encoder(encoder: dict) -> str:
+    """エンコードプロファイルと適応エンコードの状態表示"""
+    text = encoder['profile']
+    if encoder['adaptive']:
+        text += f"（適応、上限 {encoder['ceiling']}）"
+        metrics = []
+        if encoder['speed'] is not None:
+            metrics.append(f"速度 {encoder['speed']}x")
+        if encoder['cpu_percent'] is not None:
+            metrics.append(f"CPU {encoder['cpu_percent']}%")
+        if encoder['backlog_seconds']:
+            metrics.append(f"出力の遅れ {encoder['backlog_seconds']}秒")
+        if metrics:
+            text += "\n" + " / ".join(metrics)
+        if encoder['decisions']:
+            last = encoder['decisions'][-1]
+            text += f"\n直近の切り替え: {last['from']} → {last['to']}（{last['reason']}）"
+    return text
+
+
+def _format_speed_trend(trend: list) -> str:
+    """エンコード速度の推移（1.0xを上端とする簡易グラフ、計測のない区間は空白）"""
+    blocks = "▁▂▃▄▅▆▇█"
+    return ''.join(
+        ' ' if speed is None else blocks[max(0, min(len(blocks) - 1, int(speed * len(blocks)) - 1))]
+        for speed in trend
+    )
+
+
+def _format_telemetry(telemetry: dict, detailed: bool = False) -> str:
+    """配信FFmpegの進捗（速度・fps・ビットレート・ドロップ/複製フレーム）の表示"""
+    latest = []
+    if telemetry['speed'] is not None:
+        latest.append(f"速度 {telemetry['speed']}x")
+    if telemetry['fps'] is not None:
+        latest.append(f"{telemetry['fps']:g}fps")
+    if telemetry['bitrate_kbps'] is not None:
+        latest.append(f"{telemetry['bitrate_kbps']:.0f}kbps")
+    lines = [" / ".join(latest) or "計測中"]
+
+    if detailed:
+        recent = f"直近{telemetry['recent_seconds']}秒:"
+        if telemetry['recent_speed_avg'] is not None:
+            recent += f" 平均 {telemetry['recent_speed_avg']}x（最低 {telemetry['recent_speed_min']}x） /"
+        recent += f" ドロップ {telemetry['recent_drop_frames']} / 複製 {telemetry['recent_dup_frames']}"
+        lines.append(recent)
+        if telemetry['speed_trend']:
+            lines.append(f"推移（{telemetry['trend_seconds']}秒ごと）: `{_format_speed_trend(telemetry['speed_trend'])}`")
+
+    if telemetry['degraded']:
+        lines.append(f"⚠️ 劣化: {' / '.join(telemetry['degraded'])}")
+    return "\n".join(lines)
+
+
+def _format_incident(incident: dict) -> str:
+    """障害の検知・復旧時間の表示"""
+    results = {
+        'recovered': f"復旧 {incident['recover_ms']}ms / 停止 {incident.get('outage_ms')}ms",
+        'recovering': "復旧中",
+        'failed': "復旧失敗",
+        'stopped': "復旧前に停止",
+    }
+    return (f"{incident['time'][11:]} {incident['component']} - {incident['reason']}\n"
+            f"検知 {incident['detect_ms']}ms / {results.get(incident['result'], incident['result'])}"
+            f"（試行 {incident['attempts']}回）")
+
+
+def _format_output_watchdog(watchdog: dict) -> str:
+    """出力の停止の検知と受信サーバーの表示"""
+    ingest = {'primary': "主", 'backup': "予備"}
+    text = f"受信サーバー: {ingest[watchdog['ingest']]}" if watchdog['backup_configured'] else "予備の受信サーバー: 未設定"
+    if watchdog['stalls']:
+        last = watchdog['stalls'][-1]
+        text += (f"\n停止検知 {len(watchdog['stalls'])}回（直近 {last['time'][11:]}、"
+                 f"{last['reason']}）")
+    return text
+
+
+def _format_playlist_title(tracks: list) -> str:
+    """プレイリスト表示用のタイトル（曲数と合計時間）"""
+    total_seconds = int(sum(entry['duration'] or 0 for entry in tracks))
+    if not total_seconds:
+        return f"楽曲一覧 ({len(tracks)}曲)"
+    hours, minutes = total_seconds // 3600, (total_seconds % 3600) // 60
+    return f"楽曲一覧 ({len(tracks)}曲 / {hours}時間{minutes:02d}分)"
+
+
 # =============================================================================
 # UIコンポーネント - Modal（入力フォーム）
 # =============================================================================
@@ -65,20 +184,21 @@ class ConfigModal(ui.Modal, title="⚙️ 配信設定"):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
+        station_config = _get_station(interaction).config
         messages = []
 
         if self.url_input.value:
-            config.set_stream_url(self.url_input.value)
+            station_config.set_stream_url(self.url_input.value)
             messages.append(f"配信先URL: `{self.url_input.value}`")
 
         if self.key_input.value:
-            config.set_stream_key(self.key_input.value)
+            station_config.set_stream_key(self.key_input.value)
             key = self.key_input.value
             masked = key[:4] + "*" * (len(key) - 8) + key[-4:] if len(key) > 8 else "****"
             messages.append(f"ストリームキー: `{masked}`")
 
         if messages:
-            await config.save()
+            await station_config.save()
             await interaction.response.send_message(
                 "✅ 設定を保存しました\n" + "\n".join(messages),
                 ephemeral=True
@@ -112,7 +232,7 @@ class SyncModal(ui.Modal, title="📁 楽曲同期"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        from core.gdrive_sync import gdrive_sync
+        gdrive_sync = _get_station(interaction).gdrive_sync
         url = self.url_input.value if self.url_input.value else None
         replace = self.replace_input.value.strip() == "入替"
         success, message, details = await gdrive_sync.sync(url, replace=replace)
@@ -123,6 +243,7 @@ class SyncModal(ui.Modal, title="📁 楽曲同期"):
             mode = "入れ替え" if details.get('replaced') else "追加"
             notify_msg = f"📁 楽曲同期が完了しました（{mode}）\n"
             notify_msg += f"　　曲数: {details.get('track_count', 0)}曲"
+            notify_msg += f"\n　　差分: {gdrive_sync.format_diff_summary(details)}"
             if details.get('normalized_count', 0) > 0:
                 notify_msg += f"\n　　ノーマライズ: {details.get('normalized_success', 0)}/{details.get('normalized_count', 0)}曲"
             await interaction.channel.send(notify_msg)
@@ -144,7 +265,7 @@ class BackgroundModal(ui.Modal, title="🖼️ 背景画像同期"):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        from core.gdrive_sync import gdrive_sync
+        gdrive_sync = _get_station(interaction).gdrive_sync
         url = self.url_input.value if self.url_input.value else None
         success, message = await gdrive_sync.sync_background(url)
 
@@ -171,7 +292,7 @@ class ControlPanelView(ui.View):
     @ui.button(label="開始", emoji="▶️", style=discord.ButtonStyle.green, custom_id="panel:start", row=0)
     async def start_button(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.defer(ephemeral=True)
-        from core.stream_manager import stream_manager
+        stream_manager = _get_station(interaction).stream_manager
         success, message = await stream_manager.start()
         emoji = "🎬" if success else "❌"
         await interaction.followup.send(f"{emoji} {message}", ephemeral=True)
@@ -179,14 +300,14 @@ class ControlPanelView(ui.View):
     @ui.button(label="停止", emoji="⏹️", style=discord.ButtonStyle.red, custom_id="panel:stop", row=0)
     async def stop_button(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.defer(ephemeral=True)
-        from core.stream_manager import stream_manager
+        stream_manager = _get_station(interaction).stream_manager
         success, message = await stream_manager.stop()
         emoji = "🛑" if success else "❌"
         await interaction.followup.send(f"{emoji} {message}", ephemeral=True)
 
     @ui.button(label="スキップ", emoji="⏭️", style=discord.ButtonStyle.primary, custom_id="panel:skip", row=0)
     async def skip_button(self, interaction: discord.Interaction, button: ui.Button):
-        from core.stream_manager import stream_manager
+        stream_manager = _get_station(interaction).stream_manager
         if stream_manager.skip():
             await interaction.response.send_message("⏭️ スキップしました", ephemeral=True)
         else:
@@ -194,7 +315,7 @@ class ControlPanelView(ui.View):
 
     @ui.button(label="再生モード", emoji="🔀", style=discord.ButtonStyle.secondary, custom_id="panel:mode", row=0)
     async def mode_button(self, interaction: discord.Interaction, button: ui.Button):
-        from core.audio_player import audio_player
+        audio_player = _get_station(interaction).audio_player
         new_mode = audio_player.toggle_playback_mode()
         emoji = "🔀" if audio_player.shuffle_mode else "📑"
         await interaction.response.send_message(f"{emoji} 再生モード: {new_mode}", ephemeral=True)
@@ -203,7 +324,7 @@ class ControlPanelView(ui.View):
 
     @ui.button(label="再生中", emoji="🎵", style=discord.ButtonStyle.secondary, custom_id="panel:now", row=1)
     async def now_button(self, interaction: discord.Interaction, button: ui.Button):
-        from core.stream_manager import stream_manager
+        stream_manager = _get_station(interaction).stream_manager
         status = stream_manager.get_status()
 
         if not status['is_streaming']:
@@ -216,21 +337,24 @@ class ControlPanelView(ui.View):
             embed.add_field(name="曲名", value=track['title'], inline=False)
             if 'elapsed_formatted' in track:
                 embed.add_field(name="再生時間", value=track['elapsed_formatted'], inline=True)
+            if 'remaining_formatted' in track:
+                embed.add_field(name="残り", value=f"{track['remaining_formatted']} / {track['duration_formatted']}", inline=True)
             await interaction.response.send_message(embed=embed, ephemeral=True)
         else:
             await interaction.response.send_message("再生中の曲がありません", ephemeral=True)
 
     @ui.button(label="状態", emoji="📊", style=discord.ButtonStyle.secondary, custom_id="panel:status", row=1)
     async def status_button(self, interaction: discord.Interaction, button: ui.Button):
-        from core.stream_manager import stream_manager
-        from core.gdrive_sync import gdrive_sync
-        from core.audio_player import audio_player
+        station = _get_station(interaction)
+        stream_manager = station.stream_manager
+        gdrive_sync = station.gdrive_sync
+        audio_player = station.audio_player
 
         stream_status = stream_manager.get_status()
         sync_status = gdrive_sync.get_status()
 
         embed = discord.Embed(
-            title="SUNO Radio Lite",
+            title="SUNO Radio Lite" if station.is_main() else f"SUNO Radio Lite - {station.id}",
             color=0x00ff00 if stream_status['is_streaming'] else 0x808080
         )
 
@@ -248,11 +372,46 @@ class ControlPanelView(ui.View):
 
         if stream_status['current_track']:
             embed.add_field(name="再生中", value=stream_status['current_track']['title'], inline=False)
+            boundary = stream_status['current_track'].get('boundary_delay')
+            if boundary:
+                embed.add_field(
+                    name="曲間待ち",
+                    value=f"平均 {boundary['avg_ms']}ms / 最大 {boundary['max_ms']}ms",
+                    inline=True
+                )
+
+        audio_buffer = stream_status.get('audio_buffer')
+        if stream_status['is_streaming'] and audio_buffer:
+            embed.add_field(
+                name="音声バッファ",
+                value=(f"{int(audio_buffer['fill_ratio'] * 100)}% / "
+                       f"アンダーラン {audio_buffer['underrun_count']}回 ({audio_buffer['underrun_seconds']}秒)"),
+                inline=True
+            )
+
+        av_sync = stream_status.get('av_sync')
+        if av_sync and av_sync['drift_ms'] is not None:
+            embed.add_field(
+                name="A/V同期",
+                value=f"ずれ {av_sync['drift_ms']}ms / 補正 {av_sync['silence_insert_count'] + av_sync['video_catchup_count']}回",
+                inline=True
+            )
+
+        outputs = stream_status.get('outputs')
+        if outputs and len(outputs) > 1:
+            embed.add_field(name="配信先", value=_format_outputs(outputs), inline=False)
+
+        if stream_status['is_streaming']:
+            embed.add_field(name="エンコード", value=_format_encoder(stream_status['encoder']), inline=False)
+
+        telemetry = stream_status.get('telemetry')
+        if telemetry:
+            embed.add_field(name="エンコード状況", value=_format_telemetry(telemetry), inline=False)
 
         embed.add_field(name="楽曲数", value=f"{sync_status['track_count']}曲", inline=True)
         mode_emoji = "🔀" if audio_player.shuffle_mode else "📑"
         embed.add_field(name="再生モード", value=f"{mode_emoji} {audio_player.get_playback_mode()}", inline=True)
-        embed.add_field(name="設定", value="✅ 完了" if config.is_configured() else "❌ 未完了", inline=True)
+        embed.add_field(name="設定", value="✅ 完了" if station.config.is_configured() else "❌ 未完了", inline=True)
 
         # 未ノーマライズ楽曲の警告
         unnormalized = gdrive_sync.get_unnormalized_count()
@@ -263,20 +422,22 @@ class ControlPanelView(ui.View):
 
     @ui.button(label="プレイリスト", emoji="📋", style=discord.ButtonStyle.secondary, custom_id="panel:playlist", row=1)
     async def playlist_button(self, interaction: discord.Interaction, button: ui.Button):
-        from core.gdrive_sync import gdrive_sync
+        station = _get_station(interaction)
+        gdrive_sync = station.gdrive_sync
+        track_index = station.track_index
 
-        tracks = gdrive_sync.get_tracks()
+        tracks = track_index.get_tracks()
         if not tracks:
             await interaction.response.send_message("楽曲がありません", ephemeral=True)
             return
 
         display_tracks = tracks[:20]
-        track_list = "\n".join([f"{i+1}. {t}" for i, t in enumerate(display_tracks)])
+        track_list = "\n".join([f"{i+1}. {_format_track_line(t)}" for i, t in enumerate(display_tracks)])
 
         if len(tracks) > 20:
             track_list += f"\n... 他 {len(tracks) - 20} 曲"
 
-        embed = discord.Embed(title=f"楽曲一覧 ({len(tracks)}曲)", description=track_list, color=0x00ff00)
+        embed = discord.Embed(title=_format_playlist_title(tracks), description=track_list, color=0x00ff00)
 
         status = gdrive_sync.get_status()
         if status['last_sync']:
@@ -300,27 +461,44 @@ class ControlPanelView(ui.View):
 
     @ui.button(label="設定確認", emoji="👁️", style=discord.ButtonStyle.secondary, custom_id="panel:showconfig", row=2)
     async def showconfig_button(self, interaction: discord.Interaction, button: ui.Button):
-        url = config.get_stream_url() or "(未設定)"
-        key = config.get_stream_key()
+        from core.stream_outputs import mask_output_url
+
+        station_config = _get_station(interaction).config
+
+        url = station_config.get_stream_url() or "(未設定)"
+        key = station_config.get_stream_key()
         if key:
             masked = key[:4] + "*" * (len(key) - 8) + key[-4:] if len(key) > 8 else "****"
         else:
             masked = "(未設定)"
 
-        gdrive = config.get_gdrive_url() or "(未設定)"
-        bg_url = config.get_background_url() or "(未設定)"
+        gdrive = station_config.get_gdrive_url() or "(未設定)"
+        bg_url = station_config.get_background_url() or "(未設定)"
 
         embed = discord.Embed(title="現在の設定", color=0x00ff00)
         embed.add_field(name="配信先URL", value=f"`{url}`", inline=False)
+        backup_url = station_config.get_backup_stream_url()
+        if backup_url:
+            embed.add_field(name="予備の受信サーバー", value=f"`{backup_url}`", inline=False)
         embed.add_field(name="ストリームキー", value=f"`{masked}`", inline=False)
+        extra_outputs = station_config.get_extra_outputs()
+        if extra_outputs:
+            embed.add_field(
+                name="追加の配信先",
+                value="\n".join(f"{o['name']}: `{mask_output_url(o['url'])}`" for o in extra_outputs),
+                inline=False
+            )
         embed.add_field(name="楽曲フォルダ", value=f"`{gdrive}`", inline=False)
         embed.add_field(name="背景画像", value=f"`{bg_url}`", inline=False)
-        embed.add_field(name="設定状態", value="✅ OK" if config.is_configured() else "❌ 未完了", inline=False)
+        embed.add_field(name="設定状態", value="✅ OK" if station_config.is_configured() else "❌ 未完了", inline=False)
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @ui.button(label="システム", emoji="💻", style=discord.ButtonStyle.secondary, custom_id="panel:system", row=3)
     async def system_button(self, interaction: discord.Interaction, button: ui.Button):
+        from core.scheduler import scheduler
+
+        station_config = _get_station(interaction).config
         await interaction.response.defer(ephemeral=True)
 
         try:
@@ -353,7 +531,7 @@ class ControlPanelView(ui.View):
 
             # 楽曲フォルダのサイズ
             music_proc = await asyncio.create_subprocess_shell(
-                f"du -sh {config.MUSIC_DIR} 2>/dev/null | awk '{{print $1}}'",
+                f"du -sh {station_config.MUSIC_DIR} 2>/dev/null | awk '{{print $1}}'",
                 stdout=asyncio.subprocess.PIPE
             )
             music_out, _ = await music_proc.communicate()
@@ -368,6 +546,15 @@ class ControlPanelView(ui.View):
             embed.add_field(name="ディスク", value=disk, inline=True)
             embed.add_field(name="楽曲フォルダ", value=music_size, inline=True)
 
+            # 全局で共有するCPU予算の使用状況
+            cpu = scheduler.get_status()
+            embed.add_field(
+                name="CPU予算",
+                value=(f"配信 {cpu['realtime']} + ノーマライズ {cpu['batch']} / {cpu['budget']:g}コア"
+                       + (f"（待機 {cpu['waiting']}件）" if cpu['waiting'] else "")),
+                inline=True
+            )
+
             await interaction.followup.send(embed=embed, ephemeral=True)
 
         except Exception as e:
@@ -422,8 +609,9 @@ config_group = app_commands.Group(name="config", description="配信設定")
 @is_allowed_channel()
 async def config_url(interaction: discord.Interaction, url: str):
     """配信先URLを設定"""
-    config.set_stream_url(url)
-    await config.save()
+    station_config = _get_station(interaction).config
+    station_config.set_stream_url(url)
+    await station_config.save()
     await interaction.response.send_message(f"配信先URL設定: `{url}`", ephemeral=True)
 
 
@@ -431,33 +619,101 @@ async def config_url(interaction: discord.Interaction, url: str):
 @is_allowed_channel()
 async def config_key(interaction: discord.Interaction, key: str):
     """ストリームキーを設定"""
-    config.set_stream_key(key)
-    await config.save()
+    station_config = _get_station(interaction).config
+    station_config.set_stream_key(key)
+    await station_config.save()
     # キーは一部マスク
     masked = key[:4] + "*" * (len(key) - 8) + key[-4:] if len(key) > 8 else "****"
     await interaction.response.send_message(f"ストリームキー設定: `{masked}`", ephemeral=True)
 
 
+@config_group.command(name="backup_url", description="予備の受信サーバーURLを設定（出力の停止時に切り替え）")
+@is_allowed_channel()
+@app_commands.describe(url="予備の受信サーバーURL（例: rtmp://b.rtmp.youtube.com/live2?backup=1、省略時は解除）")
+async def config_backup_url(interaction: discord.Interaction, url: str = None):
+    """予備の受信サーバーURLを設定"""
+    station_config = _get_station(interaction).config
+    station_config.set_backup_stream_url(url or '')
+    await station_config.save()
+    if not url:
+        await interaction.response.send_message("予備の受信サーバーを解除しました", ephemeral=True)
+        return
+    await interaction.response.send_message(
+        f"予備の受信サーバー設定: `{url}`\nストリームキーはメインと共通です。出力の停止を検知すると切り替えます",
+        ephemeral=True
+    )
+
+
+@config_group.command(name="output_add", description="追加の配信先を設定（同じエンコードを同時配信）")
+@is_allowed_channel()
+@app_commands.describe(
+    name="配信先の名前（例: twitch）",
+    url="ストリームキーを含む配信先URL（例: rtmp://live.twitch.tv/app/xxxx）"
+)
+async def config_output_add(interaction: discord.Interaction, name: str, url: str):
+    """追加の配信先を設定"""
+    from core.stream_outputs import mask_output_url
+
+    station_config = _get_station(interaction).config
+
+    if name == 'main':
+        await interaction.response.send_message("❌ `main` は `/config url` `/config key` の配信先に使われています", ephemeral=True)
+        return
+    station_config.set_extra_output(name, url)
+    await station_config.save()
+    await interaction.response.send_message(
+        f"追加の配信先設定: {name} (`{mask_output_url(url)}`)\n次回の配信開始から反映されます",
+        ephemeral=True
+    )
+
+
+@config_group.command(name="output_remove", description="追加の配信先を削除")
+@is_allowed_channel()
+@app_commands.describe(name="配信先の名前")
+async def config_output_remove(interaction: discord.Interaction, name: str):
+    """追加の配信先を削除"""
+    station_config = _get_station(interaction).config
+    if not station_config.remove_extra_output(name):
+        await interaction.response.send_message(f"❌ 配信先 `{name}` は設定されていません", ephemeral=True)
+        return
+    await station_config.save()
+    await interaction.response.send_message(f"追加の配信先を削除: {name}\n次回の配信開始から反映されます", ephemeral=True)
+
+
 @config_group.command(name="show", description="現在の設定を表示")
 @is_allowed_channel()
 async def config_show(interaction: discord.Interaction):
     """現在の設定を表示"""
-    url = config.get_stream_url() or "(未設定)"
-    key = config.get_stream_key()
+    from core.stream_outputs import mask_output_url
+
+    station_config = _get_station(interaction).config
+
+    url = station_config.get_stream_url() or "(未設定)"
+    key = station_config.get_stream_key()
     if key:
         masked = key[:4] + "*" * (len(key) - 8) + key[-4:] if len(key) > 8 else "****"
     else:
         masked = "(未設定)"
 
-    gdrive = config.get_gdrive_url() or "(未設定)"
-    bg_url = config.get_background_url() or "(未設定)"
+    gdrive = station_config.get_gdrive_url() or "(未設定)"
+    bg_url = station_config.get_background_url() or "(未設定)"
 
     embed = discord.Embed(title="現在の設定", color=0x00ff00)
     embed.add_field(name="配信先URL", value=f"`{url}`", inline=False)
+    backup_url = station_config.get_backup_stream_url()
+    if backup_url:
+        embed.add_field(name="予備の受信サーバー", value=f"`{backup_url}`", inline=False)
     embed.add_field(name="ストリームキー", value=f"`{masked}`", inline=False)
+    extra_outputs = station_config.get_extra_outputs()
+    if extra_outputs:
+        embed.add_field(
+            name="追加の配信先",
+            value="\n".join(f"{o['name']}: `{mask_output_url(o['url'])}`" for o in extra_outputs),
+            inline=False
+        )
     embed.add_field(name="楽曲フォルダ", value=f"`{gdrive}`", inline=False)
     embed.add_field(name="背景画像", value=f"`{bg_url}`", inline=False)
-    embed.add_field(name="設定状態", value="OK" if config.is_configured() else "未完了", inline=False)
+    embed.add_field(name="設定状態", value="OK" if station_config.is_configured() else "未完了", inline=False)
 
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -471,18 +727,22 @@ bot.tree.add_command(config_group)
 
 @bot.tree.command(name="sync", description="Google Driveから楽曲を同期")
 @is_allowed_channel()
-@app_commands.describe(url="Google Drive共有フォルダURL（省略時は保存済みURLを使用）")
-async def sync_command(interaction: discord.Interaction, url: str = None):
+@app_commands.describe(
+    url="Google Drive共有フォルダURL（省略時は保存済みURLを使用）",
+    prune="リモートで削除された楽曲をローカルからも削除"
+)
+async def sync_command(interaction: discord.Interaction, url: str = None, prune: bool = False):
     """Google Driveから楽曲を同期"""
     await interaction.response.defer()
 
-    from core.gdrive_sync import gdrive_sync
-    success, message, details = await gdrive_sync.sync(url)
+    gdrive_sync = _get_station(interaction).gdrive_sync
+    success, message, details = await gdrive_sync.sync(url, prune=prune)
 
     if success:
         # 詳細メッセージを作成
         embed = discord.Embed(title="📁 楽曲同期完了", color=0x00ff00)
         embed.add_field(name="曲数", value=f"{details.get('track_count', 0)}曲", inline=True)
+        embed.add_field(name="差分", value=gdrive_sync.format_diff_summary(details), inline=False)
         if details.get('normalized_count', 0) > 0:
             embed.add_field(
                 name="ノーマライズ",
@@ -498,21 +758,23 @@ async def sync_command(interaction: discord.Interaction, url: str = None):
 @is_allowed_channel()
 async def playlist_command(interaction: discord.Interaction):
     """楽曲一覧を表示"""
-    from core.gdrive_sync import gdrive_sync
+    station = _get_station(interaction)
+    gdrive_sync = station.gdrive_sync
+    track_index = station.track_index
 
-    tracks = gdrive_sync.get_tracks()
+    tracks = track_index.get_tracks()
     if not tracks:
         await interaction.response.send_message("楽曲がありません", ephemeral=True)
         return
 
     # 最大20曲表示
     display_tracks = tracks[:20]
-    track_list = "\n".join([f"{i+1}. {t}" for i, t in enumerate(display_tracks)])
+    track_list = "\n".join([f"{i+1}. {_format_track_line(t)}" for i, t in enumerate(display_tracks)])
 
     if len(tracks) > 20:
         track_list += f"\n... 他 {len(tracks) - 20} 曲"
 
-    embed = discord.Embed(title=f"楽曲一覧 ({len(tracks)}曲)", description=track_list, color=0x00ff00)
+    embed = discord.Embed(title=_format_playlist_title(tracks), description=track_list, color=0x00ff00)
 
     status = gdrive_sync.get_status()
     if status['last_sync']:
@@ -531,7 +793,7 @@ async def start_command(interaction: discord.Interaction):
     """配信を開始"""
     await interaction.response.defer()
 
-    from core.stream_manager import stream_manager
+    stream_manager = _get_station(interaction).stream_manager
     success, message = await stream_manager.start()
 
     if success:
@@ -546,7 +808,7 @@ async def stop_command(interaction: discord.Interaction):
     """配信を停止"""
     await interaction.response.defer()
 
-    from core.stream_manager import stream_manager
+    stream_manager = _get_station(interaction).stream_manager
     success, message = await stream_manager.stop()
 
     if success:
@@ -559,7 +821,7 @@ async def stop_command(interaction: discord.Interaction):
 @is_allowed_channel()
 async def skip_command(interaction: discord.Interaction):
     """次の曲へスキップ"""
-    from core.stream_manager import stream_manager
+    stream_manager = _get_station(interaction).stream_manager
 
     if stream_manager.skip():
         await interaction.response.send_message("⏭️ スキップ")
@@ -571,7 +833,7 @@ async def skip_command(interaction: discord.Interaction):
 @is_allowed_channel()
 async def now_command(interaction: discord.Interaction):
     """現在再生中の曲を表示"""
-    from core.stream_manager import stream_manager
+    stream_manager = _get_station(interaction).stream_manager
 
     status = stream_manager.get_status()
 
@@ -585,6 +847,8 @@ async def now_command(interaction: discord.Interaction):
         embed.add_field(name="曲名", value=track['title'], inline=False)
         if 'elapsed_formatted' in track:
             embed.add_field(name="再生時間", value=track['elapsed_formatted'], inline=True)
+        if 'remaining_formatted' in track:
+            embed.add_field(name="残り", value=f"{track['remaining_formatted']} / {track['duration_formatted']}", inline=True)
         await interaction.response.send_message(embed=embed)
     else:
         await interaction.response.send_message("再生中の曲がありません")
@@ -594,14 +858,15 @@ async def now_command(interaction: discord.Interaction):
 @is_allowed_channel()
 async def status_command(interaction: discord.Interaction):
     """配信状態を表示"""
-    from core.stream_manager import stream_manager
-    from core.gdrive_sync import gdrive_sync
+    station = _get_station(interaction)
+    stream_manager = station.stream_manager
+    gdrive_sync = station.gdrive_sync
 
     stream_status = stream_manager.get_status()
     sync_status = gdrive_sync.get_status()
 
     embed = discord.Embed(
-        title="SUNO Radio Lite",
+        title="SUNO Radio Lite" if station.is_main() else f"SUNO Radio Lite - {station.id}",
         color=0x00ff00 if stream_status['is_streaming'] else 0x808080
     )
 
@@ -620,6 +885,58 @@ async def status_command(interaction: discord.Interaction):
             value=stream_status['current_track']['title'],
             inline=False
         )
+        boundary = stream_status['current_track'].get('boundary_delay')
+        if boundary:
+            embed.add_field(
+                name="曲間待ち",
+                value=f"平均 {boundary['avg_ms']}ms / 最大 {boundary['max_ms']}ms",
+                inline=True
+            )
+
+    # 音声バッファ
+    audio_buffer = stream_status.get('audio_buffer')
+    if stream_status['is_streaming'] and audio_buffer:
+        embed.add_field(
+            name="音声バッファ",
+            value=(f"{int(audio_buffer['fill_ratio'] * 100)}% / "
+                   f"アンダーラン {audio_buffer['underrun_count']}回 ({audio_buffer['underrun_seconds']}秒) / "
+                   f"オーバーラン {audio_buffer['overrun_count']}回 ({audio_buffer['overrun_seconds']}秒)"),
+            inline=False
+        )
+
+    # A/V同期（映像をFIFOで送る場合は音声と映像のずれ、loopモードは実時間との差）
+    av_sync = stream_status.get('av_sync')
+    if av_sync:
+        if av_sync['drift_ms'] is not None:
+            av_value = f"ずれ {av_sync['drift_ms']}ms (最大 {av_sync['max_drift_ms']}ms)"
+        else:
+            av_value = f"音声 {av_sync['audio_offset_ms']:+}ms"
+        av_value += (f" / 無音補填 {av_sync['silence_insert_count']}回 ({av_sync['silence_insert_seconds']}秒)"
+                     f" / 映像補填 {av_sync['video_catchup_frames']}フレーム")
+        embed.add_field(name="A/V同期", value=av_value, inline=False)
+
+    # 配信先ごとの状態
+    outputs = stream_status.get('outputs')
+    if outputs:
+        embed.add_field(name="配信先", value=_format_outputs(outputs), inline=False)
+
+    if stream_status['is_streaming']:
+        embed.add_field(name="エンコード", value=_format_encoder(stream_status['encoder']), inline=False)
+
+    # 配信FFmpegの進捗（速度・ドロップ等の直近の推移）
+    telemetry = stream_status.get('telemetry')
+    if telemetry:
+        embed.add_field(name="エンコード状況", value=_format_telemetry(telemetry, detailed=True), inline=False)
+
+    # 出力の停止の検知（予備の受信サーバーを設定済み、または停止を検知した場合のみ）
+    watchdog = stream_status.get('output_watchdog')
+    if watchdog and watchdog['enabled'] and (watchdog['backup_configured'] or watchdog['stalls']):
+        embed.add_field(name="出力の監視", value=_format_output_watchdog(watchdog), inline=False)
+
+    # 直近の障害（検知・復旧時間）
+    incidents = stream_status.get('incidents')
+    if incidents:
+        embed.add_field(name="直近の障害", value=_format_incident(incidents[0]), inline=False)
 
     # 楽曲数
     embed.add_field(name="楽曲数", value=f"{sync_status['track_count']}曲", inline=True)
@@ -627,7 +944,7 @@ async def status_command(interaction: discord.Interaction):
     # 設定状態
     embed.add_field(
         name="設定",
-        value="✅ 完了" if config.is_configured() else "❌ 未完了",
+        value="✅ 完了" if station.config.is_configured() else "❌ 未完了",
         inline=True
     )
 
@@ -638,7 +955,7 @@ async def status_command(interaction: discord.Interaction):
 @is_allowed_channel()
 async def mode_command(interaction: discord.Interaction):
     """再生モードを切り替え"""
-    from core.audio_player import audio_player
+    audio_player = _get_station(interaction).audio_player
 
     new_mode = audio_player.toggle_playback_mode()
     emoji = "🔀" if audio_player.shuffle_mode else "📑"
@@ -656,7 +973,7 @@ async def background_command(interaction: discord.Interaction, url: str = None):
     """Google Driveから背景画像を同期"""
     await interaction.response.defer()
 
-    from core.gdrive_sync import gdrive_sync
+    gdrive_sync = _get_station(interaction).gdrive_sync
     success, message = await gdrive_sync.sync_background(url)
 
     if success:
@@ -673,6 +990,9 @@ async def background_command(interaction: discord.Interaction, url: str = None):
 @is_allowed_channel()
 async def system_command(interaction: discord.Interaction):
     """システム状態を表示"""
+    from core.scheduler import scheduler
+
+    station_config = _get_station(interaction).config
     await interaction.response.defer()
 
     try:
@@ -705,7 +1025,7 @@ async def system_command(interaction: discord.Interaction):
 
         # 楽曲フォルダのサイズ
         music_proc = await asyncio.create_subprocess_shell(
-            f"du -sh {config.MUSIC_DIR} 2>/dev/null | awk '{{print $1}}'",
+            f"du -sh {station_config.MUSIC_DIR} 2>/dev/null | awk '{{print $1}}'",
             stdout=asyncio.subprocess.PIPE
         )
         music_out, _ = await music_proc.communicate()
@@ -720,6 +1040,15 @@ async def system_command(interaction: discord.Interaction):
         embed.add_field(name="ディスク", value=disk, inline=True)
         embed.add_field(name="楽曲フォルダ", value=music_size, inline=True)
 
+        # 全局で共有するCPU予算の使用状況
+        cpu = scheduler.get_status()
+        embed.add_field(
+            name="CPU予算",
+            value=(f"配信 {cpu['realtime']} + ノーマライズ {cpu['batch']} / {cpu['budget']:g}コア"
+                   + (f"（待機 {cpu['waiting']}件）" if cpu['waiting'] else "")),
+            inline=True
+        )
+
         await interaction.followup.send(embed=embed)
 
     except Exception as e:
@@ -21,126 +21,245 @@ class Config:
     ASSETS_DIR = os.getenv('ASSETS_DIR', '/app/assets')
     DATA_DIR = os.getenv('DATA_DIR', '/app/data')
 
-    # Stream Settings (固定値 - シンプル化)
+    # 局（1プロセスで複数の配信を運用）
+    # STATIONS: 追加の局を「局ID:DiscordチャンネルID」のカンマ区切りで指定（例: jazz:123,lofi:456）
+    # 追加の局の楽曲・背景・状態は STATIONS_DIR/<局ID>/ 以下に保持
+    MAIN_STATION_ID = 'main'
+    STATIONS = os.getenv('STATIONS', '')
+    STATIONS_DIR = os.getenv('STATIONS_DIR', os.path.join(DATA_DIR, 'stations'))
+
+    # 全局で共有するCPU予算（コア数、0=自動: CPUコア数）
+    # 配信エンコード・デコードを優先し、ノーマライズは残りの範囲で実行
+    CPU_BUDGET = float(os.getenv('CPU_BUDGET', 0))
+
+    # Stream Settings (既定値 - 局ごとにエンコードプロファイルで上書き)
     STREAM_VIDEO_BITRATE = '500k'
+    STREAM_VIDEO_BUFSIZE = '1000k'
+    STREAM_PRESET = 'ultrafast'
     STREAM_AUDIO_BITRATE = '128k'
     STREAM_RESOLUTION = '854x480'
     STREAM_FPS = 15
 
+    # エンコードプロファイル（720p/480p/360p/270p/240p）
+    ENCODER_PROFILE = os.getenv('ENCODER_PROFILE', '480p')
+    # 適応エンコード（エンコード速度・CPU使用率・出力の遅れに応じて ENCODER_PROFILE を上限に段を切り替え）
+    ENCODER_ADAPTIVE = os.getenv('ENCODER_ADAPTIVE', 'false').lower() == 'true'
+    # 配信FFmpegのみの再起動（終了時も音声・映像の入力は止めずにFIFOへ再接続）
+    ENCODER_HOT_RESTART = os.getenv('ENCODER_HOT_RESTART', 'true').lower() == 'true'
+    # 再起動中の音声の扱い
+    # hold: リングバッファが満杯になったらデコードを待機し、再接続後に続きから送出
+    # drop: 実時間分を破棄し、再接続後は実時間どおりの位置から送出
+    ENCODER_RESTART_POLICY = os.getenv('ENCODER_RESTART_POLICY', 'hold')
+    # 出力の停止の検知（秒、配信FFmpegが動作したままこの秒数出力が進まなければ再起動、0=無効）
+    # 予備の受信サーバー（/config backup_url）が設定されていれば、再起動時に主・予備を切り替え
+    OUTPUT_STALL_SECONDS = float(os.getenv('OUTPUT_STALL_SECONDS', 20))
+    # 出力の開始の待機（秒、配信FFmpegの起動から最初の進捗までの上限、配信先への接続を含むため出力の停止とは別に長め）
+    OUTPUT_START_TIMEOUT_SECONDS = float(os.getenv('OUTPUT_START_TIMEOUT_SECONDS', 60))
+
+    # Video Mode
+    # rawvideo: 背景をFIFO経由で送り、配信FFmpegでH.264エンコード
+    # loop: 背景を一度だけH.264ループ動画にエンコードし、配信時は -c:v copy
+    VIDEO_MODE = os.getenv('VIDEO_MODE', 'rawvideo')
+    VIDEO_LOOP_SECONDS = 10
+
+    # Google Drive API（APIキー設定時はファイル一覧のサイズ・更新日時で差分同期、未設定時はgdown）
+    GDRIVE_API_KEY = os.getenv('GDRIVE_API_KEY', '')
+    GDRIVE_API_BASE = os.getenv('GDRIVE_API_BASE', 'https://www.googleapis.com')
+
+    # ダウンロードの同時実行数とリトライ回数
+    DOWNLOAD_CONCURRENCY = int(os.getenv('DOWNLOAD_CONCURRENCY', 4))
+    DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', 3))
+
     # Audio Settings
     SAMPLE_RATE = 48000
     CHANNELS = 2
 
+    # 楽曲ディレクトリの定期再走査間隔（秒、inotifyで検知できない変更の保険、0=無効）
+    LIBRARY_RECONCILE_SECONDS = int(os.getenv('LIBRARY_RECONCILE_SECONDS', 300))
+
+    # ノーマライズモード
+    # encode: 2パス目で再エンコードして元ファイルを置き換え
+    # measure: 測定のみ行い、再生時にゲイン（+リミッター）を適用（元ファイルは変更しない）
+    NORMALIZE_MODE = os.getenv('NORMALIZE_MODE', 'encode')
+
+    # ノーマライズ並列数（0=自動: CPU予算-1、実際の同時実行数はCPU予算の空きで制限）
+    NORMALIZE_WORKERS = int(os.getenv('NORMALIZE_WORKERS', 0))
+
+    # デコード済みPCMキャッシュの上限（MB、0=無効）
+    PCM_CACHE_MB = int(os.getenv('PCM_CACHE_MB', 0))
+
+    # 次の曲を先読みデコードする秒数（曲の残りがこの秒数以下で開始、0=無効）
+    PREFETCH_SECONDS = float(os.getenv('PREFETCH_SECONDS', 5))
+
+    # デコーダーとAudio FIFOの間のリングバッファ秒数
+    AUDIO_BUFFER_SECONDS = float(os.getenv('AUDIO_BUFFER_SECONDS', 2.0))
+
+    # 音声・映像の書き込みを実時間より先行させる秒数（配信FFmpegの入力キューに溜める量）
+    AV_SYNC_LEAD_SECONDS = float(os.getenv('AV_SYNC_LEAD_SECONDS', 0.5))
+
+    # A/Vのずれ補正の閾値（秒、音声がこれ以上遅れたら無音で補填、0=補正なし）
+    AV_DRIFT_THRESHOLD_SECONDS = float(os.getenv('AV_DRIFT_THRESHOLD_SECONDS', 0.5))
+
     # Gap between tracks
     TRACK_GAP_SECONDS = 2.0
 
+    # クロスフェード秒数（0=無効、有効時は曲間の無音の代わりに前後の曲を重ねる）
+    CROSSFADE_SECONDS = float(os.getenv('CROSSFADE_SECONDS', 0))
+
+    # メトリクス（Prometheus形式の /metrics を待ち受けるポート、0=無効）
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+    # 待ち受けるアドレス（デフォルトはローカルのみ、Docker等で外部から取得する場合は0.0.0.0）
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
     # Config file path
     CONFIG_FILE = os.path.join(DATA_DIR, 'config.json')
 
-    # Runtime config (loaded from config.json)
-    _runtime_config = {}
+    def __init__(self, station_id: str = None, channel_id: int = None):
+        """
+        Args:
+            station_id: 局ID（省略時はメイン局、指定時は STATIONS_DIR/<ID> 以下に楽曲・背景・状態を保持）
+            channel_id: 局を操作するDiscordチャンネルID（省略時は DISCORD_CHANNEL_ID）
+        """
+        self.STATION_ID = station_id or self.MAIN_STATION_ID
+        self.STATION_CHANNEL_ID = self.DISCORD_CHANNEL_ID if channel_id is None else channel_id
+        if station_id:
+            station_dir = os.path.join(self.STATIONS_DIR, station_id)
+            self.MUSIC_DIR = os.path.join(station_dir, 'music')
+            self.ASSETS_DIR = os.path.join(station_dir, 'assets')
+            self.DATA_DIR = station_dir
+            self.CONFIG_FILE = os.path.join(station_dir, 'config.json')
+
+        # Runtime config (loaded from config.json)
+        self._runtime_config = {}
 
-    @classmethod
-    async def load(cls):
+    async def load(self):
         """Load runtime config from config.json"""
-        if os.path.exists(cls.CONFIG_FILE):
+        if os.path.exists(self.CONFIG_FILE):
             try:
-                async with aiofiles.open(cls.CONFIG_FILE, 'r') as f:
+                async with aiofiles.open(self.CONFIG_FILE, 'r') as f:
                     content = await f.read()
-                    cls._runtime_config = json.loads(content)
-                    print(f"設定を読み込みました: {cls.CONFIG_FILE}", flush=True)
+                    self._runtime_config = json.loads(content)
+                    print(f"設定を読み込みました: {self.CONFIG_FILE}", flush=True)
             except Exception as e:
                 print(f"設定読み込みエラー: {e}", flush=True)
-                cls._runtime_config = {}
+                self._runtime_config = {}
         else:
-            cls._runtime_config = {}
+            self._runtime_config = {}
 
-    @classmethod
-    async def save(cls):
+    async def save(self):
         """Save runtime config to config.json"""
         try:
-            os.makedirs(os.path.dirname(cls.CONFIG_FILE), exist_ok=True)
-            async with aiofiles.open(cls.CONFIG_FILE, 'w') as f:
-                await f.write(json.dumps(cls._runtime_config, indent=2, ensure_ascii=False))
-            print(f"設定を保存しました: {cls.CONFIG_FILE}", flush=True)
+            os.makedirs(os.path.dirname(self.CONFIG_FILE), exist_ok=True)
+            async with aiofiles.open(self.CONFIG_FILE, 'w') as f:
+                await f.write(json.dumps(self._runtime_config, indent=2, ensure_ascii=False))
+            print(f"設定を保存しました: {self.CONFIG_FILE}", flush=True)
         except Exception as e:
             print(f"設定保存エラー: {e}", flush=True)
 
-    @classmethod
-    def get_stream_url(cls) -> str:
+    def get_stream_url(self) -> str:
         """Get stream URL from runtime config"""
-        return cls._runtime_config.get('stream_url', '')
+        return self._runtime_config.get('stream_url', '')
 
-    @classmethod
-    def set_stream_url(cls, url: str):
+    def set_stream_url(self, url: str):
         """Set stream URL"""
-        cls._runtime_config['stream_url'] = url
+        self._runtime_config['stream_url'] = url
 
-    @classmethod
-    def get_stream_key(cls) -> str:
+    def get_stream_key(self) -> str:
         """Get stream key from runtime config"""
-        return cls._runtime_config.get('stream_key', '')
+        return self._runtime_config.get('stream_key', '')
 
-    @classmethod
-    def set_stream_key(cls, key: str):
+    def set_stream_key(self, key: str):
         """Set stream key"""
-        cls._runtime_config['stream_key'] = key
+        self._runtime_config['stream_key'] = key
+
+    def get_backup_stream_url(self) -> str:
+        """Get backup ingest URL (used with the same stream key when the main output stalls)"""
+        return self._runtime_config.get('backup_stream_url', '')
 
-    @classmethod
-    def get_gdrive_url(cls) -> str:
+    def set_backup_stream_url(self, url: str):
+        """Set backup ingest URL (empty to clear)"""
+        self._runtime_config['backup_stream_url'] = url
+
+    def get_gdrive_url(self) -> str:
         """Get Google Drive URL from runtime config"""
-        return cls._runtime_config.get('gdrive_url', '')
+        return self._runtime_config.get('gdrive_url', '')
 
-    @classmethod
-    def set_gdrive_url(cls, url: str):
+    def set_gdrive_url(self, url: str):
         """Set Google Drive URL"""
-        cls._runtime_config['gdrive_url'] = url
+        self._runtime_config['gdrive_url'] = url
 
-    @classmethod
-    def get_last_sync(cls) -> str:
+    def get_last_sync(self) -> str:
         """Get last sync timestamp"""
-        return cls._runtime_config.get('last_sync', '')
+        return self._runtime_config.get('last_sync', '')
 
-    @classmethod
-    def set_last_sync(cls, timestamp: str):
+    def set_last_sync(self, timestamp: str):
         """Set last sync timestamp"""
-        cls._runtime_config['last_sync'] = timestamp
+        self._runtime_config['last_sync'] = timestamp
 
-    @classmethod
-    def get_background_url(cls) -> str:
+    def get_background_url(self) -> str:
         """Get background image Google Drive URL"""
-        return cls._runtime_config.get('background_url', '')
+        return self._runtime_config.get('background_url', '')
 
-    @classmethod
-    def set_background_url(cls, url: str):
+    def set_background_url(self, url: str):
         """Set background image Google Drive URL"""
-        cls._runtime_config['background_url'] = url
+        self._runtime_config['background_url'] = url
 
-    @classmethod
-    def get_rtmp_output_url(cls) -> str:
-        """Get full RTMP output URL"""
-        url = cls.get_stream_url()
-        key = cls.get_stream_key()
+    def get_rtmp_output_url(self, backup: bool = False) -> str:
+        """Get full RTMP output URL (backup ingest if requested and configured)"""
+        url = (backup and self.get_backup_stream_url()) or self.get_stream_url()
+        key = self.get_stream_key()
         if url and key:
             # Remove trailing slash if present
             url = url.rstrip('/')
             return f"{url}/{key}"
         return ''
 
-    @classmethod
-    def is_configured(cls) -> bool:
+    def get_extra_outputs(self) -> list:
+        """Get additional output destinations [{'name', 'url'}]"""
+        return list(self._runtime_config.get('extra_outputs', []))
+
+    def set_extra_output(self, name: str, url: str):
+        """Add or replace an additional output destination"""
+        outputs = [o for o in self.get_extra_outputs() if o['name'] != name]
+        outputs.append({'name': name, 'url': url})
+        self._runtime_config['extra_outputs'] = outputs
+
+    def remove_extra_output(self, name: str) -> bool:
+        """Remove an additional output destination"""
+        outputs = self.get_extra_outputs()
+        remaining = [o for o in outputs if o['name'] != name]
+        self._runtime_config['extra_outputs'] = remaining
+        return len(remaining) != len(outputs)
+
+    def get_output_destinations(self, backup: bool = False) -> list:
+        """Get all output destinations (main RTMP output first, on the backup ingest if requested)"""
+        destinations = []
+        main_url = self.get_rtmp_output_url(backup)
+        if main_url:
+            destinations.append({'name': 'main', 'url': main_url})
+        destinations.extend(self.get_extra_outputs())
+        return destinations
+
+    def is_configured(self) -> bool:
         """Check if stream is configured"""
-        return bool(cls.get_stream_url() and cls.get_stream_key())
+        return bool(self.get_output_destinations())
+
+    def apply_encoder_profile(self, profile: dict):
+        """Apply encoder profile to this station's stream settings"""
+        self.STREAM_RESOLUTION = profile['resolution']
+        self.STREAM_FPS = profile['fps']
+        self.STREAM_VIDEO_BITRATE = profile['video_bitrate']
+        self.STREAM_VIDEO_BUFSIZE = f"{int(profile['video_bitrate'].rstrip('k')) * 2}k"
+        self.STREAM_PRESET = profile['preset']
 
-    @classmethod
-    def get_background_path(cls) -> str:
+    def get_background_path(self) -> str:
         """Get background image path"""
         # Try common image extensions
         for ext in ['jpg', 'jpeg', 'png']:
-            path = os.path.join(cls.ASSETS_DIR, f'background.{ext}')
+            path = os.path.join(self.ASSETS_DIR, f'background.{ext}')
             if os.path.exists(path):
                 return path
-        return os.path.join(cls.ASSETS_DIR, 'background.jpg')
+        return os.path.join(self.ASSETS_DIR, 'background.jpg')
 
 
 config = Config()
@@ -4,24 +4,53 @@ FIFOベースの音声処理
 """
 
 import asyncio
+import bisect
+import errno
+import fcntl
+import json
 import os
 import random
-import subprocess
 import threading
 import time
-from config import config
+from collections import deque
+from datetime import datetime
+from core import crossfade
+from core.metrics import metrics
+from core.pcm_cache import pcm_cache
+from core.pcm_source import CachedSource, DecoderSource
+from core.ring_buffer import PCMRingBuffer
+from core.scheduler import scheduler
+from core.track_index import format_duration
 
 
 # タイムアウト設定
-MAX_TRACK_DURATION = 600  # 1曲の最大再生時間（秒）= 10分
+MAX_TRACK_DURATION = 600  # 1曲の最大再生時間（秒）= 10分（長さ不明の場合）
+TRACK_DURATION_MARGIN = 30  # 長さが分かる場合の猶予（秒）
 DATA_TIMEOUT = 30  # データ受信タイムアウト（秒）
 
+# 再生位置の保存間隔（秒）
+CHECKPOINT_SECONDS = 5
+# 再開位置がこれより手前なら曲の先頭から再生（秒）
+RESUME_MIN_SECONDS = 1
+
 # PCMフォーマット定数
 SAMPLE_RATE = 48000
 CHANNELS = 2
 BYTES_PER_SAMPLE = 2  # s16le
 BYTES_PER_SECOND = SAMPLE_RATE * CHANNELS * BYTES_PER_SAMPLE
 
+# FIFOへの書き込み単位
+WRITE_CHUNK_SIZE = 65536
+
+# ペーシング時の最小書き込み単位（10ms）
+MIN_PACED_WRITE = BYTES_PER_SECOND // 100
+
+# 配信FFmpegがFIFOを開くまでの確認間隔（秒）
+FIFO_OPEN_POLL_SECONDS = 0.02
+
+# パイプの容量を取得できない場合（Linuxのデフォルト）
+DEFAULT_PIPE_CAPACITY = 65536
+
 
 class AudioPlayer:
     """FIFOベースのオーディオプレイヤー"""
@@ -29,23 +58,59 @@ class AudioPlayer:
     # BrokenPipe連続検出の閾値（この回数連続でBrokenPipeが発生したらFFmpegクラッシュと判定）
     BROKEN_PIPE_THRESHOLD = 3
 
-    def __init__(self):
-        self.fifo_path = os.path.join(config.DATA_DIR, 'audio_fifo')
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+        self.fifo_path = os.path.join(self.config.DATA_DIR, 'audio_fifo')
         self.is_playing = False
         self.current_track = None
         self.playlist = []
         self.playlist_index = 0
         self.shuffle_mode = False  # False=ファイル名順, True=シャッフル
+        # プレイリストの差分更新用（デコードスレッドと同期処理の両方から操作）
+        self._playlist_lock = threading.Lock()
+        self._playlist_set = set()
+        # 削除済み（カーソルが到達した時、または周回の終わりに取り除く）
+        self._removed = set()
+        # 再生位置の保存（再起動・復旧時に同じ曲の同じ位置から再開）
+        self._state_file = os.path.join(self.config.DATA_DIR, 'playback_state.json')
+        self._order_file = os.path.join(self.config.DATA_DIR, 'playlist_order.json')
+        self._playlist_dirty = False
+        # (トラック, 先頭からリングバッファへ書き込んだバイト数)
+        self._position = None
+        # 次に再生する曲の再開位置 (トラック, バイト)
+        self._resume = None
         self._stop_requested = False
         self._skip_requested = False
-        self._decoder_process = None
+        self._current_source = None
+        self._prefetched_source = None
         self._writer_thread = None
+        # 書き込みスレッドの終了（イベントループ上で待機）
+        self._writer_done = None
+        self._producer_thread = None
+        self._ring = None
         self._fifo_fd = None
+        # FIFOのパイプ容量（書き込み済みで配信FFmpegが未読の最大量）
+        self._pipe_capacity = DEFAULT_PIPE_CAPACITY
         self._track_start_time = None
+        self._current_duration = None
         self._last_data_time = None
         # BrokenPipe連続検出用カウンター
         self._broken_pipe_count = 0
         self._ffmpeg_crash_detected = False
+        # 配信FFmpegのみの再起動（切断中も再生を続け、次の配信FFmpegに再接続）
+        self._detached_since = None
+        self._detached_dropped = 0
+        self.reconnect_count = 0
+        self.last_reconnect_seconds = None
+        # 曲境界の待ち時間（秒）
+        self._boundary_delays = deque(maxlen=100)
+        # メトリクス（書き込みごとに更新するため値を保持）
+        self._metric_fifo_bytes = metrics.fifo_bytes.labels(station.id, 'audio')
+        self._metric_broken_pipes = metrics.broken_pipes.labels(station.id, 'audio')
+        self._metric_track_gap = metrics.track_gap.labels(station.id)
+        # クロスフェード用に保留した前の曲の末尾PCM
+        self._fade_tail = None
 
     def _check_broken_pipe_threshold(self):
         """BrokenPipeの連続発生をチェックし、閾値を超えたらFFmpegクラッシュとして検出"""
@@ -55,6 +120,7 @@ class AudioPlayer:
                 print(f"FFmpegクラッシュ検出: BrokenPipeが{self._broken_pipe_count}回連続発生", flush=True)
                 # is_playingをFalseにしてstream_managerに通知
                 self.is_playing = False
+                self.station.supervisor.notify('AudioPlayer', 'BrokenPipe')
 
     def is_ffmpeg_crash_detected(self) -> bool:
         """FFmpegクラッシュが検出されたかどうかを返す"""
@@ -72,6 +138,11 @@ class AudioPlayer:
         os.mkfifo(self.fifo_path)
         print(f"FIFO作成: {self.fifo_path}", flush=True)
 
+    def renew_fifo(self):
+        """FIFOを作り直す（配信FFmpegの再起動時、前回の読み残しを次の配信FFmpegに渡さないため）"""
+        if self.is_playing:
+            self._create_fifo()
+
     def _cleanup_fifo(self):
         """FIFOを削除"""
         if os.path.exists(self.fifo_path):
@@ -81,17 +152,23 @@ class AudioPlayer:
                 pass
 
     def _load_playlist(self) -> bool:
-        """楽曲ディレクトリからプレイリストを読み込み"""
-        if not os.path.exists(config.MUSIC_DIR):
-            print(f"楽曲ディレクトリが見つかりません: {config.MUSIC_DIR}", flush=True)
+        """トラックインデックスからプレイリストを読み込み"""
+        if not os.path.exists(self.config.MUSIC_DIR):
+            print(f"楽曲ディレクトリが見つかりません: {self.config.MUSIC_DIR}", flush=True)
             return False
 
         tracks = []
-        supported_ext = {'.mp3', '.wav', '.flac', '.m4a', '.ogg'}
+        unplayable = 0
+
+        for entry in self.station.track_index.get_tracks():
+            # ffprobeで音声ストリームが確認できない楽曲は除外
+            if not self.station.track_index.is_playable(entry):
+                unplayable += 1
+                continue
+            tracks.append(os.path.join(self.config.MUSIC_DIR, entry['name']))
 
-        for file in os.listdir(config.MUSIC_DIR):
-            if os.path.splitext(file)[1].lower() in supported_ext:
-                tracks.append(os.path.join(config.MUSIC_DIR, file))
+        if unplayable:
+            print(f"再生できない楽曲を除外: {unplayable}曲", flush=True)
 
         if not tracks:
             print("楽曲がありません", flush=True)
@@ -107,71 +184,277 @@ class AudioPlayer:
 
         self.playlist = tracks
         self.playlist_index = 0
+        self._playlist_set = set(tracks)
+        self._removed = set()
+        self._playlist_dirty = True
 
         return True
 
+    def _purge_removed(self):
+        """削除済みトラックをまとめて取り除く（周回の終わり・並べ替え時）"""
+        if not self._removed:
+            return
+        self.playlist = [track for track in self.playlist if track not in self._removed]
+        self._playlist_set -= self._removed
+        self._removed.clear()
+
+    def _end_of_rotation(self):
+        """プレイリストの終端（シャッフル時は再シャッフル）"""
+        self._purge_removed()
+        if self.shuffle_mode:
+            print("プレイリスト終端、再シャッフル", flush=True)
+            random.shuffle(self.playlist)
+        else:
+            print("プレイリスト終端、最初から再生", flush=True)
+        self.playlist_index = 0
+        self._playlist_dirty = True
+
+    def _skip_removed(self):
+        """カーソル位置の削除済みトラックを取り除く"""
+        while self.playlist:
+            if self.playlist_index >= len(self.playlist):
+                self._end_of_rotation()
+                continue
+            track = self.playlist[self.playlist_index]
+            if track not in self._removed:
+                return
+            del self.playlist[self.playlist_index]
+            self._playlist_set.discard(track)
+            self._removed.discard(track)
+
+    def _peek_next_track(self) -> str:
+        """次に再生するトラックを取得（インデックスは進めない）"""
+        with self._playlist_lock:
+            count = len(self.playlist)
+            for offset in range(count):
+                track = self.playlist[(self.playlist_index + offset) % count]
+                if track not in self._removed:
+                    return track
+            return None
+
     def _get_next_track(self) -> str:
         """次のトラックを取得"""
-        if not self.playlist:
-            if not self._load_playlist():
-                return None
+        with self._playlist_lock:
+            self._skip_removed()
+            if not self.playlist:
+                if not self._load_playlist():
+                    return None
+
+            track = self.playlist[self.playlist_index]
+            self.playlist_index += 1
+
+            if self.playlist_index >= len(self.playlist):
+                self._end_of_rotation()
+
+            return track
+
+    def _insert_track(self, track: str):
+        """
+        未再生の範囲にトラックを追加（再生位置と他の曲の再生順は変えない）
 
-        track = self.playlist[self.playlist_index]
-        self.playlist_index += 1
+        シャッフル時は残りのランダムな位置、ファイル名順は名前順の位置
+        （既に通過した位置なら次の周回で再生）
+        """
+        if self.shuffle_mode:
+            position = random.randint(self.playlist_index, len(self.playlist))
+        else:
+            position = bisect.bisect_left(self.playlist, track)
+            if position < self.playlist_index:
+                self.playlist_index += 1
+        self.playlist.insert(position, track)
+        self._playlist_set.add(track)
+
+    def merge_tracks(self, added: list, removed: list):
+        """
+        トラックインデックスの差分をプレイリストに反映（変更分のみ、再シャッフル・位置のリセットなし）
+
+        Args:
+            added: 再生可能になった楽曲名
+            removed: 削除された（再生できなくなった）楽曲名
+        """
+        with self._playlist_lock:
+            if not self.playlist:
+                # 未読み込みなら次回の読み込みで反映
+                return
+
+            removed_count = 0
+            for name in removed:
+                track = os.path.join(self.config.MUSIC_DIR, name)
+                if track in self._playlist_set and track not in self._removed:
+                    self._removed.add(track)
+                    removed_count += 1
+
+            added_count = 0
+            for name in added:
+                track = os.path.join(self.config.MUSIC_DIR, name)
+                if track in self._removed:
+                    # 削除後に再追加された場合は元の位置のまま残す
+                    self._removed.discard(track)
+                    added_count += 1
+                elif track not in self._playlist_set:
+                    self._insert_track(track)
+                    added_count += 1
+
+            total = len(self.playlist) - len(self._removed)
+            if added_count or removed_count:
+                self._playlist_dirty = True
+
+        if added_count or removed_count:
+            print(f"プレイリスト更新: +{added_count}曲 / -{removed_count}曲 → {total}曲（再生位置を維持）", flush=True)
+
+    # --- 再生位置の保存・復元 ---
+
+    def _get_heard_position(self) -> tuple:
+        """
+        配信FFmpegに渡し終えた再生位置 (トラック, バイト)
+
+        リングバッファに書き込んだ位置から未送出の分を差し引き、さらにFIFOへの先行書き込み分
+        （メディアクロックの先行分 AV_SYNC_LEAD_SECONDS とパイプ容量）を差し引く。
+        配信FFmpegが実際に読んだ位置は分からないため、再開時は最大で先行分だけ聞き直す側に寄せる
+        """
+        position = self._position
+        if not position:
+            return None
+        track, written = position
+        buffered = self._ring.get_stats()['fill_bytes'] if self._ring else 0
+        ahead = int(self.config.AV_SYNC_LEAD_SECONDS * BYTES_PER_SECOND) + self._pipe_capacity
+        offset = max(0, written - buffered - ahead)
+        return track, offset - offset % (CHANNELS * BYTES_PER_SAMPLE)
+
+    @staticmethod
+    def _write_json(path: str, data: dict):
+        """一時ファイルに書き込んでから置き換え（書き込み途中で落ちても壊れたファイルを残さない）"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _save_checkpoint(self):
+        """再生中の曲・位置を保存（再生順は変更があった時のみ）"""
+        position = self._get_heard_position()
+        with self._playlist_lock:
+            if not self.playlist:
+                return
+            # 削除済みも含めたまま保存（復元時に再生できない曲として除外）
+            order = list(self.playlist) if self._playlist_dirty else None
+            self._playlist_dirty = False
+            index = self.playlist_index
+
+        state = {
+            'track': os.path.relpath(position[0], self.config.MUSIC_DIR) if position else None,
+            'offset_bytes': position[1] if position else 0,
+            'playlist_index': index,
+            'shuffle_mode': self.shuffle_mode,
+            'timestamp': datetime.now().isoformat(),
+        }
+        try:
+            if order is not None:
+                self._write_json(self._order_file, {
+                    'playlist': [os.path.relpath(track, self.config.MUSIC_DIR) for track in order]
+                })
+            self._write_json(self._state_file, state)
+        except (OSError, ValueError) as e:
+            if order is not None:
+                self._playlist_dirty = True
+            print(f"再生位置の保存エラー: {e}", flush=True)
+
+    def _load_checkpoint(self) -> tuple:
+        """保存した再生位置と再生順を読み込み（なければNone）"""
+        try:
+            with open(self._state_file, 'r') as f:
+                state = json.load(f)
+            with open(self._order_file, 'r') as f:
+                order = json.load(f)['playlist']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"再生位置の読み込みエラー: {e}", flush=True)
+            return None
+        return state, order
 
-        if self.playlist_index >= len(self.playlist):
-            if self.shuffle_mode:
-                print("プレイリスト終端、再シャッフル", flush=True)
-                random.shuffle(self.playlist)
-            else:
-                print("プレイリスト終端、最初から再生", flush=True)
-            self.playlist_index = 0
+    def _restore_checkpoint(self):
+        """
+        読み込んだプレイリストに前回の再生順・再生位置を反映
 
-        return track
+        再生できなくなった曲は除外し、新しく追加された曲は未再生の範囲に追加
+        """
+        checkpoint = self._load_checkpoint()
+        if not checkpoint:
+            return
+        state, order = checkpoint
+
+        with self._playlist_lock:
+            available = self._playlist_set
+            saved_index = state.get('playlist_index', 0)
+            tracks = []
+            index = None
+            seen = set()
+            for position, name in enumerate(order):
+                if position == saved_index:
+                    index = len(tracks)
+                track = os.path.join(self.config.MUSIC_DIR, name)
+                if track in available and track not in seen:
+                    tracks.append(track)
+                    seen.add(track)
+            if not tracks:
+                return
+
+            self.shuffle_mode = state.get('shuffle_mode', self.shuffle_mode)
+            self.playlist = tracks
+            self.playlist_index = index if index is not None and index < len(tracks) else 0
+            self._playlist_set = seen
+            for track in sorted(available - seen):
+                self._insert_track(track)
+
+            # 再生中だった曲から再開（リングバッファ分だけ手前に戻した位置）
+            resume_track = state.get('track')
+            if resume_track:
+                track = os.path.join(self.config.MUSIC_DIR, resume_track)
+                if track in seen:
+                    self.playlist_index = self.playlist.index(track)
+                    offset = int(state.get('offset_bytes', 0))
+                    offset -= offset % (CHANNELS * BYTES_PER_SAMPLE)
+                    if offset >= BYTES_PER_SECOND * RESUME_MIN_SECONDS:
+                        self._resume = (track, offset)
+            self._playlist_dirty = True
 
-    def _write_silence(self, fifo_fd: int, duration_seconds: float) -> bool:
-        """無音をFIFOに書き込み（曲間のギャップ用）"""
+        mode_name = "シャッフル" if self.shuffle_mode else "ファイル名順"
+        print(f"再生順を復元: {self.playlist_index + 1}/{len(self.playlist)}曲目から（{mode_name}）", flush=True)
+
+    def _write_silence(self, duration_seconds: float) -> bool:
+        """無音をバッファに書き込み（曲間のギャップ用）"""
         if duration_seconds <= 0:
             return True
 
         total_bytes = int(BYTES_PER_SECOND * duration_seconds)
-        chunk_size = 4096
-        silence_chunk = bytes(chunk_size)
+        total_bytes -= total_bytes % (CHANNELS * BYTES_PER_SAMPLE)
+        silence_chunk = bytes(WRITE_CHUNK_SIZE)
 
-        try:
-            bytes_written = 0
-            while bytes_written < total_bytes:
-                if self._stop_requested or self._skip_requested:
-                    return False
+        bytes_written = 0
+        while bytes_written < total_bytes:
+            if self._stop_requested or self._skip_requested:
+                return False
 
-                write_size = min(chunk_size, total_bytes - bytes_written)
-                os.write(fifo_fd, silence_chunk[:write_size])
-                bytes_written += write_size
+            write_size = min(WRITE_CHUNK_SIZE, total_bytes - bytes_written)
+            if not self._write_pcm(silence_chunk[:write_size]):
+                return False
+            bytes_written += write_size
 
-            # 成功したらBrokenPipeカウンターをリセット
-            self._broken_pipe_count = 0
-            return True
-        except (BrokenPipeError, OSError) as e:
-            self._broken_pipe_count += 1
-            print(f"無音書き込みエラー: {e} (連続{self._broken_pipe_count}回)", flush=True)
-            self._check_broken_pipe_threshold()
-            return False
+        return True
 
-    def _decode_and_write(self, track_path: str, fifo_fd: int) -> bool:
-        """トラックをデコードしてFIFOに書き込み"""
-        import select
+    def _build_decoder_command(self, track_path: str, audio_filter: str = None, start_seconds: float = 0) -> list:
+        """デコード用のFFmpegコマンドを構築（start_seconds指定時は曲の途中から）"""
+        cmd = ['ffmpeg']
+        if start_seconds > 0:
+            # 入力側でシーク（先頭からデコードせずに目的の位置へ移動）
+            cmd += ['-ss', f"{start_seconds:.3f}"]
+        cmd += ['-i', track_path, '-vn']
 
-        track_name = os.path.basename(track_path)
-        print(f"再生中: {track_name}", flush=True)
-        self.current_track = track_name
-
-        current_time = time.time()
-        self._track_start_time = current_time
-        self._last_data_time = current_time
+        # 測定のみモードのトラックは再生時にゲインを適用
+        if audio_filter:
+            cmd += ['-af', audio_filter]
 
-        cmd = [
-            'ffmpeg',
-            '-i', track_path,
+        cmd += [
             '-f', 's16le',
             '-acodec', 'pcm_s16le',
             '-ar', str(SAMPLE_RATE),
@@ -180,15 +463,145 @@ class AudioPlayer:
             'pipe:1'
         ]
 
-        try:
-            self._decoder_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.DEVNULL
+        return cmd
+
+    def _open_source(self, track_path: str, start_offset: int = 0):
+        """
+        トラックのPCMソースを開いて開始（キャッシュ済みならmmap、なければデコーダー）
+
+        Args:
+            start_offset: 曲の途中から再生する場合の開始位置（バイト、フレーム境界）
+        """
+
+        audio_filter = self.station.gdrive_sync.get_playback_filter(track_path)
+
+        cached = pcm_cache.open(track_path, audio_filter)
+        if cached:
+            source = CachedSource(track_path, cached, start_offset)
+        else:
+            # デコード中はCPU予算を予約（全局のノーマライズに回す分を減らす）
+            token = scheduler.reserve(self.station.id, 'decode', scheduler.DECODE_COST)
+            source = DecoderSource(
+                track_path,
+                self._build_decoder_command(track_path, audio_filter, start_offset / BYTES_PER_SECOND),
+                int(BYTES_PER_SECOND * max(self._get_prefetch_seconds(), 0)),
+                # 途中からのデコードはキャッシュしない（曲全体ではないため）
+                pcm_cache.begin_write(track_path, audio_filter) if not start_offset else None,
+                on_exit=lambda: scheduler.release(token),
+                start_offset=start_offset
             )
 
-            fd = self._decoder_process.stdout.fileno()
+        source.start()
+        return source
+
+    def _take_source(self, track_path: str):
+        """先読み済みのソースがあれば使用し、なければ新規に開く（再開位置があればそこから）"""
+        resume, self._resume = self._resume, None
+        if resume and resume[0] == track_path:
+            self._close_prefetched()
+            print(f"再生位置を復元: {os.path.basename(track_path)}"
+                  f"（{format_duration(resume[1] / BYTES_PER_SECOND)}から）", flush=True)
+            return self._open_source(track_path, resume[1])
+
+        prefetched = self._prefetched_source
+        self._prefetched_source = None
+
+        if prefetched:
+            if prefetched.track_path == track_path:
+                return prefetched
+            # 再生順が変わった場合は破棄
+            prefetched.close()
+
+        return self._open_source(track_path)
+
+    def _get_crossfade_bytes(self) -> int:
+        """クロスフェード長（バイト、フレーム境界に揃える、無効時は0）"""
+        if self.config.CROSSFADE_SECONDS <= 0 or not crossfade.is_available():
+            return 0
+        frames = int(SAMPLE_RATE * self.config.CROSSFADE_SECONDS)
+        return frames * CHANNELS * BYTES_PER_SAMPLE
+
+    def _get_prefetch_seconds(self) -> float:
+        """先読み開始の残り秒数（クロスフェード時は重なり分を確保）"""
+        if self.config.CROSSFADE_SECONDS > 0 and crossfade.is_available():
+            return max(self.config.PREFETCH_SECONDS, self.config.CROSSFADE_SECONDS + 1)
+        return self.config.PREFETCH_SECONDS
+
+    def _maybe_prefetch(self, source):
+        """現在の曲の終盤で次の曲のデコードを先行開始"""
+        prefetch_seconds = self._get_prefetch_seconds()
+        if self._prefetched_source or prefetch_seconds <= 0:
+            return
+
+        if not source.is_near_end(int(BYTES_PER_SECOND * prefetch_seconds)):
+            return
 
+        next_track = self._peek_next_track()
+        if not next_track:
+            return
+
+        try:
+            self._prefetched_source = self._open_source(next_track)
+        except Exception as e:
+            print(f"先読みエラー: {e}", flush=True)
+
+    def _close_prefetched(self):
+        """先読み中のソースを破棄"""
+        prefetched = self._prefetched_source
+        self._prefetched_source = None
+        if prefetched:
+            prefetched.close()
+
+    def _record_boundary_delay(self, delay: float):
+        """曲境界での待ち時間（ギャップ後、次の曲の最初のデータまで）を記録"""
+        self._boundary_delays.append(delay)
+        self._metric_track_gap.observe(delay)
+
+    def _write_pcm(self, data) -> bool:
+        """PCMをリングバッファに書き込み（満杯なら空くまで待機）"""
+        return self._ring.write(data)
+
+    def _play_track(self, source, fade_tail: bytes = None) -> bool:
+        """
+        トラックのPCMソースをリングバッファに書き込み
+
+        Args:
+            source: PCMソース
+            fade_tail: 前の曲の末尾PCM（クロスフェードで先頭とミックス）
+        """
+        boundary_start = time.monotonic()
+        self._fade_tail = None
+
+        # クロスフェード有効時は末尾を保留し、次の曲の先頭とミックスする
+        hold_bytes = self._get_crossfade_bytes()
+        pending = bytearray()
+        crossfader = crossfade.Crossfader(fade_tail) if fade_tail else None
+        finished = False
+
+        track_name = os.path.basename(source.track_path)
+        print(f"再生中: {track_name}", flush=True)
+        self.current_track = track_name
+
+        # 長さが分かる場合はそれに合わせてタイムアウト（不明なら上限値）
+        self._current_duration = self.station.track_index.get_duration(source.track_path)
+        if self._current_duration:
+            max_duration = self._current_duration + TRACK_DURATION_MARGIN
+        else:
+            max_duration = MAX_TRACK_DURATION
+
+        # 途中から再生する場合は経過時間・タイムアウトを開始位置の分だけ進める
+        position = source.start_offset
+        self._position = (source.track_path, position)
+
+        current_time = time.time()
+        self._track_start_time = current_time - position / BYTES_PER_SECOND
+        self._last_data_time = current_time
+        self._current_source = source
+
+        first_data = True
+        data = None
+
+        try:
             while True:
                 if self._stop_requested or self._skip_requested:
                     break
@@ -198,7 +611,7 @@ class AudioPlayer:
                 elapsed = current_time - self._track_start_time
                 data_idle = current_time - self._last_data_time
 
-                if elapsed > MAX_TRACK_DURATION:
+                if elapsed > max_duration:
                     print(f"トラックタイムアウト、自動スキップ", flush=True)
                     break
 
@@ -206,94 +619,281 @@ class AudioPlayer:
                     print(f"データ受信タイムアウト、自動スキップ", flush=True)
                     break
 
-                ready, _, _ = select.select([fd], [], [], 0.1)
-                if not ready:
-                    if self._decoder_process.poll() is not None:
-                        break
-                    continue
+                self._maybe_prefetch(source)
 
-                data = os.read(fd, 4096)
+                data = source.read(WRITE_CHUNK_SIZE, timeout=0.5)
+                if data is None:
+                    continue
                 if not data:
+                    finished = True
                     break
 
-                self._last_data_time = time.time()
+                if first_data:
+                    self._record_boundary_delay(time.monotonic() - boundary_start)
+                    if source.spawn_time is not None and source.first_byte_time is not None:
+                        kind = 'cache' if isinstance(source, CachedSource) else 'decoder'
+                        metrics.decoder_first_byte.labels(self.station.id, kind).observe(
+                            source.first_byte_time - source.spawn_time)
+                    first_data = False
 
-                try:
-                    os.write(fifo_fd, data)
-                    # 成功したらBrokenPipeカウンターをリセット
-                    self._broken_pipe_count = 0
-                except (BrokenPipeError, OSError):
-                    self._broken_pipe_count += 1
-                    self._check_broken_pipe_threshold()
-                    break
+                self._last_data_time = time.time()
 
-            # プロセスを確実に終了
-            if self._decoder_process.poll() is None:
-                self._decoder_process.kill()
-            self._decoder_process.wait()
-            self._decoder_process = None
+                if crossfader:
+                    data = crossfader.mix(data)
 
-            self._track_start_time = None
-            self._last_data_time = None
+                if hold_bytes:
+                    pending += data
+                    out_len = len(pending) - hold_bytes
+                    out_len -= out_len % (CHANNELS * BYTES_PER_SAMPLE)
+                    if out_len <= 0:
+                        continue
+                    data = bytes(pending[:out_len])
+                    del pending[:out_len]
 
-            return not (self._stop_requested or self._skip_requested)
+                if not self._write_pcm(data):
+                    break
+                position += len(data)
+                self._position = (source.track_path, position)
+
+            if finished and not (self._stop_requested or self._skip_requested):
+                # 次の曲が先に終わった場合は前の曲の残りをフェードアウト
+                if hold_bytes:
+                    if crossfader and not crossfader.done:
+                        pending += crossfader.flush()
+                    out_len = max(0, len(pending) - hold_bytes)
+                    out_len -= out_len % (CHANNELS * BYTES_PER_SAMPLE)
+                    if out_len and not self._write_pcm(bytes(pending[:out_len])):
+                        pending.clear()
+                    self._fade_tail = bytes(pending[out_len:]) or None
+                elif crossfader and not crossfader.done:
+                    self._write_pcm(crossfader.flush())
 
         except Exception as e:
             print(f"デコードエラー: {e}", flush=True)
-            if self._decoder_process:
-                try:
-                    self._decoder_process.kill()
-                    self._decoder_process.wait()
-                except:
-                    pass
-                self._decoder_process = None
-            return False
+        finally:
+            data = None
+            self._current_source = None
+            source.close()
+            self._track_start_time = None
+            self._last_data_time = None
 
-    def _writer_loop(self):
-        """書き込みスレッドのメインループ"""
-        try:
-            print("FIFO書き込み待機中...", flush=True)
-            self._fifo_fd = os.open(self.fifo_path, os.O_WRONLY)
-            print("FIFO接続完了", flush=True)
+        return not (self._stop_requested or self._skip_requested)
 
+    def _producer_loop(self):
+        """デコードスレッドのメインループ（トラック・無音・クロスフェードをバッファへ）"""
+        try:
             while self.is_playing and not self._stop_requested and not self._ffmpeg_crash_detected:
                 track = self._get_next_track()
                 if not track:
                     print("再生可能なトラックがありません", flush=True)
+                    self.is_playing = False
                     break
 
                 self._skip_requested = False
-                self._decode_and_write(track, self._fifo_fd)
+                fade_tail, self._fade_tail = self._fade_tail, None
+                self._play_track(self._take_source(track), fade_tail)
 
                 # FFmpegクラッシュが検出されたらループを抜ける
                 if self._ffmpeg_crash_detected:
-                    print("FFmpegクラッシュにより書き込みループを終了", flush=True)
+                    print("FFmpegクラッシュによりデコードループを終了", flush=True)
                     break
 
                 if self._skip_requested:
+                    # バッファに残った前の曲を破棄
+                    self._ring.clear()
                     print("スキップ完了", flush=True)
 
-                # 曲間に無音を挿入
-                if not self._stop_requested and not self._skip_requested:
-                    self._write_silence(self._fifo_fd, config.TRACK_GAP_SECONDS)
+                # 曲間に無音を挿入（クロスフェード時は重ねるため無音なし）
+                if not self._stop_requested and not self._skip_requested and not self._fade_tail:
+                    self._write_silence(self.config.TRACK_GAP_SECONDS)
 
         except Exception as e:
-            print(f"書き込みスレッドエラー: {e}", flush=True)
+            print(f"デコードスレッドエラー: {e}", flush=True)
         finally:
-            if self._fifo_fd is not None:
+            self._close_prefetched()
+            self._ring.close()
+
+        print("デコードスレッド終了", flush=True)
+
+    def _open_fifo(self) -> bool:
+        """
+        配信FFmpegがFIFOを開くまで待って書き込み側を開く（停止時はFalse）
+
+        停止要求を確認できるよう非ブロッキングで開き、切断中は再起動中の音声の扱いに従ってバッファを処理
+        """
+        while self.is_playing and not self._stop_requested and not self._ffmpeg_crash_detected:
+            try:
+                fd = os.open(self.fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                # 読み込み側（配信FFmpeg）がまだ開いていない
+                if e.errno != errno.ENXIO:
+                    raise
+                if self._detached_since is not None:
+                    self._drop_detached()
+                time.sleep(FIFO_OPEN_POLL_SECONDS)
+                continue
+
+            os.set_blocking(fd, True)
+            self._fifo_fd = fd
+            self._pipe_capacity = self._get_pipe_capacity(fd)
+            return True
+        return False
+
+    @staticmethod
+    def _get_pipe_capacity(fd: int) -> int:
+        """FIFOのパイプ容量（取得できなければLinuxのデフォルト）"""
+        try:
+            return fcntl.fcntl(fd, fcntl.F_GETPIPE_SZ)
+        except (AttributeError, OSError):
+            return DEFAULT_PIPE_CAPACITY
+
+    def _close_fifo(self):
+        """FIFOの書き込み側を閉じる"""
+        if self._fifo_fd is not None:
+            try:
+                os.close(self._fifo_fd)
+            except OSError:
+                pass
+            self._fifo_fd = None
+
+    def _detach_fifo(self):
+        """配信FFmpegの終了で切断（デコードとバッファリングは継続し、次の配信FFmpegに再接続）"""
+        self._close_fifo()
+        self._detached_since = time.monotonic()
+        self._detached_dropped = 0
+        print("配信FFmpegから切断、再接続を待機（再生は継続）", flush=True)
+        self.station.supervisor.notify('AudioPlayer', 'BrokenPipe（再接続待機）')
+
+    def _drop_detached(self):
+        """切断中は実時間分のPCMを破棄（drop時のみ、再接続後は実時間どおりの位置から送出）"""
+        if self.config.ENCODER_RESTART_POLICY != 'drop':
+            return
+
+        due = int((time.monotonic() - self._detached_since) * BYTES_PER_SECOND) - self._detached_dropped
+        due -= due % (CHANNELS * BYTES_PER_SAMPLE)
+        while due > 0:
+            view, generation = self._ring.peek(min(due, WRITE_CHUNK_SIZE), timeout=0)
+            if view is None:
+                break
+            size = len(view)
+            view.release()
+            self._ring.advance(size, generation)
+            due -= size
+            self._detached_dropped += size
+
+    def _reconnect_fifo(self) -> bool:
+        """次の配信FFmpegにFIFOを再接続"""
+        if not self._open_fifo():
+            return False
+
+        elapsed = time.monotonic() - self._detached_since
+        dropped = self._detached_dropped / BYTES_PER_SECOND
+        self._detached_since = None
+        self.reconnect_count += 1
+        self.last_reconnect_seconds = elapsed
+        # 配信FFmpegの起動ごとに初期化されたクロックを再開
+        self.station.media_clock.start()
+        detail = f"、{dropped:.1f}秒分を破棄" if dropped else ""
+        print(f"配信FFmpegに再接続（切断 {elapsed:.2f}秒{detail}）", flush=True)
+        return True
+
+    def _write_fifo(self, data) -> int:
+        """FIFOに書き込み（BrokenPipe時は0を返し、切断または連続回数を記録）"""
+        try:
+            written = os.write(self._fifo_fd, data)
+            # 成功したらBrokenPipeカウンターをリセット
+            self._broken_pipe_count = 0
+            self.station.media_clock.add_audio(written)
+            self._metric_fifo_bytes.inc(written)
+            return written
+        except (BrokenPipeError, OSError):
+            self._metric_broken_pipes.inc()
+            if self.config.ENCODER_HOT_RESTART:
+                self._detach_fifo()
+                return 0
+            self._broken_pipe_count += 1
+            self._check_broken_pipe_threshold()
+            return 0
+
+    def _insert_silence(self, total_bytes: int):
+        """アンダーランで実時間から遅れた分を無音でFIFOへ直接補填"""
+        self.station.media_clock.record_silence_insert(total_bytes)
+        silence_chunk = memoryview(bytes(WRITE_CHUNK_SIZE))
+
+        while total_bytes > 0 and not self._stop_requested and not self._ffmpeg_crash_detected:
+            if self._fifo_fd is None:
+                break
+            written = self._write_fifo(silence_chunk[:min(WRITE_CHUNK_SIZE, total_bytes)])
+            total_bytes -= written
+
+    def _writer_loop(self):
+        """書き込みスレッドのメインループ（リングバッファからFIFOへ、メディアクロックで実時間にペーシング）"""
+        drift_threshold = int(BYTES_PER_SECOND * self.config.AV_DRIFT_THRESHOLD_SECONDS)
+        media_clock = self.station.media_clock
+        supervisor = self.station.supervisor
+        writer_done = self._writer_done
+
+        try:
+            print("FIFO書き込み待機中...", flush=True)
+            connected = self._open_fifo()
+            if connected:
+                print("FIFO接続完了", flush=True)
+                media_clock.start()
+
+            while connected and self.is_playing and not self._stop_requested and not self._ffmpeg_crash_detected:
+                # 配信FFmpegの再起動中は再接続を待つ
+                if self._fifo_fd is None:
+                    if not self._reconnect_fifo():
+                        break
+                    continue
+
+                # 実時間+先行分を超えて書き込まない
+                writable = media_clock.audio_writable_bytes()
+                if writable < MIN_PACED_WRITE:
+                    time.sleep(0.01)
+                    continue
+
+                view, generation = self._ring.peek(min(WRITE_CHUNK_SIZE, writable), timeout=0.1)
+                if view is None:
+                    if self._ring.closed:
+                        break
+                    # アンダーランで閾値以上遅れたら無音で補填（映像とのずれを残さない）
+                    if drift_threshold and media_clock.audio_lag_bytes() > drift_threshold:
+                        self._insert_silence(media_clock.audio_writable_bytes())
+                    continue
+
                 try:
-                    os.close(self._fifo_fd)
-                except:
-                    pass
-                self._fifo_fd = None
+                    written = self._write_fifo(view)
+                finally:
+                    view.release()
+
+                if written:
+                    self._ring.advance(written, generation)
+
+            # FFmpegクラッシュが検出されたらループを抜ける
+            if self._ffmpeg_crash_detected:
+                print("FFmpegクラッシュにより書き込みループを終了", flush=True)
+
+        except Exception as e:
+            print(f"書き込みスレッドエラー: {e}", flush=True)
+        finally:
+            self._ring.close()
+            self._close_fifo()
+            self._detached_since = None
 
         self.is_playing = False
         print("書き込みスレッド終了", flush=True)
+        if not self._stop_requested:
+            supervisor.notify('AudioPlayer', '書き込みスレッド終了')
+        supervisor.call_soon(writer_done.set)
 
     async def start(self):
         """再生を開始"""
+        supervisor = self.station.supervisor
+        supervisor.bind()
         if self.is_playing:
             print("既に再生中です", flush=True)
+            supervisor.report_ready('audio')
             return
 
         self._create_fifo()
@@ -307,16 +907,32 @@ class AudioPlayer:
         if not self._load_playlist():
             self.is_playing = False
             self._cleanup_fifo()
+            supervisor.report_ready('audio', False)
             return
-
-        # 書き込みスレッドを開始
+        self._resume = None
+        self._restore_checkpoint()
+
+        # デコード→リングバッファ→FIFOの2スレッド構成
+        self._ring = PCMRingBuffer(
+            int(BYTES_PER_SECOND * self.config.AUDIO_BUFFER_SECONDS),
+            CHANNELS * BYTES_PER_SAMPLE
+        )
+        self._writer_done = asyncio.Event()
+        self._producer_thread = threading.Thread(target=self._producer_loop, daemon=True)
         self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._producer_thread.start()
         self._writer_thread.start()
+        supervisor.report_ready('audio')
 
-        # スレッドが終了するまで待機
-        while self._writer_thread.is_alive() and not self._stop_requested:
-            await asyncio.sleep(0.5)
+        # 書き込みスレッドの終了・停止要求まで待機（再生位置を定期的に保存）
+        while not self._writer_done.is_set() and not self._stop_requested:
+            try:
+                await asyncio.wait_for(self._writer_done.wait(), timeout=CHECKPOINT_SECONDS)
+            except asyncio.TimeoutError:
+                self._save_checkpoint()
 
+        # 停止・クラッシュ時点の位置を保存（次回の開始・復旧時にここから再開）
+        self._save_checkpoint()
         self.is_playing = False
         self.current_track = None
         self._cleanup_fifo()
@@ -329,16 +945,25 @@ class AudioPlayer:
 
         print("停止リクエスト", flush=True)
         self._stop_requested = True
+        if self._writer_done:
+            self._writer_done.set()
+        if self._ring:
+            self._ring.close()
 
-        if self._decoder_process:
+        source = self._current_source
+        if source:
             try:
-                self._decoder_process.terminate()
-                self._decoder_process.wait(timeout=2)
-            except:
-                self._decoder_process.kill()
+                source.close()
+            except Exception:
+                pass
+
+        # スレッドの終了はイベントループを止めずに待つ（他の局の配信・Botの応答を妨げない）
+        loop = asyncio.get_running_loop()
+        if self._producer_thread and self._producer_thread.is_alive():
+            await loop.run_in_executor(None, self._producer_thread.join, 3)
 
         if self._writer_thread and self._writer_thread.is_alive():
-            self._writer_thread.join(timeout=3)
+            await loop.run_in_executor(None, self._writer_thread.join, 3)
 
     def skip(self) -> bool:
         """現在の曲をスキップ"""
@@ -355,16 +980,19 @@ class AudioPlayer:
         mode_name = "シャッフル" if self.shuffle_mode else "ファイル名順"
         print(f"再生モード変更: {mode_name}", flush=True)
 
-        # プレイリストを再読み込み
-        if self.playlist:
-            if self.shuffle_mode:
-                random.shuffle(self.playlist)
-            else:
-                self.playlist.sort()
-            self.playlist_index = 0
+        # プレイリストを並べ替え
+        with self._playlist_lock:
+            if self.playlist:
+                self._purge_removed()
+                if self.shuffle_mode:
+                    random.shuffle(self.playlist)
+                else:
+                    self.playlist.sort()
+                self.playlist_index = 0
+                self._playlist_dirty = True
 
-            if self.is_playing:
-                self._skip_requested = True
+                if self.is_playing:
+                    self._skip_requested = True
 
         return mode_name
 
@@ -392,21 +1020,42 @@ class AudioPlayer:
             result['elapsed_seconds'] = elapsed
             result['elapsed_formatted'] = f"{elapsed // 60}:{elapsed % 60:02d}"
 
+            if self._current_duration:
+                remaining = max(0, int(self._current_duration) - elapsed)
+                result['duration_seconds'] = int(self._current_duration)
+                result['duration_formatted'] = format_duration(self._current_duration)
+                result['remaining_seconds'] = remaining
+                result['remaining_formatted'] = format_duration(remaining)
+
+        boundary = self.get_boundary_stats()
+        if boundary:
+            result['boundary_delay'] = boundary
+
+        buffer_stats = self.get_buffer_stats()
+        if buffer_stats:
+            result['buffer'] = buffer_stats
+
         return result
 
-    def get_fifo_path(self) -> str:
-        """FIFOパスを取得"""
-        return self.fifo_path
+    def get_buffer_stats(self) -> dict:
+        """リングバッファのフィル量とアンダーラン/オーバーランの統計"""
+        if not self._ring:
+            return None
+        return self._ring.get_stats()
 
-    def reload_playlist(self) -> bool:
-        """プレイリストを再読み込み（同期後に呼び出し）"""
-        old_count = len(self.playlist) if self.playlist else 0
-        if self._load_playlist():
-            new_count = len(self.playlist)
-            print(f"プレイリスト更新: {old_count}曲 → {new_count}曲", flush=True)
-            return True
-        return False
+    def get_boundary_stats(self) -> dict:
+        """曲境界の待ち時間（ギャップ後に次の曲のデータが届くまで）の統計（ミリ秒）"""
+        delays = list(self._boundary_delays)
+        if not delays:
+            return None
 
+        return {
+            'count': len(delays),
+            'last_ms': round(delays[-1] * 1000, 1),
+            'avg_ms': round(sum(delays) / len(delays) * 1000, 1),
+            'max_ms': round(max(delays) * 1000, 1),
+        }
 
-# シングルトン
-audio_player = AudioPlayer()
+    def get_fifo_path(self) -> str:
+        """FIFOパスを取得"""
+        return self.fifo_path
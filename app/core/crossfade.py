@@ -0,0 +1,92 @@
+"""
+SUNO Radio Lite - クロスフェード
+曲の末尾と次の曲の先頭をs16le PCMのままNumPyでミックス
+"""
+
+import math
+from config import config
+
+try:
+    import numpy as np
+except ImportError:  # numpy未導入時はクロスフェード無効
+    np = None
+
+
+BYTES_PER_FRAME = 2 * config.CHANNELS  # s16le
+
+
+def is_available() -> bool:
+    """NumPyが利用可能か"""
+    return np is not None
+
+
+class Crossfader:
+    """出力側の末尾PCMと入力側の先頭PCMを等パワーカーブでブロック単位にミックス"""
+
+    def __init__(self, tail: bytes):
+        usable = len(tail) - len(tail) % BYTES_PER_FRAME
+        self._tail = np.frombuffer(tail[:usable], dtype=np.int16).reshape(-1, config.CHANNELS)
+        self._frames = len(self._tail)
+        self._pos = 0
+        self._carry = b''
+
+        # 等パワーカーブ（cos/sin）: 両者の2乗和が常に1
+        t = (np.arange(self._frames, dtype=np.float32) + 0.5) / max(self._frames, 1)
+        self._fade_out = np.cos(t * (math.pi / 2)).astype(np.float32)[:, None]
+        self._fade_in = np.sin(t * (math.pi / 2)).astype(np.float32)[:, None]
+
+    @property
+    def done(self) -> bool:
+        """ミックス区間を消化したか"""
+        return self._pos >= self._frames
+
+    def _mix_frames(self, incoming) -> bytes:
+        """incomingフレーム分をミックスしてs16leで返す"""
+        n = len(incoming)
+        start, end = self._pos, self._pos + n
+
+        mixed = self._tail[start:end] * self._fade_out[start:end]
+        if n:
+            mixed += incoming * self._fade_in[start:end]
+        # クリップしてからs16へ（ラップアラウンド防止）
+        np.clip(mixed, -32768, 32767, out=mixed)
+
+        self._pos = end
+        return mixed.astype(np.int16).tobytes()
+
+    def mix(self, data) -> bytes:
+        """
+        入力側のPCMをミックス
+
+        Returns:
+            出力するPCM（ミックス区間を超えた分はそのまま後ろに連結）
+        """
+        if self.done:
+            return bytes(data)
+
+        data = self._carry + bytes(data)
+        usable = len(data) - len(data) % BYTES_PER_FRAME
+        incoming = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, config.CHANNELS)
+
+        n = min(len(incoming), self._frames - self._pos)
+        out = self._mix_frames(incoming[:n])
+
+        if self.done:
+            # 残りはフレーム境界に関係なくそのまま出力
+            self._carry = b''
+            return out + data[n * BYTES_PER_FRAME:]
+
+        self._carry = data[usable:]
+        return out
+
+    def flush(self) -> bytes:
+        """入力側が先に終わった場合、残りの末尾をフェードアウトのみで出力"""
+        if self.done:
+            return b''
+
+        start = self._pos
+        mixed = self._tail[start:] * self._fade_out[start:]
+        np.clip(mixed, -32768, 32767, out=mixed)
+
+        self._pos = self._frames
+        return mixed.astype(np.int16).tobytes()
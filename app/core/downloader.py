@@ -0,0 +1,134 @@
+"""
+SUNO Radio Lite - ダウンローダー
+同時実行数を制限した並列ダウンロード（keep-aliveセッション、リトライ、一時ファイル経由の置き換え）
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+from core.gdrive_client import gdrive_client
+
+
+class DownloadError(Exception):
+    """リトライしても取得できなかった"""
+
+
+class Downloader:
+    """Google Driveファイルの並列ダウンロード"""
+
+    CHUNK_SIZE = 1024 * 1024
+    REQUEST_TIMEOUT = 30
+    # リトライ間隔（秒、試行ごとに倍）
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 30.0
+    # リトライしても結果が変わらないステータス
+    NO_RETRY_STATUS = {400, 401, 403, 404}
+
+    def __init__(self):
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._semaphore = None
+        # 進捗（バイト）
+        self.bytes_downloaded = 0
+
+    def _get_workers(self) -> int:
+        return max(1, config.DOWNLOAD_CONCURRENCY)
+
+    def _get_session(self):
+        """接続を使い回すセッション（同時実行数分の接続をプール）"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self._get_workers())
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """ダウンロード専用のスレッドプール（既定のexecutorを占有しない）"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._get_workers(),
+                    thread_name_prefix='download'
+                )
+            return self._executor
+
+    def _fetch(self, file: dict, temp_path: str):
+        """1回分の取得（一時ファイルにストリーミング書き込み）"""
+        request = gdrive_client.get_media_request(file['id'])
+        if request is None:
+            # APIキー未設定時はgdownで取得
+            gdrive_client.download_gdown(file['id'], temp_path)
+            self.bytes_downloaded += os.path.getsize(temp_path)
+            return
+
+        url, params = request
+        session = self._get_session()
+        with session.get(url, params=params, stream=True, timeout=self.REQUEST_TIMEOUT) as response:
+            # URLにAPIキーを含むためステータスのみ表示
+            if response.status_code in self.NO_RETRY_STATUS:
+                raise DownloadError(f"HTTP {response.status_code}")
+            if response.status_code >= 400:
+                raise IOError(f"HTTP {response.status_code}")
+
+            with open(temp_path, 'wb') as f:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    f.write(chunk)
+                    self.bytes_downloaded += len(chunk)
+
+        # 一覧のサイズと一致しなければ途中切断とみなす
+        if file.get('size') is not None and os.path.getsize(temp_path) != file['size']:
+            raise IOError(f"サイズ不一致: {os.path.getsize(temp_path)} != {file['size']}")
+
+    def _download_file(self, file: dict, dest_path: str):
+        """リトライ付きで取得し、完了後に置き換え（スレッドで実行）"""
+        temp_path = dest_path + '.part'
+        attempts = max(0, config.DOWNLOAD_RETRIES) + 1
+
+        try:
+            for attempt in range(attempts):
+                try:
+                    self._fetch(file, temp_path)
+                    os.replace(temp_path, dest_path)
+                    return
+                except DownloadError:
+                    raise
+                except Exception as e:
+                    error = gdrive_client.mask_key(str(e))
+                    if attempt + 1 >= attempts:
+                        raise DownloadError(f"{attempts}回失敗: {error}") from e
+                    delay = min(self.BACKOFF_BASE * (2 ** attempt), self.BACKOFF_MAX)
+                    delay *= random.uniform(0.5, 1.0)
+                    print(f"ダウンロード再試行 ({attempt + 1}/{attempts - 1}): {file['name']} - {error}", flush=True)
+                    time.sleep(delay)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    async def download(self, file: dict, dest_path: str):
+        """
+        1ファイルをダウンロード（同時実行数を超える分は待機）
+
+        Raises:
+            DownloadError: リトライしても取得できなかった
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._get_workers())
+
+        async with self._semaphore:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(self._get_executor(), self._download_file, file, dest_path)
+
+
+# シングルトン
+downloader = Downloader()
@@ -0,0 +1,289 @@
+"""
+SUNO Radio Lite - 適応エンコード
+エンコード速度・CPU使用率・出力の遅れを監視し、エンコードプロファイルの段を切り替える
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+from core.media_clock import BYTES_PER_SECOND
+
+
+# エンコードプロファイル（上から順に高画質、load は480pを1としたエンコード負荷の目安）
+ENCODER_PROFILES = [
+    {'name': '720p', 'resolution': '1280x720', 'fps': 15, 'video_bitrate': '1200k', 'preset': 'veryfast', 'load': 3.0},
+    {'name': '480p', 'resolution': '854x480', 'fps': 15, 'video_bitrate': '500k', 'preset': 'ultrafast', 'load': 1.0},
+    {'name': '360p', 'resolution': '640x360', 'fps': 15, 'video_bitrate': '350k', 'preset': 'ultrafast', 'load': 0.6},
+    {'name': '270p', 'resolution': '480x270', 'fps': 10, 'video_bitrate': '200k', 'preset': 'ultrafast', 'load': 0.3},
+    {'name': '240p', 'resolution': '426x240', 'fps': 5, 'video_bitrate': '120k', 'preset': 'ultrafast', 'load': 0.15},
+]
+DEFAULT_PROFILE = '480p'
+
+
+def find_profile(name: str) -> int:
+    """プロファイル名から段の位置を取得（見つからなければNone）"""
+    for index, profile in enumerate(ENCODER_PROFILES):
+        if profile['name'] == name:
+            return index
+    return None
+
+
+class EncoderController:
+    """局ごとの適応エンコード（負荷が続けば1段下げ、余裕が続けば上限の段まで1段ずつ戻す）"""
+
+    # 判定間隔（秒）
+    SAMPLE_SECONDS = 5
+    # 連続してこの回数負荷超過なら1段下げ / 余裕があれば1段上げ
+    DOWNGRADE_SAMPLES = 3
+    UPGRADE_SAMPLES = 24
+    # FFmpeg起動・切り替え直後は判定しない（起動直後の値を除外し、切り替えの往復を防ぐ）
+    COOLDOWN_SECONDS = 60
+    # 上げてからこの秒数以内に下がった場合は、次に上げるまでの時間を倍にする（最大 2**UPGRADE_BACKOFF_MAX 倍）
+    UPGRADE_PROBE_SECONDS = 300
+    UPGRADE_BACKOFF_MAX = 4
+
+    # 負荷超過の閾値
+    MIN_SPEED = 0.95            # エンコード速度（実時間比）
+    MAX_CPU = 0.90              # ホストのCPU使用率（エンコード速度が落ち始めている時のみ）
+    MAX_BACKLOG_SECONDS = 1.0   # 出力の遅れ（実時間に対して未送出の音声）
+    BACKLOG_GROWTH = 0.05       # 出力の遅れの増加速度（秒/秒）
+    # 余裕ありの閾値
+    HEADROOM_SPEED = 0.99
+    HEADROOM_CPU = 0.60
+    HEADROOM_BACKLOG_SECONDS = 0.5
+
+    DECISION_HISTORY = 20
+
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+
+        ceiling = find_profile(self.config.ENCODER_PROFILE)
+        if ceiling is None:
+            print(f"ENCODER_PROFILEが不正です: {self.config.ENCODER_PROFILE}（{DEFAULT_PROFILE}を使用）", flush=True)
+            ceiling = find_profile(DEFAULT_PROFILE)
+        self._ceiling = ceiling
+        self._index = ceiling
+        self._pending = None
+        self._last_upgrade = None
+        self._upgrade_backoff = 0
+
+        self._pressure_count = 0
+        self._headroom_count = 0
+        self._next_sample = 0.0
+        self._cooldown_until = 0.0
+        self._prev_progress = None
+        self._prev_cpu_times = None
+        self._prev_backlog = None
+        self.last_sample = None
+        self.decisions = deque(maxlen=self.DECISION_HISTORY)
+
+        self.config.apply_encoder_profile(self.get_profile())
+
+    def is_adaptive(self) -> bool:
+        """適応エンコードが有効か"""
+        return self.config.ENCODER_ADAPTIVE
+
+    def get_profile(self) -> dict:
+        """現在のプロファイル"""
+        return ENCODER_PROFILES[self._index]
+
+    def reset(self):
+        """配信FFmpegの起動ごとに計測を初期化（起動直後は判定しない）"""
+        now = time.monotonic()
+        self._pressure_count = 0
+        self._headroom_count = 0
+        self._prev_progress = None
+        self._prev_backlog = None
+        self._next_sample = now + self.SAMPLE_SECONDS
+        self._cooldown_until = now + self.COOLDOWN_SECONDS
+
+    # --- 計測 ---
+
+    def _read_cpu_usage(self) -> float:
+        """前回呼び出しからのホストのCPU使用率（0〜1、取得できなければNone）"""
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+
+        # idle + iowait を空きとみなす
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields)
+        prev, self._prev_cpu_times = self._prev_cpu_times, (idle, total)
+        if prev is None or total <= prev[1]:
+            return None
+        return 1.0 - (idle - prev[0]) / (total - prev[1])
+
+    def _read_speed(self, now: float) -> float:
+        """前回計測からのエンコード速度（-progress の出力タイムスタンプの進み / 実時間）"""
+        latest = self.station.encoder_telemetry.get_latest()
+        if latest is None or latest['out_time'] is None:
+            return latest['speed'] if latest else None
+        progress = latest['out_time']
+
+        prev, self._prev_progress = self._prev_progress, (progress, now)
+        if prev is None or now <= prev[1]:
+            return None
+        return max(0.0, (progress - prev[0]) / (now - prev[1]))
+
+    def _read_backlog(self) -> float:
+        """
+        出力の遅れ（秒）: 実時間に対して配信FFmpegに渡せていない音声
+
+        リングバッファに音声が溜まっているのに書き込めない場合のみ数える
+        （デコーダー側のアンダーランは出力の遅れではない）
+        """
+        buffer = self.station.audio_player.get_buffer_stats()
+        if not buffer or buffer['fill_ratio'] < 0.5:
+            return 0.0
+        return self.station.media_clock.audio_lag_bytes() / BYTES_PER_SECOND
+
+    def sample(self, now: float = None) -> dict:
+        """エンコード速度・CPU使用率・出力の遅れを計測"""
+        now = time.monotonic() if now is None else now
+        backlog = self._read_backlog()
+        growth = None
+        if self._prev_backlog is not None and now > self._prev_backlog[1]:
+            growth = (backlog - self._prev_backlog[0]) / (now - self._prev_backlog[1])
+        self._prev_backlog = (backlog, now)
+
+        return {
+            'speed': self._read_speed(now),
+            'cpu': self._read_cpu_usage(),
+            'backlog': backlog,
+            'backlog_growth': growth,
+        }
+
+    # --- 判定 ---
+
+    def _pressure_reasons(self, sample: dict) -> list:
+        speed, cpu = sample['speed'], sample['cpu']
+        reasons = []
+        if speed is not None and speed < self.MIN_SPEED:
+            reasons.append(f"エンコード速度 {speed:.2f}x")
+        if (sample['backlog'] > self.MAX_BACKLOG_SECONDS
+                and sample['backlog_growth'] is not None and sample['backlog_growth'] > self.BACKLOG_GROWTH):
+            reasons.append(f"出力の遅れ {sample['backlog']:.1f}秒（増加中）")
+        if cpu is not None and cpu > self.MAX_CPU and speed is not None and speed < self.HEADROOM_SPEED:
+            reasons.append(f"CPU使用率 {cpu:.0%}")
+        return reasons
+
+    def _has_headroom(self, sample: dict) -> bool:
+        return (
+            sample['speed'] is not None and sample['speed'] >= self.HEADROOM_SPEED
+            and (sample['cpu'] is None or sample['cpu'] < self.HEADROOM_CPU)
+            and sample['backlog'] < self.HEADROOM_BACKLOG_SECONDS
+        )
+
+    def evaluate(self, sample: dict) -> tuple:
+        """
+        計測結果から段の切り替えを判定
+
+        Returns:
+            (切り替え先の段の位置, 理由) または None
+        """
+        reasons = self._pressure_reasons(sample)
+        if reasons:
+            self._pressure_count += 1
+            self._headroom_count = 0
+            if self._pressure_count >= self.DOWNGRADE_SAMPLES and self._index < len(ENCODER_PROFILES) - 1:
+                return self._index + 1, ' / '.join(reasons)
+            return None
+
+        self._pressure_count = 0
+        if self._has_headroom(sample):
+            self._headroom_count += 1
+            required = self.UPGRADE_SAMPLES * 2 ** self._upgrade_backoff
+            if self._headroom_count >= required and self._index > self._ceiling:
+                return self._index - 1, f"{self._headroom_count * self.SAMPLE_SECONDS}秒間余裕あり"
+        else:
+            self._headroom_count = 0
+        return None
+
+    def seconds_until_sample(self) -> float:
+        """次の計測までの秒数（適応エンコードが無効ならNone）"""
+        if not self.is_adaptive():
+            return None
+        return max(0.0, self._next_sample - time.monotonic())
+
+    def poll(self) -> bool:
+        """
+        配信中に定期的に呼び出し、判定間隔ごとに計測・判定
+
+        Returns:
+            プロファイルの切り替えが必要か（True なら apply_pending の後に配信FFmpegを再起動）
+        """
+        if not self.is_adaptive():
+            return False
+        if self._pending is not None:
+            return True
+
+        now = time.monotonic()
+        if now < self._next_sample:
+            return False
+        self._next_sample = now + self.SAMPLE_SECONDS
+
+        # 上げた段を一定時間維持できたら待ち時間を戻す
+        if self._last_upgrade is not None and now - self._last_upgrade >= self.UPGRADE_PROBE_SECONDS:
+            self._last_upgrade = None
+            self._upgrade_backoff = 0
+
+        sample = self.sample(now)
+        self.last_sample = sample
+        if now < self._cooldown_until:
+            return False
+
+        decision = self.evaluate(sample)
+        if decision is None:
+            return False
+
+        index, reason = decision
+        self._record(index, reason, sample)
+        self._pending = index
+        return True
+
+    def _record(self, index: int, reason: str, sample: dict):
+        """切り替えの判定を記録"""
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'from': self.get_profile()['name'],
+            'to': ENCODER_PROFILES[index]['name'],
+            'reason': reason,
+            'speed': round(sample['speed'], 3) if sample['speed'] is not None else None,
+            'cpu': round(sample['cpu'], 3) if sample['cpu'] is not None else None,
+            'backlog': round(sample['backlog'], 2),
+        }
+        self.decisions.append(entry)
+        print(f"適応エンコード: {entry['from']} → {entry['to']}（{reason}）", flush=True)
+
+    def apply_pending(self):
+        """判定した段を局の配信設定に反映（配信FFmpegの再起動前に呼び出し）"""
+        if self._pending is None:
+            return
+
+        now = time.monotonic()
+        if self._pending < self._index:
+            self._last_upgrade = now
+        elif self._last_upgrade is not None and now - self._last_upgrade < self.UPGRADE_PROBE_SECONDS:
+            # 上げた段を維持できなかった
+            self._upgrade_backoff = min(self._upgrade_backoff + 1, self.UPGRADE_BACKOFF_MAX)
+        self._index = self._pending
+        self._pending = None
+        self.config.apply_encoder_profile(self.get_profile())
+
+    # --- 状態 ---
+
+    def get_status(self) -> dict:
+        """現在のプロファイル・直近の計測・切り替え履歴"""
+        sample = self.last_sample
+        return {
+            'profile': self.get_profile()['name'],
+            'ceiling': ENCODER_PROFILES[self._ceiling]['name'],
+            'adaptive': self.is_adaptive(),
+            'speed': round(sample['speed'], 2) if sample and sample['speed'] is not None else None,
+            'cpu_percent': round(sample['cpu'] * 100) if sample and sample['cpu'] is not None else None,
+            'backlog_seconds': round(sample['backlog'], 1) if sample else None,
+            'decisions': list(self.decisions),
+        }
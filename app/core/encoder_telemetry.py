@@ -0,0 +1,215 @@
+"""
+SUNO Radio Lite - エンコードテレメトリ
+配信FFmpegの -progress 出力（key=value）を逐次読み込み、速度・fps・ビットレート・ドロップ/複製フレームの時系列を保持
+"""
+
+import time
+from collections import deque
+
+
+# -progress のブロックの区切り（continue / end）
+PROGRESS_KEY = 'progress'
+
+
+def _parse_number(value: str, suffix: str = '') -> float:
+    """数値を取り出す（N/A等はNone）"""
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class EncoderTelemetry:
+    """配信FFmpegの進捗の時系列（クラッシュ前の劣化を検知）"""
+
+    # 保持する時系列の秒数
+    WINDOW_SECONDS = 300
+    # 劣化の判定に使う直近の秒数（この秒数分の計測が揃ってから判定）
+    RECENT_SECONDS = 30
+    # 推移表示の1区間の秒数
+    TREND_SECONDS = 30
+
+    # 劣化の閾値
+    MIN_SPEED = 0.95            # 直近の平均エンコード速度（実時間比）
+    MIN_BITRATE_RATIO = 0.5     # 直近の平均ビットレート / 保持期間全体の平均ビットレート
+    MAX_DROP_RATIO = 0.01       # 直近のドロップ・複製フレーム / 出力フレーム（入力の途切れ・エンコードの遅れ）
+
+    def __init__(self, on_start=None):
+        # 起動ごとに最初の進捗で呼び出すコールバック（出力の停止の判定の開始）
+        self._on_start = on_start
+        self._samples = deque()
+        self._block = {}
+        self._started = None
+        self._degraded = []
+        # 出力が最後に進んだ時刻（出力の停止の検知用、最初の進捗まではNone）
+        self.last_advance = None
+
+    def reset(self):
+        """配信FFmpegの起動ごとに時系列を初期化（フレーム数等は起動ごとに0から始まるため）"""
+        self._samples.clear()
+        self._block = {}
+        self._started = time.monotonic()
+        self._degraded = []
+        # 配信先への接続中は進捗が出ないため、停止の判定は最初の進捗から開始
+        self.last_advance = None
+
+    async def read_progress(self, stream):
+        """-progress の出力を終了まで読み続ける（ブロック単位で計測値を追加）"""
+        buffer = b''
+        while True:
+            chunk = await stream.read(4096)
+            if not chunk:
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                key, sep, value = line.decode(errors='replace').partition('=')
+                if sep:
+                    self._handle_value(key.strip(), value.strip())
+
+    def _handle_value(self, key: str, value: str):
+        if key != PROGRESS_KEY:
+            self._block[key] = value
+            return
+
+        block, self._block = self._block, {}
+        out_time_us = _parse_number(block.get('out_time_us', ''))
+        self._add_sample({
+            'time': time.monotonic(),
+            'frame': _parse_number(block.get('frame', '')),
+            'fps': _parse_number(block.get('fps', '')),
+            'bitrate_kbps': _parse_number(block.get('bitrate', ''), 'kbits/s'),
+            'total_size': _parse_number(block.get('total_size', '')),
+            'out_time': out_time_us / 1_000_000 if out_time_us is not None else None,
+            'dup_frames': _parse_number(block.get('dup_frames', '')),
+            'drop_frames': _parse_number(block.get('drop_frames', '')),
+            'speed': _parse_number(block.get('speed', ''), 'x'),
+        })
+
+    def _add_sample(self, sample: dict):
+        prev = self._samples[-1] if self._samples else None
+        if prev is None or any(
+            sample[key] is not None and (prev[key] is None or sample[key] > prev[key])
+            for key in ('frame', 'total_size', 'out_time')
+        ):
+            if self.last_advance is None and self._on_start:
+                self._on_start()
+            self.last_advance = sample['time']
+
+        self._samples.append(sample)
+        while self._samples and sample['time'] - self._samples[0]['time'] > self.WINDOW_SECONDS:
+            self._samples.popleft()
+        self._update_degraded(sample['time'])
+
+    # --- 集計 ---
+
+    def _since(self, start: float) -> list:
+        return [sample for sample in self._samples if sample['time'] >= start]
+
+    @staticmethod
+    def _average(samples: list, key: str) -> float:
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        return sum(values) / len(values) if values else None
+
+    @staticmethod
+    def _increase(samples: list, key: str) -> int:
+        """期間内の累計値の増加（出力・ドロップ・複製フレーム）"""
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        return int(values[-1] - values[0]) if len(values) > 1 else 0
+
+    def _summarize(self, now: float) -> dict:
+        recent = self._since(now - self.RECENT_SECONDS)
+        return {
+            'speed_avg': self._average(recent, 'speed'),
+            'speed_min': min((s['speed'] for s in recent if s['speed'] is not None), default=None),
+            'frames': self._increase(recent, 'frame'),
+            'bitrate_avg': self._average(recent, 'bitrate_kbps'),
+            'drop_frames': self._increase(recent, 'drop_frames'),
+            'dup_frames': self._increase(recent, 'dup_frames'),
+        }
+
+    def _degraded_reasons(self, now: float, summary: dict) -> list:
+        """直近の劣化の理由（起動直後で計測が揃っていなければ空）"""
+        if self._started is None or now - self._started < self.RECENT_SECONDS:
+            return []
+
+        reasons = []
+        if summary['speed_avg'] is not None and summary['speed_avg'] < self.MIN_SPEED:
+            reasons.append(f"エンコード速度 {summary['speed_avg']:.2f}x")
+        allowed = max(1, summary['frames'] * self.MAX_DROP_RATIO)
+        if summary['drop_frames'] > allowed:
+            reasons.append(f"ドロップ {summary['drop_frames']}フレーム")
+        if summary['dup_frames'] > allowed:
+            reasons.append(f"複製 {summary['dup_frames']}フレーム")
+        overall = self._average(list(self._samples), 'bitrate_kbps')
+        if summary['bitrate_avg'] is not None and overall and summary['bitrate_avg'] < overall * self.MIN_BITRATE_RATIO:
+            reasons.append(f"ビットレート低下 {summary['bitrate_avg']:.0f}kbps（平均 {overall:.0f}kbps）")
+        return reasons
+
+    def _update_degraded(self, now: float):
+        """劣化の開始・解消をログに出す"""
+        reasons = self._degraded_reasons(now, self._summarize(now))
+        if reasons and not self._degraded:
+            print(f"エンコード劣化: {' / '.join(reasons)}", flush=True)
+        elif self._degraded and not reasons:
+            print("エンコード劣化が解消", flush=True)
+        self._degraded = reasons
+
+    def _trend(self, now: float) -> list:
+        """区間ごとの平均エンコード速度（古い順、計測のない区間はNone）"""
+        trend = []
+        for index in range(self.WINDOW_SECONDS // self.TREND_SECONDS, 0, -1):
+            start = now - index * self.TREND_SECONDS
+            if self._started is None or start + self.TREND_SECONDS <= self._started:
+                continue
+            samples = [s for s in self._samples if start <= s['time'] < start + self.TREND_SECONDS]
+            speed = self._average(samples, 'speed')
+            trend.append(round(speed, 2) if speed is not None else None)
+        return trend
+
+    # --- 状態 ---
+
+    def seconds_since_start(self) -> float:
+        """配信FFmpegの起動からの秒数（起動前はNone）"""
+        if self._started is None:
+            return None
+        return time.monotonic() - self._started
+
+    def seconds_since_advance(self) -> float:
+        """出力（フレーム数・出力サイズ・出力タイムスタンプ）が最後に進んでからの秒数（最初の進捗まではNone）"""
+        if self.last_advance is None:
+            return None
+        return time.monotonic() - self.last_advance
+
+    def get_latest(self) -> dict:
+        """直近の計測値（まだなければNone）"""
+        return dict(self._samples[-1]) if self._samples else None
+
+    def get_status(self) -> dict:
+        """直近の計測値・直近の集計・劣化の理由・速度の推移（まだ計測がなければNone）"""
+        if not self._samples:
+            return None
+
+        now = time.monotonic()
+        latest = self._samples[-1]
+        summary = self._summarize(now)
+        return {
+            'speed': latest['speed'],
+            'fps': latest['fps'],
+            'bitrate_kbps': latest['bitrate_kbps'],
+            'out_time_seconds': round(latest['out_time'], 1) if latest['out_time'] is not None else None,
+            'dup_frames': int(latest['dup_frames'] or 0),
+            'drop_frames': int(latest['drop_frames'] or 0),
+            'recent_seconds': self.RECENT_SECONDS,
+            'recent_speed_avg': round(summary['speed_avg'], 3) if summary['speed_avg'] is not None else None,
+            'recent_speed_min': summary['speed_min'],
+            'recent_bitrate_avg': round(summary['bitrate_avg'], 1) if summary['bitrate_avg'] is not None else None,
+            'recent_drop_frames': summary['drop_frames'],
+            'recent_dup_frames': summary['dup_frames'],
+            'degraded': list(self._degraded),
+            'trend_seconds': self.TREND_SECONDS,
+            'speed_trend': self._trend(now),
+        }
@@ -0,0 +1,136 @@
+"""
+SUNO Radio Lite - Google Driveクライアント
+共有フォルダのファイル一覧取得とファイルのダウンロード
+（APIキー設定時はDrive API v3、未設定時はgdown）
+"""
+
+import os
+import re
+from config import config
+
+
+class GDriveClient:
+    """共有フォルダの一覧・ダウンロード"""
+
+    FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+    PAGE_SIZE = 1000
+    REQUEST_TIMEOUT = 30
+
+    def has_api_key(self) -> bool:
+        """Drive APIを使うか（APIキーが設定されているか）"""
+        return bool(config.GDRIVE_API_KEY)
+
+    def mask_key(self, text: str) -> str:
+        """エラーメッセージ等に含まれるAPIキーを伏せる"""
+        if config.GDRIVE_API_KEY:
+            return text.replace(config.GDRIVE_API_KEY, '***')
+        return text
+
+    def _api_url(self, path: str) -> str:
+        return f"{config.GDRIVE_API_BASE.rstrip('/')}/drive/v3/{path}"
+
+    @staticmethod
+    def extract_folder_id(url: str) -> str:
+        """共有フォルダURLからフォルダIDを取得（IDそのものも可）"""
+        match = re.search(r'/folders/([\w-]+)', url) or re.search(r'[?&]id=([\w-]+)', url)
+        if match:
+            return match.group(1)
+        if re.fullmatch(r'[\w-]+', url):
+            return url
+        raise ValueError(f"フォルダIDを取得できません: {url}")
+
+    def list_folder(self, url: str) -> list[dict]:
+        """
+        フォルダ直下のファイル一覧を取得（サブフォルダは対象外）
+
+        Returns:
+            [{'id', 'name', 'size', 'modified_time', 'md5'}]
+            gdown使用時はsize/modified_time/md5がNone
+        """
+        if self.has_api_key():
+            return self._list_folder_api(self.extract_folder_id(url))
+        return self._list_folder_gdown(url)
+
+    def _list_folder_api(self, folder_id: str) -> list[dict]:
+        """Drive API v3でフォルダ内のファイル一覧を取得（ページング対応）"""
+        import requests
+
+        files = []
+        params = {
+            'q': f"'{folder_id}' in parents and trashed = false",
+            'fields': 'nextPageToken, files(id, name, mimeType, size, modifiedTime, md5Checksum)',
+            'pageSize': self.PAGE_SIZE,
+            'supportsAllDrives': 'true',
+            'includeItemsFromAllDrives': 'true',
+            'key': config.GDRIVE_API_KEY,
+        }
+
+        with requests.Session() as session:
+            while True:
+                response = session.get(self._api_url('files'), params=params, timeout=self.REQUEST_TIMEOUT)
+                # URLにAPIキーを含むためステータスのみ表示
+                if response.status_code >= 400:
+                    raise RuntimeError(f"ファイル一覧の取得に失敗: HTTP {response.status_code}")
+                data = response.json()
+
+                for item in data.get('files', []):
+                    if item.get('mimeType') == self.FOLDER_MIME_TYPE:
+                        continue
+                    files.append({
+                        'id': item['id'],
+                        'name': item['name'],
+                        'size': int(item['size']) if item.get('size') is not None else None,
+                        'modified_time': item.get('modifiedTime'),
+                        'md5': item.get('md5Checksum'),
+                    })
+
+                page_token = data.get('nextPageToken')
+                if not page_token:
+                    break
+                params['pageToken'] = page_token
+
+        return files
+
+    def _list_folder_gdown(self, url: str) -> list[dict]:
+        """gdownでファイルIDと名前のみ取得（ダウンロードはしない）"""
+        import gdown
+
+        items = gdown.download_folder(
+            url,
+            output=config.MUSIC_DIR,
+            quiet=True,
+            use_cookies=False,
+            skip_download=True
+        ) or []
+
+        files = []
+        for item in items:
+            # サブフォルダ内のファイルは対象外
+            if os.path.dirname(item.path):
+                continue
+            files.append({
+                'id': item.id,
+                'name': os.path.basename(item.path),
+                'size': None,
+                'modified_time': None,
+                'md5': None,
+            })
+        return files
+
+    def get_media_request(self, file_id: str) -> tuple:
+        """Drive API v3でファイル本体を取得するURLとパラメータ（APIキー未設定時はNone）"""
+        if not self.has_api_key():
+            return None
+        params = {'alt': 'media', 'supportsAllDrives': 'true', 'key': config.GDRIVE_API_KEY}
+        return self._api_url(f'files/{file_id}'), params
+
+    def download_gdown(self, file_id: str, output_path: str):
+        """gdownでファイルを取得"""
+        import gdown
+
+        if not gdown.download(id=file_id, output=output_path, quiet=True, use_cookies=False):
+            raise RuntimeError(f"ダウンロード失敗: {file_id}")
+
+
+# シングルトン
+gdrive_client = GDriveClient()
@@ -5,9 +5,85 @@ SUNO Radio Lite - Google Drive同期
 
 import os
 import asyncio
+import json
 import subprocess
+import time
 from datetime import datetime
-from config import config
+from core.downloader import downloader
+from core.gdrive_client import gdrive_client
+from core.metrics import metrics
+from core.normalization_cache import normalization_cache
+from core.scheduler import scheduler
+
+
+class _NormalizePipeline:
+    """ダウンロードが完了したファイルから順にノーマライズする並列ワーカー"""
+
+    def __init__(self, normalize_file, workers: int, on_progress=None):
+        self._normalize_file = normalize_file
+        self._workers = max(1, workers)
+        # ダウンロード側が先行しすぎないよう上限付き
+        self._queue = asyncio.Queue(maxsize=self._workers * 2)
+        self._on_progress = on_progress
+        self._tasks = []
+        self._queued_paths = set()
+        self.queued = 0
+        self.completed = 0
+        self.success = 0
+        self._started_at = None
+
+    def start(self):
+        """ワーカーを起動"""
+        self._started_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        print(f"ノーマライズ開始: {self._workers}並列（ダウンロードと並行）", flush=True)
+
+    async def put(self, filepath: str):
+        """ノーマライズ待ちに追加（キューが満杯なら空くまで待機）"""
+        if filepath in self._queued_paths:
+            return
+        self._queued_paths.add(filepath)
+        self.queued += 1
+        await self._queue.put(filepath)
+        self._report()
+
+    async def _worker(self):
+        while True:
+            filepath = await self._queue.get()
+            if filepath is None:
+                break
+            try:
+                if await self._normalize_file(filepath):
+                    self.success += 1
+            finally:
+                self.completed += 1
+                self._report()
+
+    async def close(self) -> tuple[int, int]:
+        """
+        追加済みの処理がすべて終わるまで待機
+
+        Returns:
+            (処理数, 成功数)
+        """
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        return self.queued, self.success
+
+    def cancel(self):
+        """ワーカーを中断"""
+        for task in self._tasks:
+            task.cancel()
+
+    def rate(self) -> float:
+        """処理速度（曲/分）"""
+        elapsed_minutes = (time.monotonic() - self._started_at) / 60 if self._started_at else 0
+        return self.completed / elapsed_minutes if elapsed_minutes > 0 else 0.0
+
+    def _report(self):
+        if self._on_progress:
+            self._on_progress()
 
 
 class GDriveSync:
@@ -17,44 +93,82 @@ class GDriveSync:
     TARGET_LUFS = "-14"
     TRUE_PEAK = "-1"
 
-    def __init__(self):
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
         self.is_syncing = False
         self.last_error = None
         self.progress = ""
-        self.normalized_list_path = os.path.join(config.DATA_DIR, 'normalized_files.txt')
-        self._load_normalized_list()
+        self._manifest_path = os.path.join(self.config.DATA_DIR, 'gdrive_manifest.json')
+        # 同期中の進捗（ダウンロード段・ノーマライズ段）
+        self._download_progress = ""
+        self._pipeline = None
+        # 未ノーマライズ数のキャッシュ（(ライブラリ版, キャッシュ版, モード), 件数）
+        self._unnormalized_cache = (None, 0)
+
+    def _is_normalized(self, filepath: str, allow_hash: bool = False) -> bool:
+        """
+        ファイルがノーマライズ済みかチェック
 
-    def _load_normalized_list(self):
-        """ノーマライズ済みファイルリストを読み込み"""
-        self.normalized_files = set()
-        if os.path.exists(self.normalized_list_path):
-            try:
-                with open(self.normalized_list_path, 'r') as f:
-                    self.normalized_files = set(line.strip() for line in f if line.strip())
-            except Exception:
-                pass
+        Args:
+            filepath: 音声ファイルのパス
+            allow_hash: サイズ+mtimeで判定できない場合に内容ハッシュを計算するか
+                        （イベントループ上の軽量チェックではFalse）
+        """
+        entry = normalization_cache.get_entry(
+            filepath, allow_hash=allow_hash, stat_key=self.station.library.get_stat(filepath)
+        )
+        if not entry:
+            return False
+
+        if entry['status'] == normalization_cache.STATUS_NORMALIZED:
+            return True
+
+        # 測定のみモードでは測定値があれば処理済み
+        return self._is_measure_mode() and entry.get('input_i') is not None
+
+    def _is_measure_mode(self) -> bool:
+        """測定のみ（再生時ゲイン適用）モードかどうか"""
+        return self.config.NORMALIZE_MODE == 'measure'
+
+    def get_playback_filter(self, filepath: str) -> str:
+        """
+        再生時に適用する音量調整フィルターを取得（測定のみモード用）
+
+        Args:
+            filepath: 音声ファイルのパス
+
+        Returns:
+            ffmpegの -af に渡すフィルター文字列（調整不要な場合はNone）
+        """
+        entry = normalization_cache.get_entry(filepath)
+        if not entry or entry['status'] != normalization_cache.STATUS_MEASURED:
+            return None
 
-    def _save_normalized_list(self):
-        """ノーマライズ済みファイルリストを保存"""
         try:
-            os.makedirs(os.path.dirname(self.normalized_list_path), exist_ok=True)
-            with open(self.normalized_list_path, 'w') as f:
-                for filepath in sorted(self.normalized_files):
-                    f.write(filepath + '\n')
-        except Exception:
-            pass
+            input_i = float(entry['input_i'])
+            input_tp = float(entry['input_tp'] or 0)
+        except (TypeError, ValueError):
+            return None
+
+        # -inf等の無音トラックは調整しない
+        if input_i < -70:
+            return None
 
-    def _is_normalized(self, filepath: str) -> bool:
-        """ファイルがノーマライズ済みかチェック"""
-        return filepath in self.normalized_files
+        gain_db = float(self.TARGET_LUFS) - input_i
+        filters = [f"volume={gain_db:.2f}dB"]
 
-    def _mark_normalized(self, filepath: str):
-        """ファイルをノーマライズ済みとしてマーク"""
-        self.normalized_files.add(filepath)
+        # ゲイン適用後にピークが上限を超える場合はリミッターを挿入
+        true_peak = float(self.TRUE_PEAK)
+        if input_tp + gain_db > true_peak:
+            limit = 10 ** (true_peak / 20)
+            filters.append(f"alimiter=limit={limit:.4f}:level=0")
+
+        return ','.join(filters)
 
     async def _normalize_file(self, filepath: str) -> bool:
         """
-        ファイルをラウドネスノーマライズ（2パス方式）
+        ファイルをラウドネスノーマライズ（2パス方式、測定のみモードでは1パス目のみ）
 
         Args:
             filepath: 音声ファイルのパス
@@ -62,51 +176,46 @@ class GDriveSync:
         Returns:
             成功したかどうか
         """
-        import json
-        import re
-
-        if self._is_normalized(filepath):
-            return True
-
         filename = os.path.basename(filepath)
         temp_path = filepath + '.tmp'
 
         try:
             loop = asyncio.get_event_loop()
 
-            # 1パス目: ラウドネス測定
-            cmd1 = [
-                'ffmpeg', '-i', filepath, '-vn',
-                '-af', f'loudnorm=I={self.TARGET_LUFS}:TP={self.TRUE_PEAK}:LRA=11:print_format=json',
-                '-f', 'null', '-'
-            ]
-
-            process1 = await loop.run_in_executor(
-                None,
-                lambda: subprocess.run(cmd1, capture_output=True, text=True)
-            )
+            # コンテンツ指紋でキャッシュを確認（ハッシュ計算はスレッドで実行）
+            entry = await loop.run_in_executor(None, normalization_cache.get_entry, filepath)
+            if entry and entry['status'] == normalization_cache.STATUS_NORMALIZED:
+                return True
 
-            if process1.returncode != 0:
-                print(f"❌ 測定失敗: {filename}", flush=True)
-                return False
+            if self._is_measure_mode() and entry and entry.get('input_i') is not None:
+                return True
 
-            # stderrからJSONを抽出（loudnormはstderrに出力）
-            stderr = process1.stderr
-            json_match = re.search(r'\{[^{}]*"input_i"[^{}]*\}', stderr, re.DOTALL)
-            if not json_match:
-                print(f"❌ 測定データ取得失敗: {filename}", flush=True)
-                return False
+            # キャッシュ済みを除いた処理時間を記録
+            started = time.monotonic()
+            if entry and entry.get('input_i') is not None:
+                # 同一内容の測定値があれば1パス目を省略
+                loudness_data = entry
+            else:
+                loudness_data = await self._measure_loudness(filepath)
+                if loudness_data is None:
+                    return False
+                await loop.run_in_executor(
+                    None,
+                    lambda: normalization_cache.record(
+                        filepath, normalization_cache.STATUS_MEASURED, loudness_data
+                    )
+                )
 
-            try:
-                loudness_data = json.loads(json_match.group())
-            except json.JSONDecodeError:
-                print(f"❌ 測定データパース失敗: {filename}", flush=True)
-                return False
+            if self._is_measure_mode():
+                # 元ファイルは変更せず、再生時にゲインを適用
+                print(f"✅ 測定完了: {filename} (I={loudness_data.get('input_i')} LUFS)", flush=True)
+                metrics.normalize_duration.labels(self.station.id, 'measure').observe(time.monotonic() - started)
+                return True
 
-            measured_i = loudness_data.get('input_i', '-24')
-            measured_tp = loudness_data.get('input_tp', '-2')
-            measured_lra = loudness_data.get('input_lra', '7')
-            measured_thresh = loudness_data.get('input_thresh', '-34')
+            measured_i = loudness_data.get('input_i') or '-24'
+            measured_tp = loudness_data.get('input_tp') or '-2'
+            measured_lra = loudness_data.get('input_lra') or '7'
+            measured_thresh = loudness_data.get('input_thresh') or '-34'
 
             # 2パス目: 測定値を使って正確にノーマライズ
             cmd2 = [
@@ -125,8 +234,15 @@ class GDriveSync:
 
             if process2.returncode == 0 and os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
                 os.replace(temp_path, filepath)
-                self._mark_normalized(filepath)
+                # 出力ファイルの内容をノーマライズ済みとして記録
+                await loop.run_in_executor(
+                    None,
+                    lambda: normalization_cache.record(
+                        filepath, normalization_cache.STATUS_NORMALIZED, loudness_data
+                    )
+                )
                 print(f"✅ ノーマライズ完了: {filename} (2パス)", flush=True)
+                metrics.normalize_duration.labels(self.station.id, 'normalize').observe(time.monotonic() - started)
                 return True
             else:
                 if os.path.exists(temp_path):
@@ -140,60 +256,309 @@ class GDriveSync:
             print(f"❌ ノーマライズエラー: {filename} - {e}", flush=True)
             return False
 
-    async def _normalize_all(self) -> tuple[int, int]:
+    async def _measure_loudness(self, filepath: str) -> dict:
         """
-        全楽曲をノーマライズ
+        ラウドネス測定（loudnormの1パス目）
 
         Returns:
-            (処理数, 成功数)
+            測定値（input_i/input_tp/input_lra/input_thresh）、失敗時はNone
         """
-        supported_ext = {'.mp3', '.wav', '.flac', '.m4a'}
-        files_to_normalize = []
+        import json
+        import re
 
-        if os.path.exists(config.MUSIC_DIR):
-            for file in os.listdir(config.MUSIC_DIR):
-                filepath = os.path.join(config.MUSIC_DIR, file)
-                if os.path.splitext(file)[1].lower() in supported_ext:
-                    if not self._is_normalized(filepath):
-                        files_to_normalize.append(filepath)
+        filename = os.path.basename(filepath)
+        loop = asyncio.get_event_loop()
+
+        # 1パス目: ラウドネス測定
+        cmd1 = [
+            'ffmpeg', '-i', filepath, '-vn',
+            '-af', f'loudnorm=I={self.TARGET_LUFS}:TP={self.TRUE_PEAK}:LRA=11:print_format=json',
+            '-f', 'null', '-'
+        ]
+
+        process1 = await loop.run_in_executor(
+            None,
+            lambda: subprocess.run(cmd1, capture_output=True, text=True)
+        )
+
+        if process1.returncode != 0:
+            print(f"❌ 測定失敗: {filename}", flush=True)
+            return None
+
+        # stderrからJSONを抽出（loudnormはstderrに出力）
+        stderr = process1.stderr
+        json_match = re.search(r'\{[^{}]*"input_i"[^{}]*\}', stderr, re.DOTALL)
+        if not json_match:
+            print(f"❌ 測定データ取得失敗: {filename}", flush=True)
+            return None
 
-        if not files_to_normalize:
-            return 0, 0
+        try:
+            return json.loads(json_match.group())
+        except json.JSONDecodeError:
+            print(f"❌ 測定データパース失敗: {filename}", flush=True)
+            return None
+
+    def _get_normalize_workers(self) -> int:
+        """ノーマライズの並列数を決定"""
+        if self.config.NORMALIZE_WORKERS > 0:
+            return self.config.NORMALIZE_WORKERS
+
+        # 実際の同時実行数は全局共有のCPU予算で制限（配信中の局があればその分減る）
+        return max(1, int(scheduler.get_budget()) - 1)
+
+    async def _normalize_scheduled(self, filepath: str) -> bool:
+        """CPU予算に空きができるのを待ってからノーマライズ"""
+        async with scheduler.batch(self.station.id, 'normalize', scheduler.NORMALIZE_COST):
+            return await self._normalize_file(filepath)
+
+    async def _queue_unnormalized(self, pipeline: _NormalizePipeline, exclude: set):
+        """ローカルの未ノーマライズ楽曲をノーマライズ待ちに追加（これからダウンロードするファイルは除く）"""
+        candidates = [f for f in self._get_normalizable_paths() if os.path.basename(f) not in exclude]
+
+        # 未知のファイルは内容ハッシュで判定（リネーム・上書きに対応）
+        loop = asyncio.get_event_loop()
+        files_to_normalize = await loop.run_in_executor(
+            None,
+            lambda: [f for f in candidates if not self._is_normalized(f, allow_hash=True)]
+        )
+
+        for filepath in files_to_normalize:
+            await pipeline.put(filepath)
+
+    def _update_progress(self):
+        """ダウンロードとノーマライズの進捗をまとめて表示"""
+        parts = []
+        if self._download_progress:
+            parts.append(self._download_progress)
+
+        pipeline = self._pipeline
+        if pipeline and pipeline.queued:
+            parts.append(f"ノーマライズ {pipeline.completed}/{pipeline.queued} ({pipeline.rate():.1f}曲/分)")
+
+        if parts:
+            self.progress = " / ".join(parts)
 
-        total = len(files_to_normalize)
-        success = 0
+    def _clear_music_dir(self):
+        """楽曲ディレクトリをクリア"""
+        for filepath in self.station.library.get_paths():
+            try:
+                os.remove(filepath)
+            except Exception:
+                pass
 
-        for i, filepath in enumerate(files_to_normalize, 1):
-            self.progress = f"ノーマライズ中... ({i}/{total})"
-            if await self._normalize_file(filepath):
-                success += 1
+    def _load_manifest(self) -> dict:
+        """前回同期時のリモートファイル一覧を読み込み"""
+        try:
+            if os.path.exists(self._manifest_path):
+                with open(self._manifest_path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"マニフェスト読み込みエラー: {e}", flush=True)
+        return {'folder_id': None, 'files': {}}
 
-        self._save_normalized_list()
-        return total, success
+    def _save_manifest(self, manifest: dict):
+        """リモートファイル一覧を保存（一時ファイル経由で置き換え）"""
+        try:
+            temp_path = self._manifest_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self._manifest_path)
+        except Exception as e:
+            print(f"マニフェスト保存エラー: {e}", flush=True)
 
-    def _clear_music_dir(self):
-        """楽曲ディレクトリをクリア"""
+    @staticmethod
+    def _is_remote_changed(old: dict, new: dict) -> bool:
+        """リモートファイルの内容が変わったか（取得できた項目のみ比較）"""
+        for key in ('md5', 'size', 'modified_time'):
+            if old.get(key) is not None and new.get(key) is not None and old[key] != new[key]:
+                return True
+        return False
+
+    def _diff_manifest(self, remote_files: list, manifest_files: dict, local_names: set) -> dict:
+        """
+        リモート一覧と前回のマニフェストを比較
+
+        Returns:
+            {'added', 'changed', 'renamed', 'removed', 'unchanged'}
+            renamedは (旧エントリ, 新エントリ) のタプル、それ以外はエントリ一覧
+        """
         supported_ext = {'.mp3', '.wav', '.flac', '.m4a', '.ogg'}
-        if os.path.exists(config.MUSIC_DIR):
-            for file in os.listdir(config.MUSIC_DIR):
-                if os.path.splitext(file)[1].lower() in supported_ext:
-                    filepath = os.path.join(config.MUSIC_DIR, file)
-                    try:
-                        os.remove(filepath)
-                    except Exception:
-                        pass
-        # ノーマライズ済みリストもクリア
-        self.normalized_files.clear()
-        self._save_normalized_list()
-
-    async def sync(self, url: str = None, normalize: bool = True, replace: bool = False) -> tuple[bool, str, dict]:
+        diff = {'added': [], 'changed': [], 'renamed': [], 'removed': [], 'unchanged': []}
+        remote_ids = set()
+
+        for remote in remote_files:
+            if os.path.splitext(remote['name'])[1].lower() not in supported_ext:
+                continue
+            remote_ids.add(remote['id'])
+            old = manifest_files.get(remote['id'])
+
+            if old is None:
+                # マニフェスト導入前に同期済みのファイルはそのまま引き継ぐ
+                if remote['name'] in local_names:
+                    diff['unchanged'].append(remote)
+                else:
+                    diff['added'].append(remote)
+            elif self._is_remote_changed(old, remote):
+                diff['changed'].append(remote)
+            elif old['name'] != remote['name'] and old['name'] in local_names:
+                diff['renamed'].append((old, remote))
+            elif remote['name'] not in local_names:
+                # ローカルで削除された場合は再取得
+                diff['added'].append(remote)
+            else:
+                diff['unchanged'].append(remote)
+
+        for file_id, old in manifest_files.items():
+            if file_id not in remote_ids:
+                diff['removed'].append(dict(old, id=file_id))
+
+        return diff
+
+    @staticmethod
+    def _manifest_entry(remote: dict) -> dict:
+        return {key: remote[key] for key in ('name', 'size', 'modified_time', 'md5')}
+
+    async def _sync_files(self, url: str, prune: bool, details: dict,
+                          pipeline: _NormalizePipeline = None) -> dict:
+        """
+        マニフェストとの差分のみダウンロード（pipeline指定時は完了したファイルから順にノーマライズ）
+
+        Returns:
+            更新後のマニフェスト
+        """
+        loop = asyncio.get_event_loop()
+
+        self.progress = "ファイル一覧を取得中..."
+        folder_id = gdrive_client.extract_folder_id(url)
+        remote_files = await loop.run_in_executor(None, gdrive_client.list_folder, url)
+
+        manifest = self._load_manifest()
+        if manifest.get('folder_id') != folder_id:
+            # 別のフォルダに切り替えた場合は前回の一覧を使わない
+            manifest = {'folder_id': folder_id, 'files': {}}
+        manifest_files = manifest['files']
+
+        diff = self._diff_manifest(remote_files, manifest_files, set(self.station.library.get_names()))
+        new_files = {}
+
+        for remote in diff['unchanged']:
+            new_files[remote['id']] = self._manifest_entry(remote)
+
+        # リモートでリネームされたファイルはローカルもリネーム（再ダウンロードしない）
+        for old, remote in diff['renamed']:
+            try:
+                os.replace(os.path.join(self.config.MUSIC_DIR, old['name']),
+                           os.path.join(self.config.MUSIC_DIR, remote['name']))
+                new_files[remote['id']] = self._manifest_entry(remote)
+            except OSError as e:
+                print(f"リネーム失敗: {old['name']} → {remote['name']} - {e}", flush=True)
+                diff['added'].append(remote)
+
+        # 新規・変更ファイルのみ並列ダウンロード
+        targets = diff['added'] + diff['changed']
+        os.makedirs(self.config.MUSIC_DIR, exist_ok=True)
+
+        # ダウンロードと並行して既存の未ノーマライズ楽曲も処理（上書き・削除予定のものは除く）
+        queue_task = None
+        if pipeline:
+            exclude = {remote['name'] for remote in targets}
+            if prune:
+                exclude.update(old['name'] for old in diff['removed'])
+            queue_task = asyncio.create_task(self._queue_unnormalized(pipeline, exclude))
+
+        try:
+            failed = await self._download_files(targets, new_files, pipeline)
+            if queue_task:
+                await queue_task
+        finally:
+            if queue_task:
+                queue_task.cancel()
+
+        # リモートで削除されたファイル（pruneが有効な場合のみローカルも削除）
+        for old in diff['removed']:
+            if not prune:
+                continue
+            try:
+                os.remove(os.path.join(self.config.MUSIC_DIR, old['name']))
+            except OSError:
+                pass
+
+        details.update(
+            added=sum(1 for remote in diff['added'] if remote['id'] in new_files),
+            changed=sum(1 for remote in diff['changed'] if remote['id'] in new_files),
+            renamed=len(diff['renamed']),
+            removed=len(diff['removed']),
+            pruned=prune,
+            unchanged=len(diff['unchanged']),
+            download_failed=failed,
+        )
+
+        return {'folder_id': folder_id, 'files': new_files}
+
+    async def _download_files(self, targets: list, new_files: dict,
+                              pipeline: _NormalizePipeline = None) -> int:
+        """
+        ファイルを並列ダウンロードし、成功したものをマニフェストに追加
+        （pipeline指定時はノーマライズ待ちにも追加）
+
+        Returns:
+            失敗数
         """
-        Google Driveフォルダから楽曲を同期
+        total = len(targets)
+        if not total:
+            return 0
+
+        completed = 0
+        failed = 0
+        started_at = time.monotonic()
+        start_bytes = downloader.bytes_downloaded
+        print(f"ダウンロード開始: {total}曲 ({self.config.DOWNLOAD_CONCURRENCY}並列)", flush=True)
+
+        def update_progress():
+            elapsed = time.monotonic() - started_at
+            speed = (downloader.bytes_downloaded - start_bytes) / elapsed / 1024 / 1024 if elapsed > 0 else 0.0
+            self._download_progress = f"ダウンロード {completed}/{total} ({speed:.1f}MB/s)"
+            self._update_progress()
+
+        async def download_one(remote: dict):
+            dest_path = os.path.join(self.config.MUSIC_DIR, remote['name'])
+            try:
+                await downloader.download(remote, dest_path)
+                return remote, None
+            except Exception as e:
+                return remote, e
+
+        update_progress()
+        tasks = [asyncio.create_task(download_one(remote)) for remote in targets]
+        try:
+            # 完了した順に集計
+            for future in asyncio.as_completed(tasks):
+                remote, error = await future
+                completed += 1
+                if error:
+                    failed += 1
+                    print(f"❌ ダウンロード失敗: {remote['name']} - {error}", flush=True)
+                else:
+                    new_files[remote['id']] = self._manifest_entry(remote)
+                    if pipeline:
+                        await pipeline.put(os.path.join(self.config.MUSIC_DIR, remote['name']))
+                update_progress()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return failed
+
+    async def sync(self, url: str = None, normalize: bool = True, replace: bool = False,
+                   prune: bool = False) -> tuple[bool, str, dict]:
+        """
+        Google Driveフォルダから楽曲を同期（前回からの差分のみダウンロード）
 
         Args:
             url: Google Drive共有フォルダURL (省略時は保存済みURLを使用)
             normalize: ダウンロード後にラウドネスノーマライズを実行するか
             replace: 既存の楽曲を削除して入れ替えるか（配信中は不可）
+            prune: リモートで削除された楽曲をローカルからも削除するか
 
         Returns:
             (success, message, details)
@@ -203,142 +568,150 @@ class GDriveSync:
 
         # 入れ替えモードの場合、配信中かチェック
         if replace:
-            from core.stream_manager import stream_manager
-            if stream_manager.is_streaming:
+            if self.station.stream_manager.is_streaming:
                 return False, "配信中は楽曲の入れ替えができません。\n配信を停止してから再度お試しください。", {}
 
         # URLの決定
         if url:
-            config.set_gdrive_url(url)
-            await config.save()
+            self.config.set_gdrive_url(url)
+            await self.config.save()
         else:
-            url = config.get_gdrive_url()
+            url = self.config.get_gdrive_url()
 
         if not url:
             return False, "Google DriveのURLが設定されていません。\n`/sync <URL>` でURLを指定してください。", {}
 
         self.is_syncing = True
         self.progress = "同期を開始..."
+        sync_started = time.monotonic()
 
         details = {'track_count': 0, 'normalized_count': 0, 'normalized_success': 0, 'replaced': replace}
 
         try:
-            # 入れ替えモードの場合、既存の楽曲を削除
+            # 入れ替えモードの場合、既存の楽曲とマニフェストを削除
             if replace:
                 self.progress = "既存の楽曲を削除中..."
                 self._clear_music_dir()
+                if os.path.exists(self._manifest_path):
+                    os.remove(self._manifest_path)
+                await self.station.library.reconcile()
 
-            # gdownでフォルダをダウンロード
-            import gdown
+            # ノーマライズはダウンロードの完了を待たずに並行して実行
+            if normalize:
+                self._pipeline = _NormalizePipeline(
+                    self._normalize_scheduled, self._get_normalize_workers(), self._update_progress
+                )
+                self._pipeline.start()
 
-            self.progress = "ダウンロード中..."
+            manifest = await self._sync_files(url, prune, details, self._pipeline)
+            self._download_progress = ""
 
-            # 非同期でgdownを実行
-            loop = asyncio.get_event_loop()
-
-            # 既存ファイルをクリアするかどうかはオプション
-            # ここでは上書きモードで実行
-            await loop.run_in_executor(
-                None,
-                lambda: gdown.download_folder(
-                    url,
-                    output=config.MUSIC_DIR,
-                    quiet=False,
-                    use_cookies=False
-                )
-            )
+            # ダウンロード結果をライブラリに反映（inotifyの取りこぼし対策）
+            await self.station.library.reconcile()
+            self._save_manifest(manifest)
 
             # 同期完了時刻を記録
             timestamp = datetime.now().isoformat()
-            config.set_last_sync(timestamp)
-            await config.save()
-
-            # 楽曲数をカウント
-            count = self._count_tracks()
-            details['track_count'] = count
+            self.config.set_last_sync(timestamp)
+            await self.config.save()
 
-            # ラウドネスノーマライズ
-            if normalize:
+            # 残りのノーマライズの完了を待機
+            if self._pipeline:
                 self.progress = "ラウドネスノーマライズ中..."
-                normalized_count, normalized_success = await self._normalize_all()
+                self._update_progress()
+                normalized_count, normalized_success = await self._pipeline.close()
                 details['normalized_count'] = normalized_count
                 details['normalized_success'] = normalized_success
+                if normalized_count:
+                    print(f"ノーマライズ完了: {normalized_success}/{normalized_count}曲", flush=True)
+                self._pipeline = None
+                # ノーマライズで置き換えたファイルを反映
+                await self.station.library.reconcile()
+
+            # トラックインデックスを更新（ノーマライズで置き換えたファイルも含めて差分のみ取得）
+            # 増減した楽曲は配信中のプレイリストにも差分で反映
+            self.progress = "楽曲情報を取得中..."
+            await self.station.track_index.scan()
+
+            # 楽曲数をカウント
+            count = self._count_tracks()
+            details['track_count'] = count
 
             self.progress = ""
             self.is_syncing = False
 
-            # プレイリストを再読み込み（配信中でも反映）
-            from core.audio_player import audio_player
-            audio_player.reload_playlist()
-
             # メッセージ作成
-            message = f"同期完了: {count}曲"
+            message = f"同期完了: {count}曲 ({self.format_diff_summary(details)})"
             if normalize and details['normalized_count'] > 0:
                 message += f" (ノーマライズ: {details['normalized_success']}/{details['normalized_count']})"
 
+            metrics.sync_duration.labels(self.station.id, 'success').observe(time.monotonic() - sync_started)
             return True, message, details
 
         except Exception as e:
-            self.last_error = str(e)
+            error = gdrive_client.mask_key(str(e))
+            self.last_error = error
             self.progress = ""
             self.is_syncing = False
-            return False, f"同期エラー: {e}", details
+            metrics.sync_duration.labels(self.station.id, 'error').observe(time.monotonic() - sync_started)
+            return False, f"同期エラー: {error}", details
+
+        finally:
+            if self._pipeline:
+                self._pipeline.cancel()
+                self._pipeline = None
+            self._download_progress = ""
+
+    @staticmethod
+    def format_diff_summary(details: dict) -> str:
+        """差分同期の結果を1行にまとめる"""
+        summary = (f"追加 {details.get('added', 0)} / 更新 {details.get('changed', 0)} / "
+                   f"削除 {details.get('removed', 0)}")
+        if details.get('removed') and not details.get('pruned'):
+            summary += "（ローカルは保持）"
+        if details.get('renamed'):
+            summary += f" / リネーム {details['renamed']}"
+        if details.get('download_failed'):
+            summary += f" / 失敗 {details['download_failed']}"
+        return summary
 
     def _count_tracks(self) -> int:
         """楽曲ファイル数をカウント"""
-        count = 0
-        supported_ext = {'.mp3', '.wav', '.flac', '.m4a', '.ogg'}
-
-        if os.path.exists(config.MUSIC_DIR):
-            for file in os.listdir(config.MUSIC_DIR):
-                if os.path.splitext(file)[1].lower() in supported_ext:
-                    count += 1
-        return count
+        return self.station.library.count()
 
     def get_status(self) -> dict:
         """同期状態を取得"""
         return {
             'is_syncing': self.is_syncing,
             'progress': self.progress,
-            'last_sync': config.get_last_sync(),
-            'gdrive_url': config.get_gdrive_url(),
+            'last_sync': self.config.get_last_sync(),
+            'gdrive_url': self.config.get_gdrive_url(),
             'track_count': self._count_tracks(),
             'last_error': self.last_error
         }
 
+    def _get_normalizable_paths(self) -> list[str]:
+        """ノーマライズ対象の楽曲パス一覧"""
+        return self.station.library.get_paths({'.mp3', '.wav', '.flac', '.m4a'})
+
     def has_unnormalized_tracks(self) -> bool:
         """未ノーマライズの楽曲があるかチェック"""
-        supported_ext = {'.mp3', '.wav', '.flac', '.m4a'}
-        if os.path.exists(config.MUSIC_DIR):
-            for file in os.listdir(config.MUSIC_DIR):
-                if os.path.splitext(file)[1].lower() in supported_ext:
-                    filepath = os.path.join(config.MUSIC_DIR, file)
-                    if not self._is_normalized(filepath):
-                        return True
-        return False
+        return self.get_unnormalized_count() > 0
 
     def get_unnormalized_count(self) -> int:
-        """未ノーマライズの楽曲数を取得"""
-        count = 0
-        supported_ext = {'.mp3', '.wav', '.flac', '.m4a'}
-        if os.path.exists(config.MUSIC_DIR):
-            for file in os.listdir(config.MUSIC_DIR):
-                if os.path.splitext(file)[1].lower() in supported_ext:
-                    filepath = os.path.join(config.MUSIC_DIR, file)
-                    if not self._is_normalized(filepath):
-                        count += 1
+        """未ノーマライズの楽曲数を取得（ライブラリとキャッシュが変わらない間は再計算しない）"""
+        key = (self.station.library.version, normalization_cache.version, self.config.NORMALIZE_MODE)
+        cached_key, count = self._unnormalized_cache
+        if cached_key == key:
+            return count
+
+        count = sum(1 for filepath in self._get_normalizable_paths() if not self._is_normalized(filepath))
+        self._unnormalized_cache = (key, count)
         return count
 
     def get_tracks(self) -> list[str]:
-        """楽曲ファイル一覧を取得"""
-        tracks = []
-        supported_ext = {'.mp3', '.wav', '.flac', '.m4a', '.ogg'}
-
-        if os.path.exists(config.MUSIC_DIR):
-            for file in sorted(os.listdir(config.MUSIC_DIR)):
-                if os.path.splitext(file)[1].lower() in supported_ext:
-                    tracks.append(file)
-        return tracks
+        """楽曲ファイル一覧を取得（ファイル名順）"""
+        return list(self.station.library.get_names())
 
     async def sync_background(self, url: str = None) -> tuple[bool, str]:
         """
@@ -355,10 +728,10 @@ class GDriveSync:
 
         # URLの決定
         if url:
-            config.set_background_url(url)
-            await config.save()
+            self.config.set_background_url(url)
+            await self.config.save()
         else:
-            url = config.get_background_url()
+            url = self.config.get_background_url()
 
         if not url:
             return False, "背景画像のURLが設定されていません。\n`/background sync <URL>` でURLを指定してください。"
@@ -370,10 +743,10 @@ class GDriveSync:
             import gdown
 
             # アセットディレクトリを作成
-            os.makedirs(config.ASSETS_DIR, exist_ok=True)
+            os.makedirs(self.config.ASSETS_DIR, exist_ok=True)
 
             # 一時ファイルパス
-            temp_path = os.path.join(config.ASSETS_DIR, 'background_temp')
+            temp_path = os.path.join(self.config.ASSETS_DIR, 'background_temp')
 
             # 非同期でgdownを実行
             loop = asyncio.get_event_loop()
@@ -401,12 +774,12 @@ class GDriveSync:
 
             # 既存の背景画像を削除
             for old_ext in ['jpg', 'jpeg', 'png']:
-                old_path = os.path.join(config.ASSETS_DIR, f'background.{old_ext}')
+                old_path = os.path.join(self.config.ASSETS_DIR, f'background.{old_ext}')
                 if os.path.exists(old_path):
                     os.remove(old_path)
 
             # 最終的なファイル名でリネーム
-            final_path = os.path.join(config.ASSETS_DIR, f'background.{ext}')
+            final_path = os.path.join(self.config.ASSETS_DIR, f'background.{ext}')
             os.rename(temp_path, final_path)
 
             self.progress = ""
@@ -419,11 +792,8 @@ class GDriveSync:
             self.progress = ""
             self.is_syncing = False
             # 一時ファイルを削除
-            temp_path = os.path.join(config.ASSETS_DIR, 'background_temp')
+            temp_path = os.path.join(self.config.ASSETS_DIR, 'background_temp')
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             return False, f"エラー: {e}"
 
-
-# シングルトン
-gdrive_sync = GDriveSync()
@@ -0,0 +1,272 @@
+"""
+SUNO Radio Lite - 楽曲ライブラリ
+楽曲ディレクトリのファイル一覧をメモリ上に保持（inotifyで即時反映 + 定期的な再走査）
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import threading
+
+
+SUPPORTED_EXT = {'.mp3', '.wav', '.flac', '.m4a', '.ogg'}
+
+# inotify定数（linux/inotify.h）
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """inotify関数を持つlibcを読み込み（非Linux等はNone）"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class MusicLibrary:
+    """楽曲ディレクトリのライブビュー（ファイル名 -> (サイズ, mtime_ns)）"""
+
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+        self._lock = threading.Lock()
+        self._files = None
+        self._sorted_names = None
+        self._listeners = []
+        self._inotify_fd = None
+        self._watch_lost = False
+        self._reconcile_task = None
+        self._loop = None
+        # 変更のたびに増加（呼び出し側のキャッシュ判定用）
+        self.version = 0
+
+    # --- 走査 ---
+
+    def _scan(self) -> dict:
+        """楽曲ディレクトリを走査"""
+        files = {}
+        if not os.path.exists(self.config.MUSIC_DIR):
+            return files
+
+        for entry in os.scandir(self.config.MUSIC_DIR):
+            if not self._is_supported(entry.name) or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _is_supported(self, name: str) -> bool:
+        return os.path.splitext(name)[1].lower() in SUPPORTED_EXT
+
+    def _ensure_loaded(self):
+        """未走査なら同期的に走査（start前に呼ばれた場合）"""
+        if self._files is None:
+            files = self._scan()
+            with self._lock:
+                if self._files is None:
+                    self._files = files
+                    self.version += 1
+
+    def _apply(self, files: dict):
+        """走査結果で置き換え（差分があればリスナーに通知）"""
+        with self._lock:
+            if files == self._files:
+                return
+            self._files = files
+            self._sorted_names = None
+            self.version += 1
+        self._notify()
+
+    def _update(self, name: str):
+        """1ファイル分を反映（存在しなければ削除）"""
+        try:
+            stat = os.stat(os.path.join(self.config.MUSIC_DIR, name))
+            value = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            value = None
+
+        with self._lock:
+            if self._files is None or self._files.get(name) == value:
+                return
+            if value is None:
+                self._files.pop(name, None)
+            else:
+                self._files[name] = value
+            self._sorted_names = None
+            self.version += 1
+        self._notify()
+
+    async def reconcile(self):
+        """ディレクトリを再走査してinotifyで取りこぼした変更を反映"""
+        loop = asyncio.get_event_loop()
+        files = await loop.run_in_executor(None, self._scan)
+        self._apply(files)
+
+    # --- inotify ---
+
+    async def start(self):
+        """初回走査とinotify監視・定期再走査を開始"""
+        self._loop = asyncio.get_event_loop()
+        await self.reconcile()
+
+        if self._inotify_fd is None:
+            self._start_watch()
+
+        if self._reconcile_task is None and self.config.LIBRARY_RECONCILE_SECONDS > 0:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    def _start_watch(self):
+        """楽曲ディレクトリのinotify監視を開始（利用できない場合は定期再走査のみ）"""
+        libc = _load_libc()
+        if libc is None or not os.path.isdir(self.config.MUSIC_DIR):
+            print("inotify利用不可: 楽曲ディレクトリは定期再走査のみで更新", flush=True)
+            return
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            print(f"inotify初期化エラー: {os.strerror(ctypes.get_errno())}", flush=True)
+            return
+
+        if libc.inotify_add_watch(fd, os.fsencode(self.config.MUSIC_DIR), WATCH_MASK) < 0:
+            print(f"inotify監視エラー: {os.strerror(ctypes.get_errno())}", flush=True)
+            os.close(fd)
+            return
+
+        self._inotify_fd = fd
+        self._loop.add_reader(fd, self._on_inotify_readable)
+        print(f"楽曲ディレクトリ監視開始: {self.config.MUSIC_DIR}", flush=True)
+
+    def _stop_watch(self):
+        """inotify監視を停止"""
+        if self._inotify_fd is None:
+            return
+        self._loop.remove_reader(self._inotify_fd)
+        os.close(self._inotify_fd)
+        self._inotify_fd = None
+
+    def _on_inotify_readable(self):
+        """inotifyイベントを読み込んで反映"""
+        try:
+            data = os.read(self._inotify_fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"inotify読み込みエラー: {e}", flush=True)
+            self._stop_watch()
+            return
+
+        changed = set()
+        rescan = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # キューあふれ: 取りこぼしがあるので全体を再走査
+                rescan = True
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                # ディレクトリ自体が消えた/移動した（定期再走査時に監視を再開）
+                rescan = True
+                self._watch_lost = True
+                self._stop_watch()
+                break
+            elif name and not mask & IN_ISDIR and self._is_supported(name):
+                changed.add(name)
+
+        for name in changed:
+            self._update(name)
+
+        if rescan:
+            asyncio.ensure_future(self.reconcile())
+
+    async def _reconcile_loop(self):
+        """定期的に再走査（ネットワークボリューム等でinotifyが届かない場合の保険）"""
+        while True:
+            await asyncio.sleep(self.config.LIBRARY_RECONCILE_SECONDS)
+            try:
+                await self.reconcile()
+                # ディレクトリが作り直された場合は監視を再開
+                if self._watch_lost and os.path.isdir(self.config.MUSIC_DIR):
+                    self._watch_lost = False
+                    self._start_watch()
+            except Exception as e:
+                print(f"楽曲ディレクトリ再走査エラー: {e}", flush=True)
+
+    # --- 変更通知 ---
+
+    def add_listener(self, callback):
+        """変更時に呼び出すコールバックを登録（イベントループ上で呼ばれる）"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"楽曲ライブラリ通知エラー: {e}", flush=True)
+
+    # --- 参照 ---
+
+    def get_files(self) -> dict:
+        """ファイル名 -> (サイズ, mtime_ns) のコピー"""
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._files)
+
+    def get_names(self) -> tuple:
+        """ファイル名一覧（ファイル名順）"""
+        self._ensure_loaded()
+        with self._lock:
+            if self._sorted_names is None:
+                self._sorted_names = tuple(sorted(self._files))
+            return self._sorted_names
+
+    def get_paths(self, extensions: set = None) -> list[str]:
+        """楽曲パス一覧（拡張子で絞り込み可）"""
+        return [
+            os.path.join(self.config.MUSIC_DIR, name)
+            for name in self.get_names()
+            if extensions is None or os.path.splitext(name)[1].lower() in extensions
+        ]
+
+    def get_stat(self, filepath: str) -> tuple:
+        """(サイズ, mtime_ns)（楽曲ディレクトリ外・未登録ならNone）"""
+        if os.path.dirname(os.path.abspath(filepath)) != os.path.abspath(self.config.MUSIC_DIR):
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            return self._files.get(os.path.basename(filepath))
+
+    def count(self) -> int:
+        """楽曲数"""
+        self._ensure_loaded()
+        with self._lock:
+            return len(self._files)
+
@@ -0,0 +1,147 @@
+"""
+SUNO Radio Lite - メディアクロック
+音声・映像の書き込みを共通の単調増加クロックで実時間にペーシングし、A/Vのずれを計測
+"""
+
+import threading
+import time
+from config import config
+
+
+# s16le
+BYTES_PER_SECOND = config.SAMPLE_RATE * config.CHANNELS * 2
+
+
+class MediaClock:
+    """配信FFmpeg 1回分の入力を基準とするマスタークロック"""
+
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+        self._lock = threading.Lock()
+        self._track_video = True
+        self._epoch = None
+        self._audio_bytes = 0
+        self._video_frames = 0
+        self._max_drift = 0.0
+        # 補正の記録
+        self.silence_insert_count = 0
+        self.silence_insert_seconds = 0.0
+        self.video_catchup_count = 0
+        self.video_catchup_frames = 0
+
+    def reset(self, track_video: bool = True):
+        """配信FFmpegの起動ごとにクロックを初期化（入力のタイムスタンプは0から始まるため）"""
+        with self._lock:
+            self._track_video = track_video
+            self._epoch = None
+            self._audio_bytes = 0
+            self._video_frames = 0
+            self._max_drift = 0.0
+
+    def start(self):
+        """最初の書き込み時にクロックを開始（2回目以降は何もしない）"""
+        with self._lock:
+            if self._epoch is None:
+                self._epoch = time.monotonic()
+
+    def elapsed(self) -> float:
+        """クロック開始からの経過秒数"""
+        epoch = self._epoch
+        if epoch is None:
+            return 0.0
+        return time.monotonic() - epoch
+
+    # --- 音声 ---
+
+    def audio_position(self) -> float:
+        """書き込み済みPCMの再生位置（秒）"""
+        return self._audio_bytes / BYTES_PER_SECOND
+
+    def audio_writable_bytes(self) -> int:
+        """今書き込んでよいバイト数（実時間+先行分まで、フレーム境界に揃える）"""
+        allowed = int((self.elapsed() + self.config.AV_SYNC_LEAD_SECONDS) * BYTES_PER_SECOND)
+        allowed -= self._audio_bytes
+        return max(0, allowed - allowed % (self.config.CHANNELS * 2))
+
+    def audio_lag_bytes(self) -> int:
+        """実時間に対する音声の遅れ（バイト、フレーム境界に揃える）"""
+        lag = int(self.elapsed() * BYTES_PER_SECOND) - self._audio_bytes
+        return max(0, lag - lag % (self.config.CHANNELS * 2))
+
+    def add_audio(self, nbytes: int):
+        """音声の書き込みを記録（書き込みスレッドから呼び出すためreset()と同じロックで更新）"""
+        with self._lock:
+            self._audio_bytes += nbytes
+            self._update_drift()
+
+    def record_silence_insert(self, nbytes: int):
+        """アンダーラン補正で挿入した無音を記録"""
+        seconds = nbytes / BYTES_PER_SECOND
+        self.silence_insert_count += 1
+        self.silence_insert_seconds += seconds
+        print(f"A/V補正: 音声の遅れ {seconds:.2f}秒を無音で補填", flush=True)
+
+    # --- 映像 ---
+
+    def video_position(self) -> float:
+        """書き込み済みフレームの再生位置（秒）"""
+        return self._video_frames / self.config.STREAM_FPS
+
+    def video_frames_due(self) -> int:
+        """今書き込むべきフレーム数（実時間+先行分まで）"""
+        due = int((self.elapsed() + self.config.AV_SYNC_LEAD_SECONDS) * self.config.STREAM_FPS)
+        return max(0, due - self._video_frames)
+
+    def add_video(self, frames: int = 1):
+        """映像の書き込みを記録（書き込みスレッドから呼び出すためreset()と同じロックで更新）"""
+        with self._lock:
+            self._video_frames += frames
+            self._update_drift()
+
+    def record_video_catchup(self, frames: int):
+        """遅れたフレームの連続書き込みを記録"""
+        self.video_catchup_count += 1
+        self.video_catchup_frames += frames
+        print(f"A/V補正: 映像の遅れ {frames}フレームを連続書き込みで補填", flush=True)
+
+    # --- 計測 ---
+
+    def drift(self) -> float:
+        """音声と映像のずれ（秒、正なら音声が先行）。映像を追跡しない場合はNone"""
+        if not self._track_video or self._video_frames == 0:
+            return None
+        return self.audio_position() - self.video_position()
+
+    def _update_drift(self):
+        # ロック内で呼び出す。開始直後の先行書き込み中は片側だけ進むため除外
+        if self.elapsed() < self.config.AV_SYNC_LEAD_SECONDS:
+            return
+        drift = self.drift()
+        if drift is not None and abs(drift) > abs(self._max_drift):
+            self._max_drift = drift
+
+    def get_stats(self) -> dict:
+        """A/Vオフセットと補正の統計（ミリ秒）"""
+        if self._epoch is None:
+            return None
+
+        elapsed = self.elapsed()
+        drift = self.drift()
+        stats = {
+            'elapsed_seconds': round(elapsed, 1),
+            'audio_offset_ms': round((self.audio_position() - elapsed) * 1000, 1),
+            'video_offset_ms': None,
+            'drift_ms': None,
+            'max_drift_ms': None,
+            'silence_insert_count': self.silence_insert_count,
+            'silence_insert_seconds': round(self.silence_insert_seconds, 3),
+            'video_catchup_count': self.video_catchup_count,
+            'video_catchup_frames': self.video_catchup_frames,
+        }
+        if drift is not None:
+            stats['video_offset_ms'] = round((self.video_position() - elapsed) * 1000, 1)
+            stats['drift_ms'] = round(drift * 1000, 1)
+            stats['max_drift_ms'] = round(self._max_drift * 1000, 1)
+        return stats
+
@@ -0,0 +1,272 @@
+"""
+SUNO Radio Lite - メトリクス
+パイプライン全体のカウンター・ヒストグラムをPrometheus形式で公開（METRICS_PORT設定時のみHTTPで待ち受け）
+"""
+
+import asyncio
+import bisect
+import threading
+from config import config
+
+
+# 待ち時間のヒストグラムの区切り（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 障害の発生から復旧までの区切り（秒、出力の停止は検知の閾値を含む）
+OUTAGE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+# 同期・ノーマライズ等の処理時間の区切り（秒）
+DURATION_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+class _Shards:
+    """
+    スレッドごとの加算セル
+
+    各セルは所有スレッドのみが書き込むためロック不要（配信中の書き込みスレッドから常時更新できる）。
+    読み出しはイベントループ上の1箇所のみで、終了したスレッドのセルは基準値に統合
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._cells = []
+        self._base = [0] * size
+
+    def cell(self) -> list:
+        """呼び出し元スレッドのセル"""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0] * self._size
+            self._local.cell = cell
+            self._cells.append((threading.current_thread(), cell))
+            return cell
+
+    def totals(self) -> list:
+        """全セルの合計"""
+        totals = list(self._base)
+        for entry in list(self._cells):
+            thread, cell = entry
+            if not thread.is_alive():
+                # 終了したスレッドは以後書き込まないため基準値に移す
+                self._cells.remove(entry)
+                for index, value in enumerate(cell):
+                    self._base[index] += value
+            for index, value in enumerate(cell):
+                totals[index] += value
+        return totals
+
+
+class _CounterValue:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1):
+        """加算（スレッドからも呼び出し可、ロックなし）"""
+        self._shards.cell()[0] += amount
+
+    def samples(self, name: str, labels: str) -> list:
+        return [f"{name}{labels} {_format_value(self._shards.totals()[0])}"]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple):
+        self._buckets = buckets
+        # 区切りごとの件数 + 上限なし + 合計 + 件数
+        self._shards = _Shards(len(buckets) + 3)
+
+    def observe(self, value: float):
+        """観測値を記録（スレッドからも呼び出し可、ロックなし）"""
+        cell = self._shards.cell()
+        cell[bisect.bisect_left(self._buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def samples(self, name: str, labels: str) -> list:
+        totals = self._shards.totals()
+        lines = []
+        cumulative = 0
+        bounds = [_format_value(bound) for bound in self._buckets] + ['+Inf']
+        for bound, count in zip(bounds, totals):
+            cumulative += count
+            lines.append(f"{name}_bucket{_add_label(labels, 'le', bound)} {cumulative}")
+        lines.append(f"{name}_sum{labels} {_format_value(totals[-2])}")
+        lines.append(f"{name}_count{labels} {totals[-1]}")
+        return lines
+
+
+class _Metric:
+    """ラベルの組み合わせごとに値を持つメトリクス"""
+
+    def __init__(self, kind: str, name: str, help_text: str, labelnames: tuple, factory):
+        self.kind = kind
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._factory = factory
+        self._values = {}
+
+    def labels(self, *values):
+        """ラベル値に対応する値（頻繁に更新する箇所では取得した値を保持して使う）"""
+        value = self._values.get(values)
+        if value is None:
+            value = self._values.setdefault(values, self._factory())
+        return value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, value in list(self._values.items()):
+            lines += value.samples(self.name, _format_labels(self.labelnames, label_values))
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _add_label(labels: str, name: str, value: str) -> str:
+    label = f'{name}="{value}"'
+    return f"{labels[:-1]},{label}}}" if labels else f"{{{label}}}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """パイプライン全体のメトリクス"""
+
+    PREFIX = 'suno_radio_'
+
+    def __init__(self):
+        self._metrics = []
+        self._server = None
+
+        self.fifo_bytes = self._counter(
+            'fifo_bytes_written_total', 'FIFOに書き込んだバイト数', ('station', 'fifo'))
+        self.broken_pipes = self._counter(
+            'broken_pipe_total', 'FIFO書き込み時のBrokenPipe回数', ('station', 'fifo'))
+        self.decoder_first_byte = self._histogram(
+            'decoder_first_byte_seconds', 'PCMソースの開始から最初のデータまでの秒数',
+            ('station', 'source'), LATENCY_BUCKETS)
+        self.track_gap = self._histogram(
+            'track_gap_seconds', '曲境界の待ち時間（ギャップ後、次の曲の最初のデータまで）',
+            ('station',), LATENCY_BUCKETS)
+        self.recovery_attempts = self._counter(
+            'recovery_attempts_total', '配信の復旧試行回数', ('station',))
+        self.incidents = self._counter(
+            'incidents_total', '検知した障害の件数', ('station', 'component'))
+        self.incident_recovery = self._histogram(
+            'incident_recovery_seconds', '障害の検知から配信の出力再開までの秒数', ('station',), LATENCY_BUCKETS)
+        self.incident_outage = self._histogram(
+            'incident_outage_seconds', '障害の発生（出力の停止は最後に出力が進んだ時点）から配信の出力再開までの秒数',
+            ('station', 'component'), OUTAGE_BUCKETS)
+        self.sync_duration = self._histogram(
+            'sync_duration_seconds', '同期の所要時間', ('station', 'result'), DURATION_BUCKETS)
+        self.normalize_duration = self._histogram(
+            'normalize_duration_seconds', '1曲のノーマライズ（測定のみを含む）の所要時間',
+            ('station', 'mode'), DURATION_BUCKETS)
+
+    def _counter(self, name: str, help_text: str, labelnames: tuple) -> _Metric:
+        metric = _Metric('counter', self.PREFIX + name, help_text, labelnames, _CounterValue)
+        self._metrics.append(metric)
+        return metric
+
+    def _histogram(self, name: str, help_text: str, labelnames: tuple, buckets: tuple) -> _Metric:
+        metric = _Metric('histogram', self.PREFIX + name, help_text, labelnames, lambda: _HistogramValue(buckets))
+        self._metrics.append(metric)
+        return metric
+
+    def _render_gauges(self) -> list:
+        """取得時点の状態（配信中か・エンコード速度・fps・ビットレート・ドロップ/複製フレーム・音声バッファ）"""
+        from core.station import stations
+
+        gauges = {
+            'streaming': ('配信中か（1=配信中）', []),
+            'encoder_speed': ('配信FFmpegのエンコード速度（実時間比）', []),
+            'encoder_fps': ('配信FFmpegの出力fps', []),
+            'encoder_bitrate_kbps': ('配信FFmpegの出力ビットレート（kbps）', []),
+            'encoder_drop_frames': ('配信FFmpegのドロップしたフレーム数（起動ごとに0から）', []),
+            'encoder_dup_frames': ('配信FFmpegの複製したフレーム数（起動ごとに0から）', []),
+            'audio_buffer_fill_ratio': ('リングバッファのフィル率', []),
+        }
+        for station in stations.all():
+            labels = _format_labels(('station',), (station.id,))
+            streaming = station.stream_manager.is_streaming
+            gauges['streaming'][1].append((labels, 1 if streaming else 0))
+            if not streaming:
+                continue
+            latest = station.encoder_telemetry.get_latest() or {}
+            for key in ('speed', 'fps', 'bitrate_kbps', 'drop_frames', 'dup_frames'):
+                if latest.get(key) is not None:
+                    gauges[f'encoder_{key}'][1].append((labels, latest[key]))
+            buffer = station.audio_player.get_buffer_stats()
+            if buffer:
+                gauges['audio_buffer_fill_ratio'][1].append((labels, buffer['fill_ratio']))
+
+        lines = []
+        for name, (help_text, samples) in gauges.items():
+            name = self.PREFIX + name
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{labels} {_format_value(value)}" for labels, value in samples]
+        return lines
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式で出力"""
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        lines += self._render_gauges()
+        return '\n'.join(lines) + '\n'
+
+    # --- HTTP ---
+
+    async def start_server(self):
+        """/metrics の待ち受けを開始（METRICS_PORT=0なら何もしない）"""
+        if config.METRICS_PORT <= 0 or self._server:
+            return
+        try:
+            self._server = await asyncio.start_server(self._handle, config.METRICS_HOST, config.METRICS_PORT)
+            print(f"メトリクス: http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics", flush=True)
+        except OSError as e:
+            print(f"メトリクスの待ち受けに失敗: {e}", flush=True)
+
+    async def _handle(self, reader, writer):
+        """1リクエストを処理して接続を閉じる"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # ヘッダーは読み捨て
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request_line.decode(errors='replace').split()
+            if len(parts) >= 2 and parts[0] in ('GET', 'HEAD') and parts[1].split('?')[0] == '/metrics':
+                status = '200 OK'
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                body = self.render().encode()
+            else:
+                status = '404 Not Found'
+                content_type = 'text/plain; charset=utf-8'
+                body = b'Not Found\n'
+
+            header = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+            writer.write(header.encode() + (body if parts[:1] != ['HEAD'] else b''))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+# シングルトン
+metrics = Metrics()
@@ -0,0 +1,221 @@
+"""
+SUNO Radio Lite - ノーマライズキャッシュ
+コンテンツ指紋をキーにしたラウドネス測定値・ノーマライズ状態の永続化（SQLite）
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import config
+
+
+class NormalizationCache:
+    """コンテンツ指紋（パス+サイズ+mtimeの高速判定 + SHA-256）をキーにしたノーマライズ状態キャッシュ"""
+
+    # ノーマライズ状態
+    STATUS_MEASURED = 'measured'      # 測定のみ完了（元ファイル）
+    STATUS_NORMALIZED = 'normalized'  # ノーマライズ済み（出力ファイル）
+
+    # 測定値のキー（loudnormのJSON出力に対応）
+    MEASUREMENT_KEYS = ('input_i', 'input_tp', 'input_lra', 'input_thresh')
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self.db_path = os.path.join(config.DATA_DIR, 'library.db')
+        self.legacy_list_path = os.path.join(config.DATA_DIR, 'normalized_files.txt')
+        self._lock = threading.RLock()
+        self._conn = None
+        # パス -> (size, mtime_ns, content_hash)
+        # サイズ+mtimeが同じ別ファイル（同じ長さのCBR・mtimeを保持したコピー等）を取り違えないようパスごとに保持し、
+        # パスの内容が変わればサイズ+mtimeの不一致で再計算（リネーム・上書きはSHA-256で同じ測定値に解決）
+        self._fingerprints = {}
+        # content_hash -> {'status': ..., 'input_i': ..., ...}
+        self._entries = {}
+        # 記録のたびに増加（呼び出し側のキャッシュ判定用）
+        self.version = 0
+
+    def load(self):
+        """
+        DBを開いて旧形式から移行（初回のみ、ブロッキング）
+
+        移行時は一覧の全ファイルのハッシュを計算するため、イベントループ外（executor）で呼び出す
+        """
+        if self._conn is not None:
+            return
+        self._ensure_loaded()
+        with self._lock:
+            # 読み込み前に数えた未ノーマライズ数等を再計算させる
+            self.version += 1
+
+    def is_loaded(self) -> bool:
+        """読み込み済みか"""
+        return self._conn is not None
+
+    def _ensure_loaded(self):
+        """DBを開いてメモリ上のインデックスを構築（初回のみ）"""
+        if self._conn is not None:
+            return
+
+        with self._lock:
+            if self._conn is not None:
+                return
+
+            os.makedirs(config.DATA_DIR, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(fingerprints)')]
+            if columns and 'path' not in columns:
+                # 旧形式（サイズ+mtimeのみのキー）は別ファイルを取り違えるため破棄（ハッシュは必要時に再計算）
+                conn.execute('DROP TABLE fingerprints')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS fingerprints ('
+                ' path TEXT PRIMARY KEY,'
+                ' size INTEGER NOT NULL,'
+                ' mtime_ns INTEGER NOT NULL,'
+                ' content_hash TEXT NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS normalization ('
+                ' content_hash TEXT PRIMARY KEY,'
+                ' status TEXT NOT NULL,'
+                ' input_i TEXT,'
+                ' input_tp TEXT,'
+                ' input_lra TEXT,'
+                ' input_thresh TEXT,'
+                ' updated_at TEXT)'
+            )
+            conn.commit()
+
+            for path, size, mtime_ns, content_hash in conn.execute(
+                'SELECT path, size, mtime_ns, content_hash FROM fingerprints'
+            ):
+                self._fingerprints[path] = (size, mtime_ns, content_hash)
+
+            for row in conn.execute(
+                'SELECT content_hash, status, input_i, input_tp, input_lra, input_thresh FROM normalization'
+            ):
+                self._entries[row[0]] = dict(zip(('status',) + self.MEASUREMENT_KEYS, row[1:]))
+
+            self._conn = conn
+            print(f"ノーマライズキャッシュ読込: {len(self._entries)}件", flush=True)
+
+            self._migrate_legacy_list()
+
+    def _migrate_legacy_list(self):
+        """旧形式（normalized_files.txt のパス一覧）からの移行"""
+        if not os.path.exists(self.legacy_list_path):
+            return
+
+        migrated = 0
+        try:
+            with open(self.legacy_list_path, 'r') as f:
+                paths = [line.strip() for line in f if line.strip()]
+
+            for filepath in paths:
+                if os.path.exists(filepath) and self.fingerprint(filepath):
+                    self.record(filepath, self.STATUS_NORMALIZED)
+                    migrated += 1
+
+            os.replace(self.legacy_list_path, self.legacy_list_path + '.migrated')
+            print(f"ノーマライズ済みリストを移行: {migrated}曲", flush=True)
+        except Exception as e:
+            print(f"ノーマライズ済みリスト移行エラー: {e}", flush=True)
+
+    def _hash_file(self, filepath: str) -> str:
+        """ファイル内容のSHA-256"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            while True:
+                chunk = f.read(self.HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def fingerprint(self, filepath: str, allow_hash: bool = True, stat_key: tuple = None) -> str:
+        """
+        ファイルのコンテンツ指紋を取得
+
+        Args:
+            filepath: 音声ファイルのパス
+            allow_hash: パス+サイズ+mtimeで判定できない場合にハッシュ計算を行うか
+                        （Falseの場合は未読み込みでも読み込まずにNone、イベントループ上の軽量チェック用）
+            stat_key: 既知の (サイズ, mtime_ns)（省略時はstatで取得）
+
+        Returns:
+            コンテンツハッシュ（不明な場合はNone）
+        """
+        if not allow_hash and not self.is_loaded():
+            return None
+        self._ensure_loaded()
+
+        if stat_key:
+            size, mtime_ns = stat_key
+        else:
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                return None
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+        path = os.path.abspath(filepath)
+        known = self._fingerprints.get(path)
+        if known and known[:2] == (size, mtime_ns):
+            return known[2]
+        if not allow_hash:
+            return None
+
+        content_hash = self._hash_file(filepath)
+
+        with self._lock:
+            self._fingerprints[path] = (size, mtime_ns, content_hash)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)',
+                (path, size, mtime_ns, content_hash)
+            )
+            self._conn.commit()
+
+        return content_hash
+
+    def get_entry(self, filepath: str, allow_hash: bool = True, stat_key: tuple = None) -> dict:
+        """ファイルに対応するキャッシュエントリを取得"""
+        content_hash = self.fingerprint(filepath, allow_hash=allow_hash, stat_key=stat_key)
+        if not content_hash:
+            return None
+        return self._entries.get(content_hash)
+
+    def is_normalized(self, filepath: str, allow_hash: bool = True) -> bool:
+        """ファイルがノーマライズ済みかチェック"""
+        entry = self.get_entry(filepath, allow_hash=allow_hash)
+        return bool(entry and entry['status'] == self.STATUS_NORMALIZED)
+
+    def record(self, filepath: str, status: str, measurement: dict = None):
+        """ファイルのノーマライズ状態・測定値を記録"""
+        content_hash = self.fingerprint(filepath)
+        if not content_hash:
+            return
+
+        measurement = measurement or {}
+        entry = {'status': status}
+        for key in self.MEASUREMENT_KEYS:
+            value = measurement.get(key)
+            entry[key] = str(value) if value is not None else None
+
+        with self._lock:
+            self._entries[content_hash] = entry
+            self.version += 1
+            self._conn.execute(
+                'INSERT OR REPLACE INTO normalization'
+                ' (content_hash, status, input_i, input_tp, input_lra, input_thresh, updated_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (content_hash, status, *(entry[key] for key in self.MEASUREMENT_KEYS),
+                 datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+
+# シングルトン
+normalization_cache = NormalizationCache()
@@ -0,0 +1,128 @@
+"""
+SUNO Radio Lite - 出力の監視
+配信FFmpegが動作したまま出力が進まない状態（配信先の接続が固まった等）を検知し、予備の受信サーバーへの切り替えを管理
+
+監視するのはメインの配信先（配信先が1つならその配信先）のみ。追加の配信先はteeのfifo経由で詰まってもエンコードを止めず、
+失敗しても他の配信先は継続するため（onfail=ignore）、追加の配信先の停止で配信全体を再起動しない
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+from core.stream_outputs import STATE_FAILED
+
+
+class OutputWatchdog:
+    """局ごとの出力の停止の検知（プロセスの終了・部品の停止では検知できない停止を対象）"""
+
+    STALL_HISTORY = 20
+
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+        # 予備の受信サーバーに切り替えているか（停止を検知するたびに主・予備を切り替え）
+        self.use_backup = False
+        self.stalls = deque(maxlen=self.STALL_HISTORY)
+        # 監視する配信先（配信FFmpegの起動ごとに設定、監視しなければNone）
+        self._target = None
+        self._target_name = None
+
+    def watch(self, destinations: list):
+        """
+        配信FFmpegの起動ごとに監視する配信先を設定
+
+        メインの配信先があればその配信先、配信先が1つならその配信先、
+        追加の配信先のみ複数の場合は監視しない（いずれもfifo経由でエンコードを止めないため）
+        """
+        self._target = None
+        self._target_name = None
+        for index, destination in enumerate(destinations):
+            if destination['name'] == 'main' or len(destinations) == 1:
+                self._target = index
+                self._target_name = destination['name']
+                break
+
+    def is_enabled(self) -> bool:
+        """出力の停止の検知が有効か"""
+        return self.config.OUTPUT_STALL_SECONDS > 0
+
+    def _is_starting(self) -> bool:
+        """配信FFmpegの起動後、最初の進捗がまだないか"""
+        return self.station.encoder_telemetry.last_advance is None
+
+    def _idle_seconds(self) -> tuple:
+        """
+        監視する配信先の出力が進んでいない秒数と閾値（監視しない・起動前はNone）
+
+        最初の進捗までは起動からの秒数（配信先への接続を含むため閾値は OUTPUT_START_TIMEOUT_SECONDS）、
+        teeでメインの配信先のみ失敗した場合は他の配信先でエンコードが進み続けるため、失敗してからの秒数
+        """
+        if not self.is_enabled() or self._target is None:
+            return None
+        telemetry = self.station.encoder_telemetry
+        state = self.station.output_monitor.get_state(self._target)
+        if state and state['state'] == STATE_FAILED:
+            return time.time() - state['since'], self.config.OUTPUT_STALL_SECONDS
+        if self._is_starting():
+            started = telemetry.seconds_since_start()
+            if started is None:
+                return None
+            return started, max(self.config.OUTPUT_START_TIMEOUT_SECONDS, self.config.OUTPUT_STALL_SECONDS)
+        return telemetry.seconds_since_advance(), self.config.OUTPUT_STALL_SECONDS
+
+    def seconds_until_check(self) -> float:
+        """出力が進まないまま閾値に達するまでの秒数（無効・監視しない・起動前はNone）"""
+        idle = self._idle_seconds()
+        if idle is None:
+            return None
+        seconds, limit = idle
+        return max(0.0, limit - seconds)
+
+    def check(self) -> float:
+        """監視する配信先の出力が閾値以上進んでいなければ停止している秒数（停止していなければNone）"""
+        idle = self._idle_seconds()
+        if idle is None or idle[0] < idle[1]:
+            return None
+        return idle[0]
+
+    def record_stall(self, idle: float) -> dict:
+        """
+        出力の停止を記録し、メインの配信先で予備の受信サーバーが設定されていれば切り替え
+
+        Returns:
+            記録（停止時刻・停止秒数・理由・配信先・切り替え前後の受信サーバー）
+        """
+        reason = f"起動から{idle:.1f}秒間出力なし" if self._is_starting() else f"{idle:.1f}秒間出力なし"
+        ingest = self.get_ingest()
+        if self._target_name == 'main' and self.config.get_backup_stream_url():
+            self.use_backup = not self.use_backup
+        stall = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'idle_seconds': round(idle, 1),
+            'reason': reason,
+            'destination': self._target_name,
+            'from': ingest,
+            'to': self.get_ingest(),
+        }
+        self.stalls.append(stall)
+        self.station.output_monitor.mark_stalled(self._target, reason)
+
+        ingest = f"{stall['from']} → {stall['to']}に切り替え" if stall['from'] != stall['to'] else stall['from']
+        print(f"出力の停止を検知: {stall['destination']} {reason}（{ingest}）", flush=True)
+        return stall
+
+    def get_ingest(self) -> str:
+        """メインの配信先の受信サーバー（primary / backup）"""
+        return 'backup' if self.use_backup and self.config.get_backup_stream_url() else 'primary'
+
+    def get_status(self) -> dict:
+        """有効か・閾値・現在の受信サーバー・停止の履歴"""
+        return {
+            'enabled': self.is_enabled(),
+            'stall_seconds': self.config.OUTPUT_STALL_SECONDS,
+            'start_timeout_seconds': self.config.OUTPUT_START_TIMEOUT_SECONDS,
+            'destination': self._target_name,
+            'ingest': self.get_ingest(),
+            'backup_configured': bool(self.config.get_backup_stream_url()),
+            'stalls': list(self.stalls),
+        }
@@ -0,0 +1,198 @@
+"""
+SUNO Radio Lite - PCMキャッシュ
+48kHz s16le にデコード済みのトラックをディスクに保持（サイズ上限付きLRU）
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from config import config
+
+
+class CachedTrack:
+    """mmapで開いたデコード済みPCM"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._mmap)
+        self.size = len(self._mmap)
+
+    def close(self):
+        """mmapを解放"""
+        try:
+            self.view.release()
+            self._mmap.close()
+        except (BufferError, ValueError):
+            pass
+        self._file.close()
+
+
+class PCMCacheWriter:
+    """デコード中のPCMを一時ファイルに書き出し、完了時にキャッシュへ登録"""
+
+    def __init__(self, cache: 'PCMCache', key: str):
+        self._cache = cache
+        self.key = key
+        self.temp_path = cache._entry_path(key) + '.part'
+        self._file = open(self.temp_path, 'wb')
+        self.size = 0
+        self.failed = False
+
+    def write(self, data: bytes):
+        """PCMを追記（上限を超えたら以降は破棄）"""
+        if self.failed:
+            return
+        self.size += len(data)
+        if self.size > self._cache.max_bytes:
+            self.failed = True
+            return
+        self._file.write(data)
+
+    def commit(self):
+        """デコード完了: キャッシュに登録"""
+        self._file.close()
+        if self.failed or self.size == 0:
+            self.abort()
+            return
+        self._cache._commit(self.key, self.temp_path, self.size)
+
+    def abort(self):
+        """デコード中断: 一時ファイルを削除"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+class PCMCache:
+    """デコード済みPCMのディスクキャッシュ"""
+
+    def __init__(self):
+        self.cache_dir = os.path.join(config.DATA_DIR, 'pcm_cache')
+        self.max_bytes = config.PCM_CACHE_MB * 1024 * 1024
+        self._lock = threading.Lock()
+        # key -> size（古い順）
+        self._entries = None
+        self._total_bytes = 0
+
+    def is_enabled(self) -> bool:
+        """キャッシュが有効かどうか"""
+        return self.max_bytes > 0
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.pcm')
+
+    def _ensure_loaded(self):
+        """既存のキャッシュファイルを最終使用順に読み込み"""
+        if self._entries is not None:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.part'):
+                # 前回中断分を削除
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith('.pcm'):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        self._entries = OrderedDict()
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _make_key(self, track_path: str, audio_filter: str) -> str:
+        """トラック内容（サイズ+mtime）と適用フィルターからキーを生成"""
+        stat = os.stat(track_path)
+        key_source = ':'.join([
+            os.path.abspath(track_path),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            audio_filter or '',
+            str(config.SAMPLE_RATE),
+            str(config.CHANNELS),
+        ])
+        return hashlib.sha1(key_source.encode()).hexdigest()
+
+    def open(self, track_path: str, audio_filter: str = None) -> CachedTrack:
+        """キャッシュ済みならmmapで開く（未キャッシュはNone）"""
+        if not self.is_enabled():
+            return None
+
+        try:
+            key = self._make_key(track_path, audio_filter)
+        except OSError:
+            return None
+
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._entry_path(key)
+        try:
+            # 最終使用時刻を記録（再起動後のLRU順序用）
+            os.utime(path)
+            return CachedTrack(path)
+        except (OSError, ValueError):
+            with self._lock:
+                size = self._entries.pop(key, 0)
+                self._total_bytes -= size
+            return None
+
+    def begin_write(self, track_path: str, audio_filter: str = None) -> PCMCacheWriter:
+        """デコード結果の書き込みを開始（無効時はNone）"""
+        if not self.is_enabled():
+            return None
+
+        try:
+            with self._lock:
+                self._ensure_loaded()
+            return PCMCacheWriter(self, self._make_key(track_path, audio_filter))
+        except OSError as e:
+            print(f"PCMキャッシュ書き込み開始エラー: {e}", flush=True)
+            return None
+
+    def _commit(self, key: str, temp_path: str, size: int):
+        """一時ファイルを登録し、上限を超えた分を古い順に削除"""
+        with self._lock:
+            os.replace(temp_path, self._entry_path(key))
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                try:
+                    os.remove(self._entry_path(old_key))
+                except OSError:
+                    pass
+
+    def get_status(self) -> dict:
+        """キャッシュ使用状況"""
+        with self._lock:
+            entries = len(self._entries) if self._entries is not None else 0
+            return {
+                'enabled': self.is_enabled(),
+                'entries': entries,
+                'used_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# シングルトン
+pcm_cache = PCMCache()
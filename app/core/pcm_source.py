@@ -0,0 +1,204 @@
+"""
+SUNO Radio Lite - PCMソース
+トラックのPCMデータ供給（FFmpegデコード / キャッシュ済みPCM）
+"""
+
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+
+
+# デコーダー出力の読み込み単位
+READ_CHUNK_SIZE = 65536
+
+
+def warm_page_cache(path: str):
+    """ファイルをページキャッシュへ先読みするようカーネルに通知"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except (OSError, AttributeError):
+        pass
+
+
+class DecoderSource:
+    """FFmpegでデコードしたPCMを上限付き先読みバッファ経由で供給"""
+
+    def __init__(self, track_path: str, cmd: list, buffer_bytes: int, cache_writer=None, on_exit=None,
+                 start_offset: int = 0):
+        self.track_path = track_path
+        self._cmd = cmd
+        # 曲の途中から開始した場合の開始位置（バイト、シークはデコードコマンド側で指定）
+        self.start_offset = start_offset
+        # デコーダー終了時のコールバック（CPU予約の解放等）
+        self._on_exit = on_exit
+        self._buffer_bytes = max(buffer_bytes, READ_CHUNK_SIZE)
+        self._cache_writer = cache_writer
+        self._chunks = deque()
+        self._buffered = 0
+        self._cond = threading.Condition()
+        self._decoder_finished = False
+        self._closed = False
+        self._reader_thread = None
+        self.process = None
+        self.spawn_time = None
+        self.first_byte_time = None
+
+    def start(self):
+        """デコーダーと読み込みスレッドを起動"""
+        warm_page_cache(self.track_path)
+        self.spawn_time = time.monotonic()
+        try:
+            self.process = subprocess.Popen(
+                self._cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            if self._on_exit:
+                self._on_exit()
+            raise
+        self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self._reader_thread.start()
+
+    def _reader_loop(self):
+        """デコーダー出力をバッファに読み込み（満杯なら待機してデコーダーを止める）"""
+        fd = self.process.stdout.fileno()
+        reached_eof = False
+
+        try:
+            while True:
+                with self._cond:
+                    while self._buffered >= self._buffer_bytes and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        break
+
+                data = os.read(fd, READ_CHUNK_SIZE)
+                if not data:
+                    reached_eof = True
+                    break
+
+                if self.first_byte_time is None:
+                    self.first_byte_time = time.monotonic()
+
+                if self._cache_writer:
+                    self._cache_writer.write(data)
+
+                with self._cond:
+                    self._chunks.append(data)
+                    self._buffered += len(data)
+                    self._cond.notify_all()
+        except (OSError, ValueError):
+            pass
+        finally:
+            if not reached_eof and self.process.poll() is None:
+                self.process.kill()
+            returncode = self.process.wait()
+
+            # 最後まで正常にデコードできた場合のみキャッシュに登録
+            if self._cache_writer:
+                if reached_eof and returncode == 0 and not self._closed:
+                    self._cache_writer.commit()
+                else:
+                    self._cache_writer.abort()
+                self._cache_writer = None
+
+            with self._cond:
+                self._decoder_finished = True
+                self._cond.notify_all()
+
+            if self._on_exit:
+                self._on_exit()
+
+    def read(self, max_bytes: int, timeout: float):
+        """
+        PCMを取得
+
+        Returns:
+            データ / 終端ならb'' / タイムアウトならNone
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._chunks and not self._decoder_finished and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            if not self._chunks:
+                return b''
+
+            data = self._chunks.popleft()
+            if len(data) > max_bytes:
+                self._chunks.appendleft(data[max_bytes:])
+                data = data[:max_bytes]
+            self._buffered -= len(data)
+            self._cond.notify_all()
+            return data
+
+    def is_near_end(self, threshold_bytes: int) -> bool:
+        """残りが閾値以下か（デコード完了時点で残りは先読みバッファ分のみ）"""
+        return self._decoder_finished and self._buffered <= threshold_bytes
+
+    def close(self):
+        """デコーダーを停止"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+
+        if self._reader_thread and self._reader_thread is not threading.current_thread():
+            self._reader_thread.join(timeout=2)
+
+
+class CachedSource:
+    """mmapで開いたキャッシュ済みPCMを供給"""
+
+    def __init__(self, track_path: str, cached, start_offset: int = 0):
+        self.track_path = track_path
+        self._cached = cached
+        # 曲の途中から開始する場合はその位置から読み出す
+        self.start_offset = min(start_offset, cached.size)
+        self._offset = self.start_offset
+        self._closed = False
+        self.spawn_time = None
+        self.first_byte_time = None
+
+    def start(self):
+        """ページキャッシュへの先読みを通知"""
+        self.spawn_time = time.monotonic()
+        self.first_byte_time = self.spawn_time
+        warm_page_cache(self._cached.path)
+
+    def read(self, max_bytes: int, timeout: float = 0):
+        """PCMを取得（終端ならb''）"""
+        if self._closed or self._offset >= self._cached.size:
+            return b''
+        end = min(self._offset + max_bytes, self._cached.size)
+        data = self._cached.view[self._offset:end]
+        self._offset = end
+        return data
+
+    def is_near_end(self, threshold_bytes: int) -> bool:
+        """残りが閾値以下か"""
+        return self._cached.size - self._offset <= threshold_bytes
+
+    def close(self):
+        """mmapを解放"""
+        if self._closed:
+            return
+        self._closed = True
+        self._cached.close()
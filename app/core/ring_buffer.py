@@ -0,0 +1,158 @@
+"""
+SUNO Radio Lite - PCMリングバッファ
+デコーダー側とFIFO書き込み側の間の固定長バッファ（アンダーラン/オーバーラン計測付き）
+"""
+
+import threading
+import time
+
+
+class PCMRingBuffer:
+    """事前確保した固定長のPCMリングバッファ"""
+
+    # 読み出し側がこの秒数以上進まない状態で満杯ならオーバーランとみなす
+    OVERRUN_STALL_SECONDS = 0.5
+
+    def __init__(self, capacity: int, frame_size: int = 4):
+        self.capacity = max(capacity - capacity % frame_size, frame_size)
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self._read_pos = 0
+        self._fill = 0
+        self._generation = 0
+        self._closed = False
+        self._primed = False
+        self._cond = threading.Condition()
+        self._last_read_time = time.monotonic()
+
+        # 計測値
+        self.underrun_count = 0
+        self.underrun_seconds = 0.0
+        self.overrun_count = 0
+        self.overrun_seconds = 0.0
+        self._underrun_start = None
+        self._overrun_start = None
+
+    def write(self, data) -> bool:
+        """
+        PCMを書き込み（満杯なら空くまで待機）
+
+        Returns:
+            全て書き込めたか（close済みならFalse）
+        """
+        view = memoryview(data)
+        offset = 0
+
+        with self._cond:
+            while offset < len(view):
+                while self._fill >= self.capacity and not self._closed:
+                    self._check_overrun()
+                    self._cond.wait(0.1)
+                if self._closed:
+                    return False
+
+                write_pos = (self._read_pos + self._fill) % self.capacity
+                n = min(len(view) - offset, self.capacity - self._fill, self.capacity - write_pos)
+                self._view[write_pos:write_pos + n] = view[offset:offset + n]
+                offset += n
+                self._fill += n
+                self._primed = True
+
+                if self._underrun_start is not None:
+                    self.underrun_seconds += time.monotonic() - self._underrun_start
+                    self._underrun_start = None
+
+                self._cond.notify_all()
+
+        return True
+
+    def _check_overrun(self):
+        """読み出し側が止まったまま満杯ならオーバーラン開始を記録"""
+        if self._overrun_start is None:
+            now = time.monotonic()
+            if now - self._last_read_time >= self.OVERRUN_STALL_SECONDS:
+                self.overrun_count += 1
+                self._overrun_start = self._last_read_time
+
+    def peek(self, max_bytes: int, timeout: float):
+        """
+        読み出し可能な連続領域を取得（コピーなし）
+
+        Returns:
+            (memoryview, generation) / タイムアウト・close時は (None, generation)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._fill == 0 and not self._closed:
+                if self._primed and self._underrun_start is None:
+                    self.underrun_count += 1
+                    self._underrun_start = time.monotonic()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, self._generation
+                self._cond.wait(remaining)
+
+            if self._fill == 0:
+                return None, self._generation
+
+            n = min(max_bytes, self._fill, self.capacity - self._read_pos)
+            return self._view[self._read_pos:self._read_pos + n], self._generation
+
+    def advance(self, n: int, generation: int):
+        """peekした領域のうちnバイトを消費済みにする"""
+        with self._cond:
+            now = time.monotonic()
+            self._last_read_time = now
+
+            if self._overrun_start is not None:
+                self.overrun_seconds += now - self._overrun_start
+                self._overrun_start = None
+
+            # clear()後の古い領域は無視
+            if generation != self._generation:
+                return
+
+            n = min(n, self._fill)
+            self._read_pos = (self._read_pos + n) % self.capacity
+            self._fill -= n
+            self._cond.notify_all()
+
+    def clear(self):
+        """バッファ内のPCMを破棄（スキップ時）"""
+        with self._cond:
+            self._read_pos = 0
+            self._fill = 0
+            self._generation += 1
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        """close済みか"""
+        return self._closed
+
+    def close(self):
+        """待機中の読み書きを解放"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        """フィル量とアンダーラン/オーバーランの統計"""
+        with self._cond:
+            now = time.monotonic()
+            underrun_seconds = self.underrun_seconds
+            if self._underrun_start is not None:
+                underrun_seconds += now - self._underrun_start
+            overrun_seconds = self.overrun_seconds
+            if self._overrun_start is not None:
+                overrun_seconds += now - self._overrun_start
+
+            return {
+                'fill_bytes': self._fill,
+                'capacity_bytes': self.capacity,
+                'fill_ratio': round(self._fill / self.capacity, 3),
+                'underrun_count': self.underrun_count,
+                'underrun_seconds': round(underrun_seconds, 3),
+                'overrun_count': self.overrun_count,
+                'overrun_seconds': round(overrun_seconds, 3),
+            }
@@ -0,0 +1,144 @@
+"""
+SUNO Radio Lite - CPUスケジューラー
+全局で共有するCPU予算の配分（配信のエンコード・デコードを優先し、ノーマライズは残りの範囲で実行）
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+from contextlib import asynccontextmanager
+from config import config
+
+
+class CpuScheduler:
+    """CPU予算（コア数換算）を局をまたいで配分"""
+
+    # 処理ごとの見積もりコスト（コア数換算）
+    ENCODE_COST = 1.0         # 配信FFmpeg（libx264、480p。プロファイルの負荷の目安を掛ける）
+    ENCODE_COPY_COST = 0.2    # 配信FFmpeg（映像コピー、音声のみエンコード）
+    DECODE_COST = 0.25        # 楽曲デコード
+    NORMALIZE_COST = 1.0      # ラウドネス測定・再エンコード
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # 予約ID -> (局ID, 種類, コスト)
+        self._realtime = {}
+        self._batch = {}
+        self._waiting = 0
+        self._loop = None
+        self._cond = None
+
+    def get_budget(self) -> float:
+        """CPU予算（コア数）"""
+        if config.CPU_BUDGET > 0:
+            return config.CPU_BUDGET
+        return float(os.cpu_count() or 1)
+
+    # --- 配信処理（リアルタイム） ---
+
+    def reserve(self, station_id: str, kind: str, cost: float) -> int:
+        """
+        配信処理の予約（止めると配信が途切れるため常に許可し、バッチ処理に回せる分を減らす）
+
+        スレッドからも呼び出し可
+
+        Returns:
+            予約ID（release に渡す）
+        """
+        with self._lock:
+            token = next(self._ids)
+            self._realtime[token] = (station_id, kind, cost)
+        return token
+
+    def release(self, token: int):
+        """予約を解放（スレッドからも呼び出し可）"""
+        with self._lock:
+            removed = self._realtime.pop(token, None) or self._batch.pop(token, None)
+        if removed:
+            self._wake()
+
+    # --- バッチ処理 ---
+
+    def _can_start_batch(self, cost: float) -> bool:
+        with self._lock:
+            # 予算が足りなくても1件は実行（同期が止まらないよう）
+            if not self._batch:
+                return True
+            used = sum(item[2] for item in self._realtime.values())
+            used += sum(item[2] for item in self._batch.values())
+            return used + cost <= self.get_budget()
+
+    async def acquire_batch(self, station_id: str, kind: str, cost: float) -> int:
+        """
+        バッチ処理の枠を取得（予算に空きができるまで待機）
+
+        Returns:
+            予約ID（release に渡す）
+        """
+        if self._cond is None:
+            self._loop = asyncio.get_event_loop()
+            self._cond = asyncio.Condition()
+
+        async with self._cond:
+            self._waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self._can_start_batch(cost))
+            finally:
+                self._waiting -= 1
+
+            with self._lock:
+                token = next(self._ids)
+                self._batch[token] = (station_id, kind, cost)
+        return token
+
+    @asynccontextmanager
+    async def batch(self, station_id: str, kind: str, cost: float):
+        """バッチ処理の枠を取得して実行（async with で使用）"""
+        token = await self.acquire_batch(station_id, kind, cost)
+        try:
+            yield
+        finally:
+            self.release(token)
+
+    def _wake(self):
+        """バッチ処理の待機を再評価（イベントループ上で通知）"""
+        loop, cond = self._loop, self._cond
+        if loop is None or loop.is_closed():
+            return
+
+        async def notify():
+            async with cond:
+                cond.notify_all()
+
+        try:
+            loop.call_soon_threadsafe(lambda: asyncio.ensure_future(notify()))
+        except RuntimeError:
+            pass
+
+    # --- 状態 ---
+
+    def get_status(self) -> dict:
+        """CPU予算の使用状況（局ごとの内訳付き）"""
+        with self._lock:
+            items = list(self._realtime.values()) + list(self._batch.values())
+            realtime = sum(item[2] for item in self._realtime.values())
+            batch = sum(item[2] for item in self._batch.values())
+
+        stations = {}
+        for station_id, kind, cost in items:
+            usage = stations.setdefault(station_id, {})
+            usage[kind] = round(usage.get(kind, 0) + cost, 2)
+
+        return {
+            'budget': self.get_budget(),
+            'realtime': round(realtime, 2),
+            'batch': round(batch, 2),
+            'waiting': self._waiting,
+            'stations': stations,
+        }
+
+
+# シングルトン
+scheduler = CpuScheduler()
@@ -0,0 +1,122 @@
+"""
+SUNO Radio Lite - 局
+1つの配信（楽曲ディレクトリ・背景・FIFO・設定・状態）を構成する部品の束と、1プロセスで運用する局の一覧
+"""
+
+import asyncio
+import os
+import re
+from config import Config, config
+
+
+class Station:
+    """1つの配信局（部品は局ごとに独立し、デコード・ノーマライズ・エンコードのCPUは全局で共有）"""
+
+    def __init__(self, station_config: Config):
+        from core.audio_player import AudioPlayer
+        from core.encoder_controller import EncoderController
+        from core.encoder_telemetry import EncoderTelemetry
+        from core.gdrive_sync import GDriveSync
+        from core.library import MusicLibrary
+        from core.output_watchdog import OutputWatchdog
+        from core.media_clock import MediaClock
+        from core.stream_manager import StreamManager
+        from core.stream_outputs import OutputMonitor
+        from core.supervisor import PipelineSupervisor
+        from core.track_index import TrackIndex
+        from core.video_generator import VideoGenerator
+
+        self.id = station_config.STATION_ID
+        self.config = station_config
+
+        # 部品同士は self.station 経由で参照（生成順に依存しない）
+        self.supervisor = PipelineSupervisor(self)
+        self.library = MusicLibrary(self)
+        self.track_index = TrackIndex(self)
+        self.media_clock = MediaClock(self)
+        self.encoder_controller = EncoderController(self)
+        self.gdrive_sync = GDriveSync(self)
+        self.audio_player = AudioPlayer(self)
+        self.video_generator = VideoGenerator(self)
+        self.output_monitor = OutputMonitor(on_live=self.supervisor.mark_recovered)
+        self.encoder_telemetry = EncoderTelemetry(on_start=self.supervisor.wake)
+        self.output_watchdog = OutputWatchdog(self)
+        self.stream_manager = StreamManager(self)
+
+        # 再生可能な楽曲の増減をプレイリストに差分で反映（同期・ディレクトリの変更のどちらでも）
+        self.track_index.add_listener(self.audio_player.merge_tracks)
+
+    def is_main(self) -> bool:
+        """メイン局かどうか"""
+        return self.id == Config.MAIN_STATION_ID
+
+    async def load(self):
+        """ディレクトリを用意して設定を読み込み"""
+        for dir_path in [self.config.MUSIC_DIR, self.config.ASSETS_DIR, self.config.DATA_DIR]:
+            os.makedirs(dir_path, exist_ok=True)
+        await self.config.load()
+
+    async def start(self):
+        """楽曲ディレクトリの監視とトラックインデックスの更新を開始し、前回配信中なら自動再開"""
+        from core.normalization_cache import normalization_cache
+
+        self.supervisor.bind()
+        # 全局で共有するノーマライズキャッシュを読み込み（旧形式からの移行は全曲のハッシュ計算を含むためループ外で）
+        await asyncio.get_event_loop().run_in_executor(None, normalization_cache.load)
+        await self.library.start()
+        self.track_index.watch_library()
+        await self.track_index.scan()
+        await self.stream_manager.auto_start_if_needed()
+
+
+class StationRegistry:
+    """1プロセスで運用する局の一覧（メイン局 + STATIONSで指定した追加の局）"""
+
+    def __init__(self):
+        self.main = Station(config)
+        self._stations = {self.main.id: self.main}
+
+        for station_id, channel_id in self._parse(Config.STATIONS):
+            if station_id in self._stations:
+                print(f"局IDが重複しています: {station_id}", flush=True)
+                continue
+            self._stations[station_id] = Station(Config(station_id, channel_id))
+
+    @staticmethod
+    def _parse(value: str) -> list[tuple[str, int]]:
+        """「局ID:チャンネルID」のカンマ区切りを解析"""
+        stations = []
+        for item in value.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            station_id, _, channel_id = item.partition(':')
+            station_id = station_id.strip()
+            if not re.fullmatch(r'[\w-]+', station_id) or not channel_id.strip().isdigit():
+                print(f"STATIONSの指定が不正です（局ID:チャンネルID）: {item}", flush=True)
+                continue
+            stations.append((station_id, int(channel_id)))
+        return stations
+
+    def all(self) -> list[Station]:
+        """全局（メイン局が先頭）"""
+        return list(self._stations.values())
+
+    def get(self, station_id: str) -> Station:
+        """局IDで取得（存在しなければNone）"""
+        return self._stations.get(station_id)
+
+    def for_channel(self, channel_id: int) -> Station:
+        """Discordチャンネルに対応する局（追加の局に割り当てがなければメイン局）"""
+        for station in self._stations.values():
+            if not station.is_main() and station.config.STATION_CHANNEL_ID == channel_id:
+                return station
+        return self.main
+
+    def is_station_channel(self, channel_id: int) -> bool:
+        """いずれかの局を操作できるチャンネルか"""
+        return any(station.config.STATION_CHANNEL_ID == channel_id for station in self._stations.values())
+
+
+# シングルトン
+stations = StationRegistry()
@@ -6,23 +6,31 @@ FIFOベースの配信処理
 import asyncio
 import json
 import os
+import time
 from datetime import datetime
-from config import config
-from core.audio_player import audio_player
-from core.video_generator import video_generator
+from core.metrics import metrics
+from core.scheduler import scheduler
+from core.stream_outputs import build_output_args, mask_output_url
 
 
 class StreamManager:
-    def __init__(self):
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
         self.process = None
         self.is_streaming = False
         self.start_time = None
         self._stop_requested = False
-        self._state_file = os.path.join(config.DATA_DIR, 'stream_state.json')
+        self._stderr_task = None
+        self._progress_task = None
+        self._encoder_token = None
+        self._state_file = os.path.join(self.config.DATA_DIR, 'stream_state.json')
         # 自動復旧関連
         self._recovery_count = 0
         self._max_recovery_retries = 5
         self._recovery_delay = 10
+        # この秒数安定動作したら復旧カウンターをリセット
+        self._stable_seconds = 60
 
     def _save_state(self, streaming: bool):
         """配信状態をファイルに保存"""
@@ -51,8 +59,17 @@ class StreamManager:
     def _increment_recovery(self):
         """復旧カウンターを増加"""
         self._recovery_count += 1
+        metrics.recovery_attempts.labels(self.station.id).inc()
         print(f"復旧試行 {self._recovery_count}/{self._max_recovery_retries}", flush=True)
 
+    def _get_recovery_delay(self) -> float:
+        """配信FFmpeg再起動までの待機秒数（配信FFmpegのみ再起動する場合は初回は即時、以降は倍々に）"""
+        if not self.config.ENCODER_HOT_RESTART:
+            return self._recovery_delay
+        if self._recovery_count <= 1:
+            return 0
+        return min(self._recovery_delay, 2 ** (self._recovery_count - 2))
+
     def _reset_recovery_count(self):
         """復旧カウンターをリセット（正常動作時）"""
         if self._recovery_count > 0:
@@ -61,19 +78,19 @@ class StreamManager:
 
     async def _restart_audio_player(self) -> bool:
         """オーディオプレイヤーを再起動"""
+        audio_player = self.station.audio_player
+        supervisor = self.station.supervisor
         try:
             print("オーディオプレイヤー再起動中...", flush=True)
             await audio_player.stop()
             await asyncio.sleep(1)
+            supervisor.expect_ready('audio')
             asyncio.create_task(audio_player.start())
 
-            # FIFOが準備されるまで待機
-            audio_fifo_path = audio_player.get_fifo_path()
-            for _ in range(30):
-                if os.path.exists(audio_fifo_path):
-                    print("オーディオプレイヤー再起動完了", flush=True)
-                    return True
-                await asyncio.sleep(0.1)
+            # FIFOが準備されるまで待機（準備完了の通知を待つ）
+            if await supervisor.wait_ready('audio', timeout=3):
+                print("オーディオプレイヤー再起動完了", flush=True)
+                return True
 
             print("オーディオプレイヤー再起動タイムアウト", flush=True)
             return False
@@ -83,26 +100,48 @@ class StreamManager:
 
     async def _restart_video_generator(self) -> bool:
         """映像生成を再起動"""
+        video_generator = self.station.video_generator
         try:
             print("映像生成再起動中...", flush=True)
             await video_generator.stop()
             await asyncio.sleep(1)
-            await video_generator.start()
 
-            # FIFOが準備されるまで待機
-            video_fifo_path = video_generator.get_fifo_path()
-            for _ in range(30):
-                if os.path.exists(video_fifo_path):
-                    print("映像生成再起動完了", flush=True)
-                    return True
-                await asyncio.sleep(0.1)
+            # FIFOは開始時に作成済み
+            if await video_generator.start():
+                print("映像生成再起動完了", flush=True)
+                return True
 
-            print("映像生成再起動タイムアウト", flush=True)
+            print("映像生成再起動失敗", flush=True)
             return False
         except Exception as e:
             print(f"映像生成再起動エラー: {e}", flush=True)
             return False
 
+    async def _terminate_encoder(self, timeout: float = 5):
+        """配信FFmpegを終了（書き込みで固まって終了しない場合は強制終了）"""
+        if not self.process or self.process.returncode is not None:
+            return
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print("FFmpegが終了しないため強制終了", flush=True)
+            self.process.kill()
+            await self.process.wait()
+
+    async def _restart_for_profile(self):
+        """配信FFmpegを止めてエンコードプロファイルを反映し、音声・映像の入力を再起動"""
+        await self._terminate_encoder()
+
+        # 映像の解像度・フレームレートが変わるため映像の入力を作り直す
+        # （配信FFmpegのみ再起動する場合、音声は再生を続けたまま次の配信FFmpegに再接続）
+        self.station.encoder_controller.apply_pending()
+        self.station.video_generator.reset_crash_detection()
+        if not self.config.ENCODER_HOT_RESTART:
+            self.station.audio_player.reset_crash_detection()
+            await self._restart_audio_player()
+        await self._restart_video_generator()
+
     async def auto_start_if_needed(self) -> bool:
         """前回配信中だった場合は自動開始"""
         if self._load_state():
@@ -112,66 +151,73 @@ class StreamManager:
             return success
         return False
 
-    def _build_ffmpeg_command(self) -> list:
-        """ffmpegコマンドを構築"""
-        stream_url = config.get_rtmp_output_url()
-        video_fifo_path = video_generator.get_fifo_path()
-        audio_fifo_path = audio_player.get_fifo_path()
+    def _build_video_codec_args(self) -> list:
+        """映像エンコード引数を構築"""
+        if self.station.video_generator.is_copy_mode():
+            # 事前エンコード済みループ動画をそのまま多重化
+            return ['-c:v', 'copy']
 
-        resolution = config.STREAM_RESOLUTION
-        fps = config.STREAM_FPS
+        fps = self.config.STREAM_FPS
 
-        cmd = [
-            'ffmpeg',
-            # Video FIFO入力
-            '-thread_queue_size', '512',
-            '-f', 'rawvideo',
-            '-pix_fmt', 'yuv420p',
-            '-s', resolution,
-            '-r', str(fps),
-            '-i', video_fifo_path,
-            # Audio FIFO入力
-            '-thread_queue_size', '512',
-            '-f', 's16le',
-            '-ar', str(config.SAMPLE_RATE),
-            '-ac', str(config.CHANNELS),
-            '-i', audio_fifo_path,
-            # 映像エンコード
+        return [
             '-c:v', 'libx264',
-            '-preset', 'ultrafast',
+            '-preset', self.config.STREAM_PRESET,
             '-tune', 'stillimage',
-            '-b:v', config.STREAM_VIDEO_BITRATE,
-            '-maxrate', config.STREAM_VIDEO_BITRATE,
-            '-bufsize', '1000k',
+            '-b:v', self.config.STREAM_VIDEO_BITRATE,
+            '-maxrate', self.config.STREAM_VIDEO_BITRATE,
+            '-bufsize', self.config.STREAM_VIDEO_BUFSIZE,
             '-pix_fmt', 'yuv420p',
             '-r', str(fps),
             '-g', str(fps * 2),
             '-keyint_min', str(fps * 2),
             '-sc_threshold', '0',
+        ]
+
+    def _build_ffmpeg_command(self, destinations: list) -> list:
+        """ffmpegコマンドを構築（配信先が複数ある場合もエンコードは1回）"""
+        audio_fifo_path = self.station.audio_player.get_fifo_path()
+
+        cmd = [
+            'ffmpeg',
+            # 進捗をkey=value形式でstdoutに出力（エンコードテレメトリ）
+            '-progress', 'pipe:1',
+            # 映像入力（rawvideo FIFO またはループ動画）
+            *self.station.video_generator.get_ffmpeg_input_args(),
+            # Audio FIFO入力
+            '-thread_queue_size', '512',
+            '-f', 's16le',
+            '-ar', str(self.config.SAMPLE_RATE),
+            '-ac', str(self.config.CHANNELS),
+            '-i', audio_fifo_path,
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            # 映像エンコード
+            *self._build_video_codec_args(),
             # 音声エンコード
             '-c:a', 'aac',
-            '-b:a', config.STREAM_AUDIO_BITRATE,
-            '-ar', str(config.SAMPLE_RATE),
-            '-ac', str(config.CHANNELS),
+            '-b:a', self.config.STREAM_AUDIO_BITRATE,
+            '-ar', str(self.config.SAMPLE_RATE),
+            '-ac', str(self.config.CHANNELS),
             # 出力
-            '-f', 'flv',
-            '-flvflags', 'no_duration_filesize',
-            stream_url
+            *build_output_args(destinations)
         ]
 
         return cmd
 
     async def start(self) -> tuple[bool, str]:
         """配信を開始"""
+        audio_player = self.station.audio_player
+        gdrive_sync = self.station.gdrive_sync
+        video_generator = self.station.video_generator
         if self.is_streaming:
             return False, "既に配信中です"
 
         # 設定確認
-        if not config.is_configured():
+        if not self.config.is_configured():
             return False, "配信設定がありません。`/config url` と `/config key` で設定してください。"
 
-        # 楽曲確認
-        from core.gdrive_sync import gdrive_sync
+        # 楽曲確認（トラックインデックスを差分更新）
+        await self.station.track_index.scan()
         if not gdrive_sync.get_tracks():
             return False, "楽曲がありません。`/sync` で楽曲を同期してください。"
 
@@ -181,7 +227,7 @@ class StreamManager:
             return False, f"未ノーマライズの楽曲が{unnormalized}曲あります。\n`/sync` を実行してノーマライズを完了してください。"
 
         # 背景確認
-        if not os.path.exists(config.get_background_path()):
+        if not os.path.exists(self.config.get_background_path()):
             return False, "背景画像がありません。assets/background.jpg を配置してください。"
 
         self.is_streaming = True
@@ -191,37 +237,24 @@ class StreamManager:
 
         print("=" * 50, flush=True)
         print("SUNO Radio Lite 配信開始", flush=True)
-        print(f"  配信先: {config.get_stream_url()}", flush=True)
+        for destination in self.config.get_output_destinations():
+            print(f"  配信先: {destination['name']} ({mask_output_url(destination['url'])})", flush=True)
         print("=" * 50, flush=True)
 
-        # オーディオプレイヤーを開始
-        audio_task = asyncio.create_task(audio_player.start())
-
-        # Audio FIFOが作成されるまで待機
-        audio_fifo_path = audio_player.get_fifo_path()
-        for _ in range(50):
-            if os.path.exists(audio_fifo_path):
-                break
-            await asyncio.sleep(0.1)
-        else:
+        # オーディオプレイヤーを開始し、Audio FIFOの準備完了の通知を待つ
+        supervisor = self.station.supervisor
+        supervisor.bind()
+        supervisor.expect_ready('audio')
+        asyncio.create_task(audio_player.start())
+        if not await supervisor.wait_ready('audio', timeout=5):
             await self.stop()
-            return False, "Audio FIFOの作成がタイムアウト"
+            return False, "オーディオプレイヤーの開始に失敗"
 
-        # 映像生成を開始
+        # 映像生成を開始（Video FIFOは開始時に作成、loopモードはFIFO不要）
         if not await video_generator.start():
             await self.stop()
             return False, "映像生成の開始に失敗"
 
-        # Video FIFOが作成されるまで待機
-        video_fifo_path = video_generator.get_fifo_path()
-        for _ in range(50):
-            if os.path.exists(video_fifo_path):
-                break
-            await asyncio.sleep(0.1)
-        else:
-            await self.stop()
-            return False, "Video FIFOの作成がタイムアウト"
-
         # メインストリームループ
         asyncio.create_task(self._stream_loop())
 
@@ -229,25 +262,59 @@ class StreamManager:
 
     async def _stream_loop(self):
         """配信メインループ"""
-        stable_seconds = 0  # 安定動作時間カウンター
+        audio_player = self.station.audio_player
+        encoder_controller = self.station.encoder_controller
+        output_monitor = self.station.output_monitor
+        encoder_telemetry = self.station.encoder_telemetry
+        output_watchdog = self.station.output_watchdog
+        video_generator = self.station.video_generator
+        supervisor = self.station.supervisor
+        stable_since = time.monotonic()  # 安定動作の開始時刻
 
         while self.is_streaming and not self._stop_requested:
+            profile_changed = False
+            stalled = False
             try:
-                cmd = self._build_ffmpeg_command()
-                print(f"FFmpeg起動", flush=True)
+                destinations = self.config.get_output_destinations(output_watchdog.use_backup)
+                cmd = self._build_ffmpeg_command(destinations)
+                print(f"FFmpeg起動 (配信先 {len(destinations)}件、プロファイル {encoder_controller.get_profile()['name']})",
+                      flush=True)
+
+                # 入力のタイムスタンプは起動ごとに0から始まるためクロックも初期化
+                self.station.media_clock.reset(track_video=not video_generator.is_copy_mode())
+                if self.config.ENCODER_HOT_RESTART:
+                    # 前回の配信FFmpegの読み残しを渡さないようFIFOを作り直す（書き込み側は新しいFIFOに再接続）
+                    audio_player.renew_fifo()
+                    video_generator.renew_fifo()
 
                 self.process = await asyncio.create_subprocess_exec(
                     *cmd,
-                    stdout=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE
                 )
                 print(f"FFmpegプロセス開始 PID: {self.process.pid}", flush=True)
+                self._reserve_encoder()
+                encoder_controller.reset()
+                supervisor.clear_evidence()
+                stable_since = time.monotonic()
+
+                # stderrを常に読み、配信先ごとの状態を監視
+                if self._stderr_task:
+                    self._stderr_task.cancel()
+                output_monitor.reset(destinations)
+                output_watchdog.watch(destinations)
+                self._stderr_task = asyncio.create_task(output_monitor.read_stderr(self.process.stderr))
+
+                # stdoutの進捗を常に読み、エンコードの時系列を記録
+                if self._progress_task:
+                    self._progress_task.cancel()
+                encoder_telemetry.reset()
+                self._progress_task = asyncio.create_task(encoder_telemetry.read_progress(self.process.stdout))
 
                 # プロセス監視
                 while self.process.returncode is None:
                     if self._stop_requested:
-                        self.process.terminate()
-                        await self.process.wait()
+                        await self._terminate_encoder()
                         break
 
                     # クラッシュ検出: AudioPlayerまたはVideoGeneratorが停止/クラッシュ
@@ -261,6 +328,7 @@ class StreamManager:
                         if video_crash:
                             crash_source.append("VideoGenerator")
                         print(f"クラッシュ検出: {', '.join(crash_source)}", flush=True)
+                        supervisor.open_incident(', '.join(crash_source), '停止/クラッシュ')
 
                         if self._can_recover():
                             self._increment_recovery()
@@ -281,70 +349,159 @@ class StreamManager:
 
                             if recovery_success:
                                 print("復旧成功", flush=True)
-                                stable_seconds = 0
                                 # FFmpegプロセスを終了して再起動
-                                if self.process and self.process.returncode is None:
-                                    self.process.terminate()
-                                    await self.process.wait()
+                                await self._terminate_encoder()
                                 break  # 外側のループで再起動
                             else:
                                 print("復旧失敗", flush=True)
 
                         # 復旧不可または復旧失敗
-                        if self.process and self.process.returncode is None:
-                            self.process.terminate()
-                            await self.process.wait()
+                        await self._terminate_encoder()
 
                         if not self._can_recover():
                             print(f"復旧試行回数上限（{self._max_recovery_retries}回）に達しました。配信を停止します。", flush=True)
+                            supervisor.close_incident('failed')
                             self._stop_requested = True
                         break
 
-                    # 安定動作カウンター（60秒安定動作で復旧カウンターリセット）
-                    stable_seconds += 1
-                    if stable_seconds >= 60 and self._recovery_count > 0:
+                    # 出力の停止: 配信FFmpegは動作中だがメインの配信先の出力が進まない（接続が固まった等、終了を待っても検知できない）
+                    idle = output_watchdog.check()
+                    if idle is not None:
+                        stall = output_watchdog.record_stall(idle)
+                        supervisor.open_incident('Output', stall['reason'],
+                                                 occurred=time.monotonic() - idle)
+                        await self._terminate_encoder()
+                        if self._can_recover():
+                            self._increment_recovery()
+                            stalled = True
+                        else:
+                            print(f"復旧試行回数上限に達しました。配信を停止します。", flush=True)
+                            supervisor.close_incident('failed')
+                            self._stop_requested = True
+                        break
+
+                    # 60秒安定動作で復旧カウンターリセット
+                    if self._recovery_count > 0 and time.monotonic() - stable_since >= self._stable_seconds:
                         self._reset_recovery_count()
-                        stable_seconds = 0
+                        stable_since = time.monotonic()
+
+                    # 適応エンコード: プロファイルを切り替える場合は配信FFmpegを再起動（復旧回数には数えない）
+                    if encoder_controller.poll():
+                        await self._restart_for_profile()
+                        profile_changed = True
+                        break
+
+                    # 配信FFmpegの終了・部品からの通知・停止要求・次の定期処理まで待機
+                    await supervisor.wait(self.process, self._next_check_seconds(stable_since))
 
-                    await asyncio.sleep(1)
+                await self._finish_output_readers()
 
                 if self._stop_requested:
                     break
 
+                if profile_changed:
+                    continue
+
+                if stalled:
+                    # 主・予備を切り替えた場合も含め、配信FFmpegのみ再起動（音声・映像は次の配信FFmpegに再接続）
+                    await self._wait_recovery_delay(self._get_recovery_delay())
+                    continue
+
+                # 配信FFmpegが終了した場合は再起動（正常終了なら即座に）
+                if self.process.returncode == 0:
+                    supervisor.open_incident('FFmpeg', '終了 (code: 0)')
+
                 # エラー時の処理（FFmpegクラッシュ）
                 if self.process.returncode != 0 and not self._stop_requested:
-                    stderr = await self.process.stderr.read()
-                    error_msg = stderr.decode()[-500:]
+                    error_msg = output_monitor.get_error_tail(5)[-500:]
                     print(f"FFmpegエラー (code: {self.process.returncode})", flush=True)
                     print(f"  {error_msg}", flush=True)
+                    supervisor.open_incident('FFmpeg', f"終了 (code: {self.process.returncode})")
 
                     if self._can_recover():
                         self._increment_recovery()
-                        print(f"FFmpegクラッシュ検出、{self._recovery_delay}秒後に再起動...", flush=True)
-                        await asyncio.sleep(self._recovery_delay)
+                        delay = self._get_recovery_delay()
+                        print(f"FFmpegクラッシュ検出、{delay}秒後に再起動...", flush=True)
+                        await self._wait_recovery_delay(delay)
                         continue
                     else:
                         print(f"復旧試行回数上限に達しました。配信を停止します。", flush=True)
+                        supervisor.close_incident('failed')
                         self._stop_requested = True
                         break
 
             except Exception as e:
                 print(f"ストリームエラー: {e}", flush=True)
+                supervisor.open_incident('StreamManager', str(e))
                 if self._can_recover():
                     self._increment_recovery()
-                    await asyncio.sleep(self._recovery_delay)
+                    await self._wait_recovery_delay(self._recovery_delay)
                 else:
                     print(f"復旧試行回数上限に達しました。配信を停止します。", flush=True)
+                    supervisor.close_incident('failed')
                     self._stop_requested = True
                     break
 
         # クリーンアップ
+        supervisor.close_incident('stopped')
+        self._release_encoder()
         await video_generator.stop()
         await audio_player.stop()
 
         self.is_streaming = False
         print("配信終了", flush=True)
 
+    async def _wait_recovery_delay(self, delay: float):
+        """再起動前の待機（停止要求があれば即座に戻る）"""
+        deadline = time.monotonic() + delay
+        while not self._stop_requested:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await self.station.supervisor.wait(None, remaining)
+
+    def _next_check_seconds(self, stable_since: float) -> float:
+        """次の定期処理（適応エンコードの計測・出力の停止の判定・復旧カウンターのリセット）までの秒数（なければNone）"""
+        delays = []
+        sample = self.station.encoder_controller.seconds_until_sample()
+        if sample is not None:
+            delays.append(sample)
+        stall = self.station.output_watchdog.seconds_until_check()
+        if stall is not None:
+            delays.append(stall)
+        if self._recovery_count > 0:
+            delays.append(max(0.0, stable_since + self._stable_seconds - time.monotonic()))
+        return min(delays) if delays else None
+
+    async def _finish_output_readers(self):
+        """stderr・stdout（進捗）の読み込み完了を待ち、終了状態を反映"""
+        for task in (self._stderr_task, self._progress_task):
+            if task:
+                try:
+                    await asyncio.wait_for(task, timeout=5)
+                except asyncio.TimeoutError:
+                    task.cancel()
+        self._stderr_task = None
+        self._progress_task = None
+        if self.process and self.process.returncode is not None:
+            self.station.output_monitor.mark_exited(self.process.returncode)
+            self._release_encoder()
+
+    def _reserve_encoder(self):
+        """配信FFmpegの分のCPU予算を予約（前回の予約は解放）"""
+        self._release_encoder()
+        if self.station.video_generator.is_copy_mode():
+            cost = scheduler.ENCODE_COPY_COST
+        else:
+            cost = scheduler.ENCODE_COST * self.station.encoder_controller.get_profile()['load']
+        self._encoder_token = scheduler.reserve(self.station.id, 'encode', cost)
+
+    def _release_encoder(self):
+        """配信FFmpegのCPU予約を解放"""
+        if self._encoder_token is not None:
+            scheduler.release(self._encoder_token)
+            self._encoder_token = None
+
     async def stop(self) -> tuple[bool, str]:
         """配信を停止"""
         if not self.is_streaming:
@@ -352,39 +509,36 @@ class StreamManager:
 
         print("配信停止リクエスト", flush=True)
         self._stop_requested = True
+        self.station.supervisor.wake()
         self._save_state(False)  # 配信停止を保存
 
-        await video_generator.stop()
-        await audio_player.stop()
+        await self.station.video_generator.stop()
+        await self.station.audio_player.stop()
 
-        if self.process and self.process.returncode is None:
-            self.process.terminate()
-            try:
-                await asyncio.wait_for(self.process.wait(), timeout=5)
-            except asyncio.TimeoutError:
-                self.process.kill()
+        await self._terminate_encoder()
 
         self.is_streaming = False
         return True, "配信を停止しました"
 
     def skip(self) -> bool:
         """現在の曲をスキップ"""
-        return audio_player.skip()
+        return self.station.audio_player.skip()
 
     def shuffle(self) -> bool:
         """プレイリストを再シャッフル（後方互換用）"""
-        return audio_player.shuffle()
+        return self.station.audio_player.shuffle()
 
     def toggle_playback_mode(self) -> str:
         """再生モードを切り替え"""
-        return audio_player.toggle_playback_mode()
+        return self.station.audio_player.toggle_playback_mode()
 
     def get_playback_mode(self) -> str:
         """現在の再生モードを取得"""
-        return audio_player.get_playback_mode()
+        return self.station.audio_player.get_playback_mode()
 
     def get_status(self) -> dict:
         """配信状態を取得"""
+        audio_player = self.station.audio_player
         uptime = None
         if self.start_time and self.is_streaming:
             delta = datetime.now() - self.start_time
@@ -398,7 +552,19 @@ class StreamManager:
             'uptime_seconds': uptime,
             'uptime_formatted': self._format_uptime(uptime) if uptime else None,
             'current_track': current_track,
-            'stream_url': config.get_stream_url()
+            'audio_buffer': audio_player.get_buffer_stats(),
+            'av_sync': self.station.media_clock.get_stats() if self.is_streaming else None,
+            'outputs': self.station.output_monitor.get_status() if self.is_streaming else None,
+            'encoder': self.station.encoder_controller.get_status(),
+            'telemetry': self.station.encoder_telemetry.get_status() if self.is_streaming else None,
+            'output_watchdog': self.station.output_watchdog.get_status(),
+            'incidents': self.station.supervisor.get_status(),
+            'encoder_restarts': {
+                'count': audio_player.reconnect_count,
+                'last_seconds': round(audio_player.last_reconnect_seconds, 2)
+                if audio_player.last_reconnect_seconds is not None else None,
+            },
+            'stream_url': self.config.get_stream_url()
         }
 
     def _format_uptime(self, seconds: int) -> str:
@@ -408,6 +574,3 @@ class StreamManager:
         secs = seconds % 60
         return f"{hours}:{minutes:02d}:{secs:02d}"
 
-
-# シングルトン
-stream_manager = StreamManager()
@@ -0,0 +1,187 @@
+"""
+SUNO Radio Lite - 配信出力
+1回のエンコードを複数の配信先に分配（teeマルチプレクサ）し、配信先ごとの状態を監視
+"""
+
+import re
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+
+# teeの配信先が失敗した時のログ（libavformat/tee.c）
+SLAVE_FAILED_PATTERN = re.compile(r'Slave muxer #(\d+) failed: (.*?), continuing with')
+ALL_FAILED_PATTERN = re.compile(r'All tee outputs failed')
+# エンコード進捗（出力が始まった目安）
+PROGRESS_PATTERN = re.compile(r'^(frame|size)=')
+
+STATE_CONNECTING = 'connecting'
+STATE_LIVE = 'live'
+STATE_FAILED = 'failed'
+STATE_STALLED = 'stalled'
+STATE_STOPPED = 'stopped'
+
+# 追加の配信先はfifo疑似マルチプレクサ経由で出力（別スレッドで書き込み、詰まっても溢れた分を破棄して再接続を試行）
+# メインの配信先の書き込みだけがエンコードを止めうるため、出力の進みはメインの配信先の進みとみなせる
+EXTRA_SLAVE_FIFO_OPTIONS = 'use_fifo=1:fifo_options=drop_pkts_on_overflow=1\\:attempt_recovery=1\\:recover_any_error=1'
+
+
+def mask_output_url(url: str) -> str:
+    """配信先URLのストリームキー部分（最後のパス要素）を伏せる"""
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        # ローカルファイル等
+        return url
+
+    path, _, key = parts.path.rpartition('/')
+    if key:
+        key = key[:4] + '****' if len(key) > 8 else '****'
+    return f"{parts.scheme}://{parts.netloc}{path}/{key}"
+
+
+def _escape_tee(text: str) -> str:
+    """teeの出力指定で特別な意味を持つ文字をエスケープ"""
+    for char in ('\\', "'", '|', '[', ']'):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def build_output_args(destinations: list) -> list:
+    """
+    出力部分のFFmpeg引数を構築
+
+    配信先が1つの場合は従来どおりflvで直接出力、複数の場合はteeで分配
+    （1つの配信先が失敗しても他の配信先は継続: onfail=ignore、追加の配信先は詰まってもエンコードを止めない: use_fifo）
+    """
+    if len(destinations) == 1:
+        return ['-f', 'flv', '-flvflags', 'no_duration_filesize', destinations[0]['url']]
+
+    slaves = '|'.join(
+        f"[f=flv:flvflags=no_duration_filesize:onfail=ignore"
+        f"{'' if destination['name'] == 'main' else ':' + EXTRA_SLAVE_FIFO_OPTIONS}]{_escape_tee(destination['url'])}"
+        for destination in destinations
+    )
+    return [
+        # flvはヘッダーにコーデック情報が必要（teeでは出力側から要求されないため明示）
+        '-flags', '+global_header',
+        '-f', 'tee',
+        slaves
+    ]
+
+
+class OutputMonitor:
+    """配信FFmpegのstderrを読み、配信先ごとの状態を記録"""
+
+    # 終了時のエラー表示用に保持する行数
+    TAIL_LINES = 20
+
+    def __init__(self, on_live=None):
+        # 起動ごとに最初の進捗行（出力の開始）で呼び出すコールバック
+        self._on_live = on_live
+        self._destinations = []
+        self._states = []
+        self._tail = deque(maxlen=self.TAIL_LINES)
+        self._live = False
+
+    def reset(self, destinations: list):
+        """配信FFmpegの起動ごとに状態を初期化"""
+        now = time.time()
+        self._destinations = list(destinations)
+        self._states = [
+            {'state': STATE_CONNECTING, 'error': None, 'since': now}
+            for _ in destinations
+        ]
+        self._tail.clear()
+        self._live = False
+
+    def _set_state(self, index: int, state: str, error: str = None):
+        if index >= len(self._states) or self._states[index]['state'] == state:
+            return
+        self._states[index] = {'state': state, 'error': error, 'since': time.time()}
+
+    async def read_stderr(self, stream):
+        """
+        stderrを終了まで読み続ける（パイプが詰まってFFmpegが止まらないよう常に読む）
+
+        進捗行は改行ではなく\\rで区切られるため両方で分割
+        """
+        buffer = ''
+        while True:
+            chunk = await stream.read(4096)
+            if not chunk:
+                break
+            buffer += chunk.decode(errors='replace')
+            *lines, buffer = re.split(r'[\r\n]', buffer)
+            for line in lines:
+                if line.strip():
+                    self._handle_line(line.strip())
+
+        if buffer.strip():
+            self._handle_line(buffer.strip())
+
+    def _handle_line(self, line: str):
+        if PROGRESS_PATTERN.match(line):
+            if not self._live:
+                self._live = True
+                if self._on_live:
+                    self._on_live()
+            for index, state in enumerate(self._states):
+                if state['state'] == STATE_CONNECTING:
+                    self._set_state(index, STATE_LIVE)
+            return
+
+        self._tail.append(line)
+
+        match = SLAVE_FAILED_PATTERN.search(line)
+        if match:
+            index = int(match.group(1))
+            if index < len(self._destinations):
+                self._set_state(index, STATE_FAILED, match.group(2))
+                print(f"配信先エラー: {self._destinations[index]['name']} - {match.group(2)}（他の配信先は継続）",
+                      flush=True)
+            return
+
+        if ALL_FAILED_PATTERN.search(line):
+            for index in range(len(self._states)):
+                if self._states[index]['state'] != STATE_FAILED:
+                    self._set_state(index, STATE_FAILED, 'all outputs failed')
+
+    def get_state(self, index: int) -> dict:
+        """配信先の状態（state / error / since、存在しなければNone）"""
+        if index >= len(self._states):
+            return None
+        return dict(self._states[index])
+
+    def mark_stalled(self, index: int, reason: str):
+        """配信先の出力の停止を反映（出力の監視で検知した場合）"""
+        self._set_state(index, STATE_STALLED, reason)
+
+    def mark_exited(self, returncode: int):
+        """配信FFmpegの終了を反映（失敗済み・出力の停止で終了した配信先以外は停止/エラーに）"""
+        error = self.get_error_tail(1) if returncode != 0 else None
+        for index, state in enumerate(self._states):
+            if state['state'] not in (STATE_FAILED, STATE_STALLED):
+                self._set_state(index, STATE_FAILED if returncode != 0 else STATE_STOPPED, error)
+
+    def get_error_tail(self, lines: int = TAIL_LINES) -> str:
+        """stderrの末尾（終了時のエラー表示用）"""
+        return '\n'.join(list(self._tail)[-lines:])
+
+    def get_status(self) -> list[dict]:
+        """配信先ごとの状態（URLはキーを伏せて表示）"""
+        now = time.time()
+        return [
+            {
+                'name': destination['name'],
+                'target': mask_output_url(destination['url']),
+                'state': state['state'],
+                'error': state['error'],
+                'state_seconds': int(now - state['since']),
+            }
+            for destination, state in zip(self._destinations, self._states)
+        ]
+
+    def count_live(self) -> int:
+        """配信中の配信先数"""
+        return sum(1 for state in self._states if state['state'] == STATE_LIVE)
+
@@ -0,0 +1,168 @@
+"""
+SUNO Radio Lite - パイプライン監視
+各部品からの通知・配信FFmpegの終了・停止要求をイベントで待ち受け（ポーリングなし）、障害ごとに検知・復旧時間を記録
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from core.metrics import metrics
+
+
+class PipelineSupervisor:
+    """局の配信パイプラインの監視"""
+
+    INCIDENT_HISTORY = 20
+
+    def __init__(self, station):
+        self.station = station
+        self._loop = None
+        self._wakeup = None
+        self._ready = {}
+        # 障害の兆候（部品からの通知）: [(部品, 理由, 発生時刻)]
+        self._evidence = []
+        self._incident = None
+        self.incidents = deque(maxlen=self.INCIDENT_HISTORY)
+
+    def bind(self):
+        """イベントループを記録（ループ上で呼び出し、2回目以降は何もしない）"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._ready = {}
+
+    def call_soon(self, callback, *args):
+        """イベントループ上でコールバックを実行（スレッドからも呼び出し可）"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass
+
+    # --- 部品からの通知 ---
+
+    def notify(self, component: str, reason: str):
+        """
+        部品の停止・切断を通知して配信ループを起こす（スレッドからも呼び出し可）
+
+        発生時刻は通知した時点で記録（障害の検知時間の起点）
+        """
+        self.call_soon(self._on_notify, component, reason, time.monotonic())
+
+    def _on_notify(self, component: str, reason: str, occurred: float):
+        self._evidence.append((component, reason, occurred))
+        self._wakeup.set()
+
+    def wake(self):
+        """配信ループを起こす（停止要求等）"""
+        if self._wakeup is not None:
+            self.call_soon(self._wakeup.set)
+
+    def expect_ready(self, component: str):
+        """部品の準備完了の待ち受けを開始（部品を開始する前に呼び出し）"""
+        self._ready[component] = self._loop.create_future()
+
+    def report_ready(self, component: str, ready: bool = True):
+        """部品の準備完了（Falseなら開始失敗）を通知（スレッドからも呼び出し可）"""
+        self.call_soon(self._set_ready, component, ready)
+
+    def _set_ready(self, component: str, ready: bool):
+        future = self._ready.get(component)
+        if future is not None and not future.done():
+            future.set_result(ready)
+
+    async def wait_ready(self, component: str, timeout: float) -> bool:
+        """部品の準備完了を待機（開始失敗・タイムアウト時はFalse）"""
+        future = self._ready.get(component)
+        if future is None:
+            return False
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    # --- 待機 ---
+
+    async def wait(self, process, timeout: float = None):
+        """配信FFmpegの終了・部品からの通知・停止要求のいずれかまで待機（timeout秒で戻る）"""
+        if not self._wakeup.is_set():
+            waiters = [asyncio.ensure_future(self._wakeup.wait())]
+            if process is not None and process.returncode is None:
+                # 子プロセスの終了はイベントループの子プロセス監視（pidfd等）で即座に通知される
+                waiters.append(asyncio.ensure_future(process.wait()))
+            try:
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        self._wakeup.clear()
+
+    def clear_evidence(self):
+        """障害の兆候をクリア（配信FFmpegの起動ごと、計画的な再起動で出た通知を障害に数えない）"""
+        self._evidence.clear()
+
+    # --- 障害の記録 ---
+
+    def open_incident(self, component: str, reason: str, occurred: float = None):
+        """
+        障害の検知を記録（復旧まで同じ障害として扱い、再試行回数を数える）
+
+        検知時間 = 最初の兆候（部品からの通知、または occurred で指定した発生時刻）から配信ループが対処を始めるまで
+        """
+        now = time.monotonic()
+        if self._incident is not None:
+            self._incident['attempts'] += 1
+            return
+
+        if occurred is not None:
+            self._evidence.append((component, reason, occurred))
+        occurred = min([item[2] for item in self._evidence] + [now])
+        self._evidence.clear()
+        self._incident = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'component': component,
+            'reason': reason,
+            'detect_ms': round((now - occurred) * 1000, 1),
+            'recover_ms': None,
+            'outage_ms': None,
+            'attempts': 1,
+            'result': 'recovering',
+            '_detected': now,
+        }
+        metrics.incidents.labels(self.station.id, component).inc()
+        print(f"障害検知: {component} - {reason}（検知 {self._incident['detect_ms']}ms）", flush=True)
+
+    def mark_recovered(self):
+        """配信の出力が再開した時点で障害を復旧済みにする"""
+        incident, self._incident = self._incident, None
+        if incident is None:
+            return
+        recover_seconds = time.monotonic() - incident.pop('_detected')
+        incident['recover_ms'] = round(recover_seconds * 1000, 1)
+        # 停止時間 = 発生（最初の兆候）から出力の再開まで
+        incident['outage_ms'] = round(incident['detect_ms'] + incident['recover_ms'], 1)
+        metrics.incident_recovery.labels(self.station.id).observe(recover_seconds)
+        metrics.incident_outage.labels(self.station.id, incident['component']).observe(incident['outage_ms'] / 1000)
+        incident['result'] = 'recovered'
+        self.incidents.append(incident)
+        print(f"復旧: {incident['component']}（検知 {incident['detect_ms']}ms / "
+              f"復旧 {incident['recover_ms']}ms / 停止 {incident['outage_ms']}ms / 試行 {incident['attempts']}回）", flush=True)
+
+    def close_incident(self, result: str):
+        """復旧できずに配信を終了した場合（failed / stopped）"""
+        incident, self._incident = self._incident, None
+        if incident is None:
+            return
+        incident.pop('_detected')
+        incident['result'] = result
+        self.incidents.append(incident)
+
+    def get_status(self) -> list[dict]:
+        """障害の履歴（復旧中の障害を含む、新しい順）"""
+        history = list(self.incidents)
+        if self._incident is not None:
+            history.append({k: v for k, v in self._incident.items() if not k.startswith('_')})
+        return history[::-1]
@@ -0,0 +1,296 @@
+"""
+SUNO Radio Lite - トラックインデックス
+ffprobeで取得した楽曲メタデータ（長さ・コーデック・タグ等）の永続化（SQLite）
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from core.normalization_cache import normalization_cache
+
+
+class TrackIndex:
+    """楽曲ディレクトリのメタデータインデックス（サイズ+mtimeで差分のみ再取得）"""
+
+    # ffprobeの同時実行数
+    PROBE_WORKERS = 4
+    # DBへの書き込みをまとめる件数
+    BATCH_SIZE = 50
+    # ライブラリ変更から再取得までの待ち時間（連続する変更をまとめる）
+    SCAN_DEBOUNCE_SECONDS = 2.0
+
+    COLUMNS = (
+        'name', 'size', 'mtime_ns', 'content_hash', 'duration', 'codec',
+        'sample_rate', 'bit_rate', 'title', 'artist', 'album', 'probe_error', 'probed_at'
+    )
+
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+        # 局ごとのDB（全局で共有するノーマライズキャッシュの library.db とは別ファイルにし、接続間のロック競合を避ける）
+        self.db_path = os.path.join(self.config.DATA_DIR, 'tracks.db')
+        self._lock = threading.Lock()
+        self._conn = None
+        # ファイル名 -> エントリ
+        self._entries = {}
+        self._scan_lock = None
+        self._scan_handle = None
+        self._watching = False
+        self._listeners = []
+
+    def _ensure_loaded(self):
+        """DBを開いて既存のインデックスを読み込み（初回のみ）"""
+        if self._conn is not None:
+            return
+
+        with self._lock:
+            if self._conn is not None:
+                return
+
+            os.makedirs(self.config.DATA_DIR, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS tracks ('
+                ' name TEXT PRIMARY KEY,'
+                ' size INTEGER NOT NULL,'
+                ' mtime_ns INTEGER NOT NULL,'
+                ' content_hash TEXT,'
+                ' duration REAL,'
+                ' codec TEXT,'
+                ' sample_rate INTEGER,'
+                ' bit_rate INTEGER,'
+                ' title TEXT,'
+                ' artist TEXT,'
+                ' album TEXT,'
+                ' probe_error TEXT,'
+                ' probed_at TEXT)'
+            )
+            conn.commit()
+
+            for row in conn.execute(f'SELECT {", ".join(self.COLUMNS)} FROM tracks'):
+                entry = dict(zip(self.COLUMNS, row))
+                self._entries[entry['name']] = entry
+
+            self._conn = conn
+            print(f"トラックインデックス読込: {len(self._entries)}曲", flush=True)
+
+    async def _probe(self, filepath: str) -> dict:
+        """ffprobeでメタデータを取得"""
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-select_streams', 'a:0',
+            '-show_entries', 'format=duration,bit_rate:format_tags:stream=codec_name,sample_rate',
+            '-of', 'json',
+            filepath
+        ]
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            return {'probe_error': stderr.decode(errors='replace').strip()[-200:] or 'ffprobe失敗'}
+
+        try:
+            info = json.loads(stdout.decode())
+        except json.JSONDecodeError:
+            return {'probe_error': 'ffprobe出力の解析に失敗'}
+
+        streams = info.get('streams') or []
+        if not streams:
+            return {'probe_error': '音声ストリームがありません'}
+
+        fmt = info.get('format', {})
+        tags = {k.lower(): v for k, v in (fmt.get('tags') or {}).items()}
+
+        def to_number(value, cast):
+            try:
+                return cast(value)
+            except (TypeError, ValueError):
+                return None
+
+        return {
+            'duration': to_number(fmt.get('duration'), float),
+            'codec': streams[0].get('codec_name'),
+            'sample_rate': to_number(streams[0].get('sample_rate'), int),
+            'bit_rate': to_number(fmt.get('bit_rate'), int),
+            'title': tags.get('title'),
+            'artist': tags.get('artist'),
+            'album': tags.get('album'),
+            'probe_error': None,
+        }
+
+    def _write_batch(self, entries: list, removed: list) -> tuple[list, list]:
+        """
+        エントリの追加・更新と削除を1トランザクションで反映
+
+        Returns:
+            (再生可能になった楽曲名, 再生可能でなくなった楽曲名)
+        """
+        playable_added = []
+        playable_removed = []
+
+        with self._lock:
+            for entry in entries:
+                old = self._entries.get(entry['name'])
+                was_playable = old is not None and self.is_playable(old)
+                if self.is_playable(entry) and not was_playable:
+                    playable_added.append(entry['name'])
+                elif was_playable and not self.is_playable(entry):
+                    playable_removed.append(entry['name'])
+                self._entries[entry['name']] = entry
+            for name in removed:
+                old = self._entries.pop(name, None)
+                if old is not None and self.is_playable(old):
+                    playable_removed.append(name)
+
+            with self._conn:
+                self._conn.executemany(
+                    f'INSERT OR REPLACE INTO tracks ({", ".join(self.COLUMNS)})'
+                    f' VALUES ({", ".join("?" * len(self.COLUMNS))})',
+                    [tuple(entry[column] for column in self.COLUMNS) for entry in entries]
+                )
+                self._conn.executemany('DELETE FROM tracks WHERE name = ?', [(name,) for name in removed])
+
+        return playable_added, playable_removed
+
+    async def scan(self) -> tuple[int, int]:
+        """
+        楽曲ライブラリと照合し、新規・変更ファイルのみffprobeで取得
+
+        Returns:
+            (取得数, 削除数)
+        """
+        if self._scan_lock is None:
+            self._scan_lock = asyncio.Lock()
+
+        async with self._scan_lock:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._ensure_loaded)
+            files = await loop.run_in_executor(None, self.station.library.get_files)
+
+            removed = [name for name in self._entries if name not in files]
+            changed = [
+                name for name, (size, mtime_ns) in files.items()
+                if (name not in self._entries
+                    or self._entries[name]['size'] != size
+                    or self._entries[name]['mtime_ns'] != mtime_ns)
+            ]
+
+            if removed:
+                self._notify(*await loop.run_in_executor(None, self._write_batch, [], removed))
+
+            if not changed:
+                return 0, len(removed)
+
+            print(f"トラックインデックス更新: {len(changed)}曲を取得", flush=True)
+            semaphore = asyncio.Semaphore(self.PROBE_WORKERS)
+
+            async def probe_with_limit(name: str) -> dict:
+                async with semaphore:
+                    filepath = os.path.join(self.config.MUSIC_DIR, name)
+                    size, mtime_ns = files[name]
+                    content_hash = await loop.run_in_executor(
+                        None,
+                        lambda: normalization_cache.fingerprint(filepath, allow_hash=False, stat_key=(size, mtime_ns))
+                    )
+                    entry = dict.fromkeys(self.COLUMNS)
+                    entry.update(
+                        name=name,
+                        size=size,
+                        mtime_ns=mtime_ns,
+                        content_hash=content_hash,
+                        probed_at=datetime.now().isoformat()
+                    )
+                    entry.update(await self._probe(filepath))
+                    return entry
+
+            probed = 0
+            for start in range(0, len(changed), self.BATCH_SIZE):
+                batch = changed[start:start + self.BATCH_SIZE]
+                try:
+                    entries = await asyncio.gather(*(probe_with_limit(name) for name in batch))
+                except FileNotFoundError:
+                    print("ffprobeが見つかりません: トラックインデックスの更新をスキップ", flush=True)
+                    break
+                self._notify(*await loop.run_in_executor(None, self._write_batch, entries, []))
+                probed += len(entries)
+
+            failed = sum(1 for entry in self._entries.values() if entry['probe_error'])
+            if failed:
+                print(f"トラックインデックス: 再生できない楽曲 {failed}曲", flush=True)
+
+            return probed, len(removed)
+
+    def watch_library(self):
+        """楽曲ライブラリの変更時に差分取得を予約するよう登録"""
+        if not self._watching:
+            self._watching = True
+            self.station.library.add_listener(self._schedule_scan)
+
+    def _schedule_scan(self):
+        """差分取得を予約（一定時間内の変更はまとめて1回）"""
+        if self._scan_handle:
+            self._scan_handle.cancel()
+        loop = asyncio.get_event_loop()
+        self._scan_handle = loop.call_later(
+            self.SCAN_DEBOUNCE_SECONDS,
+            lambda: asyncio.ensure_future(self.scan())
+        )
+
+    # --- 変更通知 ---
+
+    def add_listener(self, callback):
+        """再生可能な楽曲の増減時に呼び出すコールバックを登録（callback(追加された楽曲名, 削除された楽曲名)）"""
+        self._listeners.append(callback)
+
+    def _notify(self, added: list, removed: list):
+        if not added and not removed:
+            return
+        for callback in self._listeners:
+            try:
+                callback(added, removed)
+            except Exception as e:
+                print(f"トラックインデックス通知エラー: {e}", flush=True)
+
+    # --- 参照 ---
+
+    def count(self) -> int:
+        """インデックス済みの楽曲数"""
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def get_tracks(self) -> list[dict]:
+        """インデックス済みの楽曲一覧（ファイル名順）"""
+        self._ensure_loaded()
+        with self._lock:
+            return [dict(self._entries[name]) for name in sorted(self._entries)]
+
+    def get(self, filepath: str) -> dict:
+        """楽曲のエントリを取得（ファイル名で検索、未登録ならNone）"""
+        self._ensure_loaded()
+        entry = self._entries.get(os.path.basename(filepath))
+        return dict(entry) if entry else None
+
+    def get_duration(self, filepath: str) -> float:
+        """楽曲の長さ（秒、不明ならNone）"""
+        entry = self.get(filepath)
+        return entry['duration'] if entry else None
+
+    def is_playable(self, entry: dict) -> bool:
+        """ffprobeで音声ストリームが確認できたか"""
+        return not entry['probe_error']
+
+
+def format_duration(seconds: float) -> str:
+    """秒を分:秒形式に変換"""
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
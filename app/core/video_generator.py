@@ -1,26 +1,34 @@
 """
 SUNO Radio Lite - 映像生成
-静止画背景をrawvideoでFIFOに出力
+静止画背景をrawvideoでFIFOに出力、またはH.264ループ動画として事前エンコード
 """
 
 import asyncio
+import errno
+import glob
+import hashlib
 import os
 import subprocess
 import threading
 import time
-from config import config
+from core.metrics import metrics
+
+
+# 配信FFmpegがFIFOを開くまでの確認間隔（秒）
+FIFO_OPEN_POLL_SECONDS = 0.02
 
 
 class VideoGenerator:
     """映像生成プロセス管理"""
 
-    def __init__(self):
-        self.fifo_path = os.path.join(config.DATA_DIR, 'video_fifo')
-        self._process = None
+    def __init__(self, station):
+        self.station = station
+        self.config = station.config
+        self.fifo_path = os.path.join(self.config.DATA_DIR, 'video_fifo')
         self._running = False
         self._writer_thread = None
-        self._auto_restart = True
         self._ffmpeg_crash_detected = False  # FFmpegクラッシュ検出フラグ
+        self._loop_path = None  # loopモード時のキャッシュ済みループ動画
 
     def _create_fifo(self):
         """Video FIFOを作成"""
@@ -29,6 +37,11 @@ class VideoGenerator:
         os.mkfifo(self.fifo_path)
         print(f"Video FIFO作成: {self.fifo_path}", flush=True)
 
+    def renew_fifo(self):
+        """Video FIFOを作り直す（配信FFmpegの再起動時、前回の書きかけのフレームを次の配信FFmpegに渡さないため）"""
+        if self._running and not self.is_copy_mode():
+            self._create_fifo()
+
     def _cleanup_fifo(self):
         """Video FIFOを削除"""
         if os.path.exists(self.fifo_path):
@@ -40,105 +53,253 @@ class VideoGenerator:
     def _get_background_path(self) -> str:
         """背景画像パスを取得"""
         for ext in ['jpg', 'jpeg', 'png']:
-            path = os.path.join(config.ASSETS_DIR, f'background.{ext}')
+            path = os.path.join(self.config.ASSETS_DIR, f'background.{ext}')
             if os.path.exists(path):
                 return path
         return None
 
-    def _build_ffmpeg_command(self, background_path: str) -> list:
-        """FFmpegコマンドを構築"""
-        resolution = config.STREAM_RESOLUTION.replace('x', ':')
-        fps = config.STREAM_FPS
-
-        # スケールフィルター（アスペクト比維持、パディング、YUV420p変換）
-        scale_filter = (
+    def _build_scale_filter(self) -> str:
+        """スケールフィルター（アスペクト比維持、パディング、YUV420p変換）"""
+        resolution = self.config.STREAM_RESOLUTION.replace('x', ':')
+        return (
             f"scale={resolution}:force_original_aspect_ratio=decrease,"
             f"pad={resolution}:(ow-iw)/2:(oh-ih)/2:color=black,"
-            f"fps={fps},"
             f"format=yuv420p"
         )
 
+    def _get_frame_size(self) -> int:
+        """yuv420pの1フレームあたりのバイト数"""
+        width, height = (int(v) for v in self.config.STREAM_RESOLUTION.split('x'))
+        return width * height * 3 // 2
+
+    def _decode_frame(self, background_path: str) -> bytes:
+        """背景画像を一度だけデコード・スケールしてyuv420pの1フレームを取得"""
         cmd = [
             'ffmpeg',
-            '-loop', '1',
-            '-re',
             '-i', background_path,
-            '-vf', scale_filter,
+            '-vf', self._build_scale_filter(),
+            '-frames:v', '1',
             '-f', 'rawvideo',
             '-pix_fmt', 'yuv420p',
+            '-loglevel', 'error',
             'pipe:1'
         ]
 
+        result = subprocess.run(cmd, capture_output=True)
+        frame_size = self._get_frame_size()
+
+        if result.returncode != 0 or len(result.stdout) != frame_size:
+            print(f"背景フレーム生成失敗: {result.stderr.decode(errors='replace')[-500:]}", flush=True)
+            return None
+
+        return result.stdout
+
+    def is_copy_mode(self) -> bool:
+        """事前エンコード済みループ動画を -c:v copy で使うモードかどうか"""
+        return self.config.VIDEO_MODE == 'loop'
+
+    def _get_loop_frame_count(self) -> int:
+        """ループ動画のフレーム数（GOP長の整数倍に揃える）"""
+        gop = self.config.STREAM_FPS * 2
+        gops = max(1, round(self.config.VIDEO_LOOP_SECONDS * self.config.STREAM_FPS / gop))
+        return gops * gop
+
+    def _get_loop_path(self, background_path: str) -> str:
+        """背景画像とエンコード設定に対応するループ動画のキャッシュパス"""
+        stat = os.stat(background_path)
+        key_source = ':'.join([
+            os.path.abspath(background_path),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            self.config.STREAM_RESOLUTION,
+            str(self.config.STREAM_FPS),
+            self.config.STREAM_VIDEO_BITRATE,
+            str(self._get_loop_frame_count()),
+        ])
+        key = hashlib.sha1(key_source.encode()).hexdigest()[:12]
+        return os.path.join(self.config.DATA_DIR, f'background_loop_{key}.mp4')
+
+    def _build_loop_command(self, background_path: str, output_path: str) -> list:
+        """ループ動画エンコード用のFFmpegコマンドを構築"""
+        fps = self.config.STREAM_FPS
+        scale_filter = f"{self._build_scale_filter()},fps={fps}"
+
+        # 配信側と同じキーフレーム間隔（fps*2）で固定GOPにし、
+        # ループの継ぎ目が必ずキーフレームになるようにする
+        cmd = [
+            'ffmpeg', '-y',
+            '-loop', '1',
+            '-framerate', str(fps),
+            '-i', background_path,
+            '-vf', scale_filter,
+            '-frames:v', str(self._get_loop_frame_count()),
+            '-c:v', 'libx264',
+            '-preset', 'medium',
+            '-tune', 'stillimage',
+            '-b:v', self.config.STREAM_VIDEO_BITRATE,
+            '-maxrate', self.config.STREAM_VIDEO_BITRATE,
+            '-bufsize', self.config.STREAM_VIDEO_BUFSIZE,
+            '-pix_fmt', 'yuv420p',
+            '-r', str(fps),
+            '-g', str(fps * 2),
+            '-keyint_min', str(fps * 2),
+            '-sc_threshold', '0',
+            '-bf', '0',
+            '-an',
+            '-movflags', '+faststart',
+            '-loglevel', 'error',
+            '-f', 'mp4',
+            output_path
+        ]
+
         return cmd
 
-    def _writer_loop(self, background_path: str):
-        """映像書き込みスレッド"""
-        try:
-            print("Video FIFO接続待機...", flush=True)
-            fifo = open(self.fifo_path, 'wb')
-            print("Video FIFO接続完了", flush=True)
+    def _ensure_loop(self, background_path: str) -> str:
+        """ループ動画を用意（キャッシュがあれば再利用）"""
+        loop_path = self._get_loop_path(background_path)
+        if os.path.exists(loop_path) and os.path.getsize(loop_path) > 0:
+            print(f"ループ動画キャッシュ使用: {os.path.basename(loop_path)}", flush=True)
+            return loop_path
+
+        os.makedirs(self.config.DATA_DIR, exist_ok=True)
+        temp_path = loop_path + '.tmp'
+        print(f"ループ動画エンコード開始: {os.path.basename(background_path)}", flush=True)
+
+        result = subprocess.run(
+            self._build_loop_command(background_path, temp_path),
+            capture_output=True,
+            text=True
+        )
 
-            while self._running:
+        if result.returncode != 0 or not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"ループ動画エンコード失敗: {result.stderr[-500:]}", flush=True)
+            return None
+
+        os.replace(temp_path, loop_path)
+
+        # 古いループ動画を削除
+        for old_path in glob.glob(os.path.join(self.config.DATA_DIR, 'background_loop_*.mp4')):
+            if old_path != loop_path:
                 try:
-                    cmd = self._build_ffmpeg_command(background_path)
-                    print(f"映像生成開始: {os.path.basename(background_path)}", flush=True)
+                    os.remove(old_path)
+                except OSError:
+                    pass
 
-                    self._process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.DEVNULL
-                    )
+        print(f"ループ動画エンコード完了: {os.path.basename(loop_path)}", flush=True)
+        return loop_path
 
-                    while self._running:
-                        if self._process.poll() is not None:
-                            break
+    def get_ffmpeg_input_args(self) -> list:
+        """配信FFmpegに渡す映像入力引数"""
+        if self.is_copy_mode():
+            return [
+                '-stream_loop', '-1',
+                '-re',
+                '-i', self._loop_path,
+            ]
 
-                        data = self._process.stdout.read(65536)
-                        if not data:
-                            break
+        return [
+            '-thread_queue_size', '512',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'yuv420p',
+            '-s', self.config.STREAM_RESOLUTION,
+            '-r', str(self.config.STREAM_FPS),
+            '-i', self.fifo_path,
+        ]
 
-                        try:
-                            fifo.write(data)
-                        except (BrokenPipeError, OSError):
-                            # FFmpegクラッシュ検出
-                            print("VideoGenerator: FFmpegクラッシュ検出 (BrokenPipe)", flush=True)
-                            self._ffmpeg_crash_detected = True
-                            self._running = False
-                            break
+    def _write_frame(self, fd: int, frame: memoryview):
+        """1フレーム分を確実に書き込み（部分書き込みに対応）"""
+        offset = 0
+        while offset < len(frame):
+            offset += os.write(fd, frame[offset:])
 
-                    self._cleanup_process()
+    def _open_fifo(self) -> int:
+        """配信FFmpegがFIFOを開くまで待って書き込み側を開く（停止要求を確認できるよう非ブロッキングで待機、停止時はNone）"""
+        while self._running:
+            try:
+                fd = os.open(self.fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                # 読み込み側（配信FFmpeg）がまだ開いていない
+                if e.errno != errno.ENXIO:
+                    raise
+                time.sleep(FIFO_OPEN_POLL_SECONDS)
+                continue
+
+            os.set_blocking(fd, True)
+            return fd
+        return None
 
-                    if self._running and self._auto_restart:
-                        print("映像生成再起動...", flush=True)
-                        time.sleep(0.5)
-                    else:
-                        break
+    def _writer_loop(self, frame: bytes):
+        """映像書き込みスレッド（同一フレームをメディアクロックに合わせて書き込み）"""
+        fd = None
+        media_clock = self.station.media_clock
+        metric_bytes = metrics.fifo_bytes.labels(self.station.id, 'video')
+        metric_broken_pipes = metrics.broken_pipes.labels(self.station.id, 'video')
+        try:
+            print("Video FIFO接続待機...", flush=True)
+            fd = self._open_fifo()
+            if fd is not None:
+                print("Video FIFO接続完了", flush=True)
+                media_clock.start()
+
+            frame_view = memoryview(frame)
+            interval = 1.0 / self.config.STREAM_FPS
+            # 先行分を除いた遅れがこのフレーム数を超えたら補正として記録
+            catchup_threshold = (self.config.AV_SYNC_LEAD_SECONDS + self.config.AV_DRIFT_THRESHOLD_SECONDS) * self.config.STREAM_FPS
 
-                except Exception as e:
-                    print(f"映像生成エラー: {e}", flush=True)
-                    self._cleanup_process()
-                    if self._running and self._auto_restart:
-                        time.sleep(0.5)
-                    else:
+            while self._running:
+                # 配信FFmpegの再起動中は再接続を待つ
+                if fd is None:
+                    fd = self._open_fifo()
+                    if fd is None:
                         break
+                    print("Video FIFO再接続完了", flush=True)
+                    media_clock.start()
+                    continue
+
+                due = media_clock.video_frames_due()
+                if due == 0:
+                    time.sleep(interval / 2)
+                    continue
+
+                # 閾値以上遅れた場合は記録（静止画なので同一フレームを連続で書き込んで追いつく）
+                if self.config.AV_DRIFT_THRESHOLD_SECONDS and due > catchup_threshold:
+                    media_clock.record_video_catchup(due)
 
-            fifo.close()
+                try:
+                    for _ in range(due):
+                        self._write_frame(fd, frame_view)
+                        media_clock.add_video(1)
+                        metric_bytes.inc(len(frame_view))
+                        if not self._running:
+                            break
+                except (BrokenPipeError, OSError):
+                    metric_broken_pipes.inc()
+                    if self.config.ENCODER_HOT_RESTART:
+                        # 配信FFmpegのみ再起動（書き込みは止めずに次の配信FFmpegへ再接続）
+                        print("VideoGenerator: 配信FFmpegから切断、再接続を待機", flush=True)
+                        self.station.supervisor.notify('VideoGenerator', 'BrokenPipe（再接続待機）')
+                        os.close(fd)
+                        fd = None
+                        continue
+                    # 配信FFmpegクラッシュ検出
+                    print("VideoGenerator: FFmpegクラッシュ検出 (BrokenPipe)", flush=True)
+                    self._ffmpeg_crash_detected = True
+                    self._running = False
+                    self.station.supervisor.notify('VideoGenerator', 'BrokenPipe')
+                    break
 
         except Exception as e:
             print(f"映像書き込みスレッドエラー: {e}", flush=True)
-
-    def _cleanup_process(self):
-        """プロセスをクリーンアップ"""
-        if self._process:
-            try:
-                self._process.terminate()
-                self._process.wait(timeout=2)
-            except:
+            self._running = False
+            self.station.supervisor.notify('VideoGenerator', f"書き込みスレッドエラー: {e}")
+        finally:
+            if fd is not None:
                 try:
-                    self._process.kill()
-                except:
+                    os.close(fd)
+                except OSError:
                     pass
-            self._process = None
 
     async def start(self):
         """映像生成を開始"""
@@ -150,14 +311,30 @@ class VideoGenerator:
             print("背景ファイルが見つかりません", flush=True)
             return False
 
+        if self.is_copy_mode():
+            loop = asyncio.get_event_loop()
+            loop_path = await loop.run_in_executor(None, self._ensure_loop, background_path)
+            if not loop_path:
+                return False
+            self._loop_path = loop_path
+            self._running = True
+            self.reset_crash_detection()
+            return True
+
+        loop = asyncio.get_event_loop()
+        frame = await loop.run_in_executor(None, self._decode_frame, background_path)
+        if not frame:
+            return False
+
         self._create_fifo()
         self._running = True
         # クラッシュ検出をリセット
         self.reset_crash_detection()
 
+        print(f"映像生成開始: {os.path.basename(background_path)}", flush=True)
         self._writer_thread = threading.Thread(
             target=self._writer_loop,
-            args=(background_path,),
+            args=(frame,),
             daemon=True
         )
         self._writer_thread.start()
@@ -170,14 +347,12 @@ class VideoGenerator:
 
         print("映像生成停止", flush=True)
         self._running = False
-        self._auto_restart = False
-        self._cleanup_process()
 
+        # スレッドの終了はイベントループを止めずに待つ
         if self._writer_thread and self._writer_thread.is_alive():
-            self._writer_thread.join(timeout=3)
+            await asyncio.get_running_loop().run_in_executor(None, self._writer_thread.join, 3)
 
         self._cleanup_fifo()
-        self._auto_restart = True
 
     def get_fifo_path(self) -> str:
         """Video FIFOパスを取得"""
@@ -195,6 +370,3 @@ class VideoGenerator:
         """クラッシュ検出状態をリセット（復旧時に呼び出す）"""
         self._ffmpeg_crash_detected = False
 
-
-# シングルトン
-video_generator = VideoGenerator()
@@ -25,25 +25,33 @@ async def main():
         print(".env ファイルを確認してください", flush=True)
         return
 
-    # ディレクトリ確認
-    for dir_path in [config.MUSIC_DIR, config.ASSETS_DIR, config.DATA_DIR]:
-        os.makedirs(dir_path, exist_ok=True)
-
-    # 設定読み込み
-    await config.load()
+    # 局ごとにディレクトリ確認・設定読み込み
+    from core.scheduler import scheduler
+    from core.station import stations
+    for station in stations.all():
+        await station.load()
 
     print(f"Music: {config.MUSIC_DIR}", flush=True)
     print(f"Assets: {config.ASSETS_DIR}", flush=True)
     print(f"Data: {config.DATA_DIR}", flush=True)
 
     # 設定状態を表示
-    if config.is_configured():
-        print(f"配信先: {config.get_stream_url()}", flush=True)
-    else:
-        print("配信設定: 未完了 (Discordで /config コマンドを使用)", flush=True)
+    for station in stations.all():
+        prefix = "" if station.is_main() else f"[{station.id}] "
+        if station.config.is_configured():
+            print(f"{prefix}配信先: {station.config.get_stream_url()}", flush=True)
+        else:
+            print(f"{prefix}配信設定: 未完了 (Discordで /config コマンドを使用)", flush=True)
+
+    if len(stations.all()) > 1:
+        print(f"局: {', '.join(station.id for station in stations.all())} (CPU予算: {scheduler.get_budget():g}コア)", flush=True)
 
     print("=" * 50, flush=True)
 
+    # メトリクスの待ち受け（METRICS_PORT設定時のみ）
+    from core.metrics import metrics
+    await metrics.start_server()
+
     # Discord Bot起動
     print("Discord Bot起動中...", flush=True)
     await bot.start(config.DISCORD_TOKEN)